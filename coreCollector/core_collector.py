@@ -1,13 +1,21 @@
 import os
+import gzip
+import heapq
+import itertools
+import mmap
+import random
 import time
 import json
-from datetime import datetime
+import struct
+import threading
+import zlib
+from collections import deque
+from email.utils import parsedate_to_datetime
 import requests
 import logging
 from typing import Dict, List, Optional, Any
 from influxdb_client import InfluxDBClient, Point
-from influxdb_client.rest import ApiException
-from influxdb_client.client.write_api import SYNCHRONOUS
+from requests.adapters import HTTPAdapter
 
 # Configure logging with detailed formatting
 logging.basicConfig(
@@ -25,7 +33,485 @@ logging.getLogger('urllib3.connectionpool').setLevel(logging.WARNING)
 logging.getLogger('influxdb_client').setLevel(logging.WARNING)
 
 
+class InfluxWriteTransport:
+    """
+    Writes line protocol to InfluxDB's /api/v2/write over a pooled keep-alive session.
+
+    Bodies of at least `gzip_min_bytes` are gzip-compressed at `gzip_level` (0 disables
+    compression). Bytes before and after compression are counted for the statistics log.
+    Line-protocol timestamps are read at `precision` (ns, us, ms or s).
+    Raises requests exceptions (HTTPError with the response for non-2xx answers) on failure.
+    """
+
+    def __init__(self, url: str, token: str, org: str, bucket: str, gzip_level: int = 6,
+                 gzip_min_bytes: int = 1024, pool_size: int = 2, timeout: float = 10.0,
+                 precision: str = 'ns'):
+        self.write_url = f"{url.rstrip('/')}/api/v2/write"
+        self.params = {'org': org, 'bucket': bucket, 'precision': precision}
+        self.gzip_level = max(0, min(9, gzip_level))
+        self.gzip_min_bytes = gzip_min_bytes
+        self.timeout = timeout
+
+        self.headers = {
+            'Authorization': f'Token {token}',
+            'Content-Type': 'text/plain; charset=utf-8',
+            'Accept': 'application/json'
+        }
+        self.gzip_headers = {**self.headers, 'Content-Encoding': 'gzip'}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'failed_requests': 0,
+            'compressed_requests': 0,
+            'bytes_uncompressed': 0,
+            'bytes_sent': 0
+        }
+
+    def write(self, lines: List[str]):
+        """POST the lines in one request."""
+        body = '\n'.join(lines).encode()
+        size = len(body)
+        headers = self.headers
+        compressed = self.gzip_level > 0 and size >= self.gzip_min_bytes
+        if compressed:
+            body = gzip.compress(body, compresslevel=self.gzip_level)
+            headers = self.gzip_headers
+
+        try:
+            response = self.session.post(self.write_url, params=self.params, data=body, headers=headers,
+                                         timeout=self.timeout)
+            if response.status_code >= 300:
+                raise requests.exceptions.HTTPError(
+                    f"{response.status_code} {response.reason}: {response.text[:200]}", response=response)
+        except Exception:
+            with self.lock:
+                self.stats['requests'] += 1
+                self.stats['failed_requests'] += 1
+            raise
+
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['compressed_requests'] += compressed
+            self.stats['bytes_uncompressed'] += size
+            self.stats['bytes_sent'] += len(body)
+
+    def close(self):
+        self.session.close()
+
+
+class WriteSpool:
+    """
+    On-disk write-ahead spool for batches InfluxDB could not accept.
+
+    Uses the segment format of the srsRAN collector's spool (`exporters/writeSpool.py`): an
+    `SRSSPL` file header, then per batch a 16 byte header (body length, point count, CRC-32, pad)
+    and the line protocol padded to 8 bytes, written through `mmap` into segments created at
+    `segment_bytes`. Beyond `max_bytes` the oldest segment is deleted. Segments left by a
+    previous run are replayed on startup (and held to `max_bytes`); the sequence number in new
+    segment names continues from theirs, and a segment is never opened over an existing file.
+    `.spl` files without the header or without any record are left in place, never replayed.
+
+    A failed batch is appended with `sink_failed=True`, which marks the sink down; new batches
+    then go straight here. A replay thread writes the oldest records (retrying every
+    `retry_interval` seconds while the sink is down, then at most `replay_rate` points per
+    second) and deletes each segment once it is written.
+    """
+
+    MAGIC = b"SRSSPL\x00\x01"
+    RECORD_HEADER = struct.Struct("<III4x")
+
+    def __init__(self, directory: str, write, segment_bytes: int = 16 * 1024 ** 2, max_bytes: int = 1024 ** 3,
+                 replay_rate: float = 50000, retry_interval: float = 5.0):
+        self.directory = directory
+        self.write = write
+        self.segment_bytes = max(segment_bytes, 64 * 1024)
+        self.max_bytes = max(max_bytes, self.segment_bytes)
+        self.replay_rate = replay_rate
+        self.retry_interval = retry_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.stop_event = threading.Event()
+        self.sink_down = False
+
+        # Sealed segments, oldest first: [path, size on disk, points]
+        self.segments = deque()
+        self.sequence = 0
+        self.active = None  # [path, file, mmap, offset, points]
+        self.replay_path = None
+
+        self.stats = {
+            'spooled_points': 0,
+            'replayed_points': 0,
+            'evicted_points': 0,
+            'rejected_points': 0,
+            'replay_failures': 0
+        }
+
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.spl'):
+                self.sequence = max(self.sequence, self._segment_sequence(name))
+                path = os.path.join(directory, name)
+                records = self._read_records(path)
+                if not records:
+                    # Foreign, empty or never written: not ours to replay or delete
+                    logger.warning(f"{path} is not a spool segment or holds no records, leaving it in place")
+                    continue
+                points = sum(points for points, _ in records)
+                self.segments.append([path, os.path.getsize(path), points])
+        if self.segments:
+            logger.info(f"Replaying {len(self.segments)} spool segments from {directory}")
+        self._enforce_budget()
+
+        self.thread = threading.Thread(target=self._run, name='influx-spool-replay', daemon=True)
+        self.thread.start()
+
+    def pending_points(self) -> int:
+        return sum(segment[2] for segment in self.segments) + (self.active[4] if self.active else 0)
+
+    def disk_bytes(self) -> int:
+        return sum(segment[1] for segment in self.segments) + (len(self.active[2]) if self.active else 0)
+
+    def append(self, lines: List[str], sink_failed: bool = False) -> bool:
+        """Spool a batch of line-protocol lines; returns False if it could not be stored."""
+        body = '\n'.join(lines).encode()
+        size = self.RECORD_HEADER.size + len(body) + (-len(body) % 8)
+
+        with self.lock:
+            try:
+                if self.active is None or self.active[3] + size > len(self.active[2]):
+                    self._seal()
+                    self._open_segment(max(self.segment_bytes, len(self.MAGIC) + size))
+
+                path, _, mapped, offset, _ = self.active
+                start = offset + self.RECORD_HEADER.size
+                mapped[start:start + len(body)] = body
+                # Header last: until it is written the record reads as the end of the segment
+                self.RECORD_HEADER.pack_into(mapped, offset, len(body), len(lines), zlib.crc32(body))
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not spool {len(lines)} points: {e}")
+                return False
+
+            self.active[3] += size
+            self.active[4] += len(lines)
+            self.stats['spooled_points'] += len(lines)
+            if sink_failed and not self.sink_down:
+                self.sink_down = True
+                logger.warning(f"InfluxDB unavailable, spooling writes to {self.directory}")
+
+            self._enforce_budget()
+            self.wakeup.notify()
+        return True
+
+    def _enforce_budget(self):
+        """Delete the oldest sealed segments while the spool is over `max_bytes`."""
+        while self.segments and self.disk_bytes() > self.max_bytes:
+            oldest, _, points = self.segments.popleft()
+            if oldest == self.replay_path:
+                self.replay_path = None
+            self._remove(oldest)
+            self.stats['evicted_points'] += points
+            logger.warning(f"Spool over {self.max_bytes} bytes, dropped {oldest} ({points} points)")
+
+    @staticmethod
+    def _segment_sequence(name: str) -> int:
+        """The `<seq>` of a `spool-<date>-<time>-<seq>.spl` name (0 for other names)."""
+        try:
+            return int(name[:-len('.spl')].rsplit('-', 1)[1])
+        except (IndexError, ValueError):
+            return 0
+
+    def _open_segment(self, size: int):
+        while True:
+            self.sequence += 1
+            path = os.path.join(self.directory, f"spool-{time.strftime('%Y%m%d-%H%M%S')}-{self.sequence:06d}.spl")
+            try:
+                # Exclusive: never truncate a segment that is still waiting to be replayed
+                segment_file = open(path, 'x+b')
+                break
+            except FileExistsError:
+                continue
+        segment_file.truncate(size)
+        mapped = mmap.mmap(segment_file.fileno(), size)
+        mapped[:len(self.MAGIC)] = self.MAGIC
+        self.active = [path, segment_file, mapped, len(self.MAGIC), 0]
+
+    def _seal(self):
+        """Trim the active segment to its used size and queue it for replay (lock held)."""
+        if self.active is None:
+            return
+        path, segment_file, mapped, offset, points = self.active
+        mapped.flush()
+        mapped.close()
+        segment_file.truncate(offset)
+        segment_file.close()
+        self.segments.append([path, offset, points])
+        self.active = None
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove spool segment {path}: {e}")
+
+    def _read_records(self, path: str) -> List:
+        """(points, body) for each written record of a segment; a None body marks a bad checksum."""
+        records = []
+        with open(path, 'rb') as segment_file:
+            if os.fstat(segment_file.fileno()).st_size <= len(self.MAGIC):
+                return records
+            with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if mapped[:len(self.MAGIC)] != self.MAGIC:
+                    return records
+                offset = len(self.MAGIC)
+                while offset + self.RECORD_HEADER.size <= len(mapped):
+                    length, points, checksum = self.RECORD_HEADER.unpack_from(mapped, offset)
+                    start = offset + self.RECORD_HEADER.size
+                    if length == 0 or start + length > len(mapped):
+                        break
+                    body = mapped[start:start + length]
+                    if zlib.crc32(body) != checksum:
+                        records.append((points, None))
+                        break
+                    records.append((points, body))
+                    offset = start + length + (-length % 8)
+        return records
+
+    def _next_segment(self) -> Optional[str]:
+        with self.lock:
+            while not self.stop_event.is_set():
+                if not self.segments and self.active and self.active[4]:
+                    self._seal()
+                if self.segments:
+                    self.replay_path = self.segments[0][0]
+                    return self.replay_path
+                self.sink_down = False
+                self.wakeup.wait()
+        return None
+
+    def _run(self):
+        next_write = time.monotonic()
+        while True:
+            path = self._next_segment()
+            if path is None:
+                return
+
+            for points, body in self._read_records(path):
+                if body is None:
+                    logger.error(f"Skipping the rest of spool segment {path}: record checksum mismatch")
+                    break
+
+                handled = False
+                while self.replay_path == path and not self.stop_event.is_set():
+                    delay = next_write - time.monotonic()
+                    if delay > 0:
+                        self.stop_event.wait(delay)
+                        continue
+                    try:
+                        self.write([body.decode()])
+                    except requests.exceptions.HTTPError as e:
+                        if e.response is not None and 400 <= e.response.status_code < 500 \
+                                and e.response.status_code != 429:
+                            logger.error(f"InfluxDB rejected {points} spooled points, dropping them: {e}")
+                            self.stats['rejected_points'] += points
+                            handled = True
+                            break
+                        self.stats['replay_failures'] += 1
+                        next_write = time.monotonic() + self.retry_interval
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Spool replay failed ({e}), retrying in {self.retry_interval}s")
+                        self.stats['replay_failures'] += 1
+                        next_write = time.monotonic() + self.retry_interval
+                        continue
+
+                    if self.sink_down:
+                        self.sink_down = False
+                        logger.info(f"InfluxDB reachable again, replaying {self.pending_points()} spooled points")
+                    self.stats['replayed_points'] += points
+                    next_write = max(next_write, time.monotonic()) + points / self.replay_rate
+                    handled = True
+                    break
+
+                if handled:
+                    with self.lock:
+                        if self.replay_path == path:
+                            self.segments[0][2] -= points
+                if self.replay_path != path or self.stop_event.is_set():
+                    break
+
+            with self.lock:
+                if self.stop_event.is_set():
+                    return
+                if self.replay_path == path:
+                    self.segments.popleft()
+                    self._remove(path)
+                self.replay_path = None
+
+    def close(self, timeout: float = 5.0):
+        """Stop replaying; what is left stays on disk for the next start."""
+        with self.lock:
+            self.stop_event.set()
+            self.wakeup.notify()
+        self.thread.join(timeout)
+        with self.lock:
+            self._seal()
+            if self.segments:
+                logger.warning(f"Spool closed with {self.pending_points()} points under {self.directory}")
+
+
+class RetryScheduler:
+    """
+    Retries failed InfluxDB writes from a background thread, so a collection cycle never sleeps
+    on a backoff.
+
+    Attempt n of a batch is due after a random delay up to `base_delay * 2 ** n` seconds (capped
+    at `max_delay`), or after the `Retry-After` of a 429/503 answer, which also pauses new writes
+    until it passes. After `max_attempts` attempts, or when the queued batches would exceed
+    `max_pending_bytes`, a batch is passed to `give_up` (the spool, if configured). Batches
+    InfluxDB rejects as invalid (4xx other than 429) are dropped.
+    """
+
+    def __init__(self, write, give_up=None, max_attempts: int = 5, base_delay: float = 0.5,
+                 max_delay: float = 30.0, max_pending_bytes: int = 64 * 1024 ** 2):
+        self.write = write
+        self.give_up = give_up
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_pending_bytes = max_pending_bytes
+
+        self.pending = []  # (due time, sequence, attempts so far, lines, bytes)
+        self.sequence = itertools.count()
+        self.pending_bytes = 0
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.stopping = False
+
+        self.stats = {
+            'scheduled_batches': 0,
+            'retries': 0,
+            'retried_points': 0,
+            'given_up_points': 0,
+            'overflows': 0
+        }
+
+        self.thread = threading.Thread(target=self._run, name='influx-retry', daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def retryable(error: Exception) -> bool:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status is None or status == 429 or status >= 500
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        """Delay requested by a 429/503 response's Retry-After header (seconds or HTTP date)."""
+        response = getattr(error, 'response', None)
+        if getattr(response, 'status_code', None) not in (429, 503):
+            return None
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def paused(self) -> bool:
+        return time.monotonic() < self.paused_until
+
+    def _delay(self, attempts: int, error: Optional[Exception]) -> float:
+        requested = self.retry_after(error) if error is not None else None
+        if requested is not None:
+            self.paused_until = max(self.paused_until, time.monotonic() + requested)
+            return requested
+        if self.paused():
+            return self.paused_until - time.monotonic()
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+
+    def schedule(self, lines: List[str], error: Optional[Exception] = None, attempts: int = 1):
+        """Queue a batch that failed `attempts` times (0: held back while paused)."""
+        if error is not None and not self.retryable(error):
+            self._abandon(lines, f"rejected by InfluxDB: {error}", hand_on=False)
+            return
+
+        size = sum(len(line) for line in lines)
+        with self.lock:
+            overflow = self.pending_bytes + size > self.max_pending_bytes
+            if overflow:
+                self.stats['overflows'] += 1
+            else:
+                due = time.monotonic() + self._delay(attempts, error)
+                heapq.heappush(self.pending, (due, next(self.sequence), attempts, lines, size))
+                self.pending_bytes += size
+                if attempts <= 1:
+                    self.stats['scheduled_batches'] += 1
+                self.wakeup.notify()
+        if overflow:
+            self._abandon(lines, f"retry queue over {self.max_pending_bytes} bytes")
+
+    def _abandon(self, lines: List[str], reason: str, hand_on: bool = True):
+        with self.lock:
+            self.stats['given_up_points'] += len(lines)
+        if hand_on and self.give_up is not None and self.give_up(lines):
+            logger.warning(f"Gave up retrying {len(lines)} points ({reason}), handed them on")
+        else:
+            logger.error(f"Gave up retrying {len(lines)} points ({reason}), dropping them")
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.stopping and (not self.pending or self.pending[0][0] > time.monotonic()):
+                    self.wakeup.wait(self.pending[0][0] - time.monotonic() if self.pending else None)
+                if self.stopping:
+                    return
+                _, _, attempts, lines, size = heapq.heappop(self.pending)
+                self.pending_bytes -= size
+
+            self.stats['retries'] += 1
+            try:
+                self.write(lines)
+            except Exception as e:
+                if not self.retryable(e):
+                    self._abandon(lines, f"rejected by InfluxDB: {e}", hand_on=False)
+                elif attempts + 1 >= self.max_attempts:
+                    self._abandon(lines, f"{attempts + 1} attempts, last error: {e}")
+                else:
+                    self.schedule(lines, e, attempts + 1)
+                continue
+            self.stats['retried_points'] += len(lines)
+
+    def close(self, timeout: float = 5.0):
+        """Stop retrying; batches still queued are handed to `give_up`."""
+        with self.lock:
+            self.stopping = True
+            self.wakeup.notify()
+            remaining = [entry[3] for entry in self.pending]
+            self.pending = []
+            self.pending_bytes = 0
+        self.thread.join(timeout)
+        for lines in remaining:
+            self._abandon(lines, "shutting down")
+
+
 class MetricsCollector:
+    # Write precision -> nanoseconds per unit
+    PRECISION_DIVISORS = {'ns': 1, 'us': 10 ** 3, 'ms': 10 ** 6, 's': 10 ** 9}
+
     def __init__(self):
         logger.info("Initializing MetricsCollector...")
 
@@ -34,11 +520,24 @@ class MetricsCollector:
         self.influx_token = os.getenv('INFLUXDB_TOKEN', 'my-super-secret-token')
         self.influx_org = os.getenv('INFLUXDB_ORG', 'influxdata')
         self.influx_bucket = os.getenv('INFLUXDB_BUCKET', 'metrics')
+        self.gzip_level = int(os.getenv('INFLUXDB_GZIP_LEVEL', '6'))
+        self.gzip_min_bytes = int(os.getenv('INFLUXDB_GZIP_MIN_BYTES', '1024'))
+        self.pool_size = int(os.getenv('INFLUXDB_POOL_SIZE', '2'))
+        self.write_timeout = float(os.getenv('INFLUXDB_WRITE_TIMEOUT', '10'))
+        self.spool_dir = os.getenv('INFLUXDB_SPOOL_DIR', '')
+        self.retry_attempts = int(os.getenv('INFLUXDB_RETRY_ATTEMPTS', '5'))
+        # Timestamps are integer epoch values (UTC) at this precision; coarser ones shrink every line
+        self.write_precision = os.getenv('INFLUXDB_WRITE_PRECISION', 'ns').lower()
+        if self.write_precision not in self.PRECISION_DIVISORS:
+            logger.warning(f"Unknown INFLUXDB_WRITE_PRECISION {self.write_precision!r}, writing nanoseconds")
+            self.write_precision = 'ns'
 
         logger.info(f"InfluxDB Configuration:")
         logger.info(f"  URL: {self.influx_url}")
         logger.info(f"  Organization: {self.influx_org}")
         logger.info(f"  Bucket: {self.influx_bucket}")
+        logger.info(f"  Gzip: level {self.gzip_level}, bodies from {self.gzip_min_bytes} bytes")
+        logger.info(f"  Write precision: {self.write_precision}")
         logger.info(
             f"  Token: {'*' * (len(self.influx_token) - 4) + self.influx_token[-4:] if len(self.influx_token) > 4 else '****'}")
 
@@ -61,11 +560,37 @@ class MetricsCollector:
         for i, endpoint in enumerate(self.endpoints, 1):
             logger.info(f"  {i}. {endpoint['name']} ({endpoint['component']}) -> {endpoint['url']}")
 
-        # Initialize InfluxDB client
+        # Initialize InfluxDB client (startup checks) and write transport
         self.influx_client = None
-        self.write_api = None
+        self.transport = None
+        self.spool = None
+        self.retry = None
         self._init_influxdb()
 
+        # Write-ahead spool for batches InfluxDB cannot take right now
+        if self.spool_dir:
+            self.spool = WriteSpool(
+                self.spool_dir,
+                self.transport.write,
+                segment_bytes=int(os.getenv('INFLUXDB_SPOOL_SEGMENT_BYTES', str(16 * 1024 ** 2))),
+                max_bytes=int(os.getenv('INFLUXDB_SPOOL_MAX_BYTES', str(1024 ** 3))),
+                replay_rate=float(os.getenv('INFLUXDB_SPOOL_REPLAY_RATE', '50000')),
+                retry_interval=float(os.getenv('INFLUXDB_SPOOL_RETRY_INTERVAL', '5'))
+            )
+            logger.info(f"  Spool: {self.spool_dir}")
+
+        # Background retries with backoff; batches they give up on go to the spool
+        if self.retry_attempts > 1 and self.transport:
+            self.retry = RetryScheduler(
+                self.transport.write,
+                (lambda lines: self.spool.append(lines, sink_failed=True)) if self.spool else None,
+                max_attempts=self.retry_attempts,
+                base_delay=float(os.getenv('INFLUXDB_RETRY_BASE_DELAY', '0.5')),
+                max_delay=float(os.getenv('INFLUXDB_RETRY_MAX_DELAY', '30')),
+                max_pending_bytes=int(os.getenv('INFLUXDB_RETRY_MAX_PENDING_BYTES', str(64 * 1024 ** 2)))
+            )
+            logger.info(f"  Retries: up to {self.retry_attempts} attempts")
+
         # Statistics tracking
         self.stats = {
             'total_scrapes': 0,
@@ -120,7 +645,7 @@ class MetricsCollector:
             return []
 
     def _init_influxdb(self):
-        """Initialize InfluxDB client and write API"""
+        """Initialize InfluxDB client (health and bucket checks) and the write transport"""
         logger.info("Initializing InfluxDB connection...")
 
         try:
@@ -129,7 +654,17 @@ class MetricsCollector:
                 token=self.influx_token,
                 org=self.influx_org
             )
-            self.write_api = self.influx_client.write_api(write_options=SYNCHRONOUS)
+            self.transport = InfluxWriteTransport(
+                self.influx_url,
+                self.influx_token,
+                self.influx_org,
+                self.influx_bucket,
+                gzip_level=self.gzip_level,
+                gzip_min_bytes=self.gzip_min_bytes,
+                pool_size=self.pool_size,
+                timeout=self.write_timeout,
+                precision=self.write_precision
+            )
 
             # Test connection
             logger.debug("Testing InfluxDB connection...")
@@ -207,7 +742,7 @@ class MetricsCollector:
                     .field("value", value) \
                     .tag("source", "core") \
                     .tag("endpoint", endpoint['name']) \
-                    .time(current_time_influx)
+                    .time(current_time_influx, self.write_precision)
 
                 # Add labels as tags (commented out in original, keeping for reference)
                 # for label_key, label_value in labels.items():
@@ -342,39 +877,45 @@ class MetricsCollector:
             logger.error(f"Unexpected error scraping {endpoint_name}: {e}")
             return None
 
-    def timestamp_to_influx_time(self, timestamp_value: Any) -> Optional[datetime]:
-        """Convert timestamp to InfluxDB-compatible datetime object."""
+    def timestamp_to_influx_time(self, timestamp_value: Any) -> Optional[int]:
+        """Convert a Unix timestamp in seconds to an integer epoch timestamp (UTC) at the write precision."""
         if timestamp_value is None:
             return None
 
         try:
-            # Assume timestamp is in seconds (Unix timestamp)
-            timestamp_float = float(timestamp_value)
-            return datetime.fromtimestamp(timestamp_float)
-        except (ValueError, TypeError) as e:
-            logger.warning(f"Error converting timestamp {timestamp_value} to datetime: {e}")
+            # Nanoseconds at microsecond resolution, then truncated to the write precision
+            timestamp_ns = round(float(timestamp_value) * 1_000_000) * 1000
+            return timestamp_ns // self.PRECISION_DIVISORS[self.write_precision]
+        except (ValueError, TypeError, OverflowError) as e:
+            logger.warning(f"Error converting timestamp {timestamp_value} to epoch time: {e}")
             return None
 
     def write_to_influx(self, points: List[Point]):
         """Write points to InfluxDB"""
-        if not self.write_api:
-            logger.error("InfluxDB write API not available, cannot write metrics")
+        if not self.transport:
+            logger.error("InfluxDB write transport not available, cannot write metrics")
             return False
 
         if not points:
             logger.debug("No points to write to InfluxDB")
             return True
 
+        lines = [point.to_line_protocol() for point in points]
+
+        # While InfluxDB is down, spool instead of waiting for another timeout
+        if self.spool and self.spool.sink_down:
+            return self.spool.append(lines)
+        # While InfluxDB asked us to back off (Retry-After), queue for the retry thread
+        if self.retry and self.retry.paused():
+            self.retry.schedule(lines, attempts=0)
+            return True
+
         start_time = time.time()
 
         try:
             logger.debug(f"Writing {len(points)} points to InfluxDB bucket '{self.influx_bucket}'")
 
-            self.write_api.write(
-                bucket=self.influx_bucket,
-                org=self.influx_org,
-                record=points
-            )
+            self.transport.write(lines)
 
             elapsed_time = time.time() - start_time
             self.stats['total_points_written'] += len(points)
@@ -382,16 +923,26 @@ class MetricsCollector:
             logger.info(f"Successfully wrote {len(points)} points to InfluxDB in {elapsed_time:.3f}s")
             return True
 
-        except ApiException as e:
+        except requests.exceptions.HTTPError as e:
             self.stats['influx_write_failures'] += 1
             logger.error(f"InfluxDB API error writing {len(points)} points: {e}")
-            logger.error(f"  Status: {e.status}")
-            logger.error(f"  Reason: {e.reason}")
+            logger.error(f"  Status: {e.response.status_code}")
+            logger.error(f"  Reason: {e.response.reason}")
+            if self.retry and RetryScheduler.retryable(e):
+                self.retry.schedule(lines, e)
+                return True
+            if self.spool and (e.response.status_code == 429 or e.response.status_code >= 500):
+                return self.spool.append(lines, sink_failed=True)
             return False
 
         except Exception as e:
             self.stats['influx_write_failures'] += 1
             logger.error(f"Unexpected error writing {len(points)} points to InfluxDB: {e}")
+            if self.retry:
+                self.retry.schedule(lines, e)
+                return True
+            if self.spool:
+                return self.spool.append(lines, sink_failed=True)
             return False
 
     def collect_and_send_metrics(self):
@@ -440,6 +991,22 @@ class MetricsCollector:
         logger.info(f"Failed scrapes: {self.stats['failed_scrapes']}")
         logger.info(f"Points written: {self.stats['total_points_written']}")
         logger.info(f"InfluxDB write failures: {self.stats['influx_write_failures']}")
+        if self.retry:
+            retry_stats = dict(self.retry.stats)
+            logger.info(f"Retries: {retry_stats['retries']} attempts, {retry_stats['retried_points']} points recovered, "
+                        f"{retry_stats['given_up_points']} given up, {len(self.retry.pending)} batches pending")
+        if self.spool:
+            spool_stats = dict(self.spool.stats)
+            logger.info(f"Spool: {self.spool.pending_points()} points pending ({self.spool.disk_bytes()} bytes), "
+                        f"{spool_stats['spooled_points']} spooled, {spool_stats['replayed_points']} replayed, "
+                        f"{spool_stats['evicted_points']} evicted, {spool_stats['rejected_points']} rejected")
+        if self.transport:
+            transport_stats = dict(self.transport.stats)
+            ratio = transport_stats['bytes_uncompressed'] / max(1, transport_stats['bytes_sent'])
+            logger.info(f"Write requests: {transport_stats['requests']} "
+                        f"({transport_stats['compressed_requests']} gzip, {transport_stats['failed_requests']} failed)")
+            logger.info(f"Write bytes: {transport_stats['bytes_uncompressed']} line protocol, "
+                        f"{transport_stats['bytes_sent']} sent ({ratio:.1f}x)")
         logger.info("=============================")
 
     def run(self):
@@ -498,6 +1065,12 @@ class MetricsCollector:
             if self.influx_client:
                 logger.info("Closing InfluxDB connection...")
                 try:
+                    if self.retry:
+                        self.retry.close()
+                    if self.spool:
+                        self.spool.close()
+                    if self.transport:
+                        self.transport.close()
                     self.influx_client.close()
                     logger.info("InfluxDB connection closed successfully")
                 except Exception as e:
@@ -0,0 +1,133 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from collector import collector
+from exporters.helper_functions import log_both
+
+"""
+# -- asyncio Collector Runtime --
+
+Runs the same parsers as `collector`, but on an asyncio event loop instead of a blocking
+`recv()` loop.
+
+1. Reception:
+   - The UDP socket is served by `loop.create_datagram_endpoint`. `datagram_received()` only
+     places the raw datagram on a bounded asyncio queue, so reception never waits on parsing
+     or on InfluxDB writes. When the queue is full the datagram is dropped and counted.
+
+2. Parsing:
+   - A consumer task drains the queue in batches and runs `process_datagram()` (and therefore
+     the existing `*MetricsParser.update_metrics` methods) on a single worker thread.
+     Parsers and the exporter are not thread-safe, so everything that touches them runs on
+     that one thread, one batch or timer callback at a time.
+
+3. Timers:
+   - Every entry of `get_periodic_tasks()` (UE timeout sweep, stats report, ...) gets its own
+     task that fires on its interval whether or not datagrams are arriving.
+"""
+
+
+class datagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, queue: asyncio.Queue, stats: dict, on_receive):
+        self.queue = queue
+        self.stats = stats
+        self.on_receive = on_receive
+
+    def datagram_received(self, data, addr):
+        self.on_receive(data, addr)
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.stats['queue_dropped'] += 1
+
+    def error_received(self, exc):
+        log_both(f"Socket error: {exc}", "error")
+
+
+class asyncCollector(collector):
+    def __init__(self, reuse_port: bool = False):
+        super().__init__(reuse_port=reuse_port)
+
+        self.queue_size = int(os.getenv('ASYNC_QUEUE_SIZE', '10000'))
+        self.batch_size = int(os.getenv('ASYNC_BATCH_SIZE', '256'))
+
+        self.stats['queue_dropped'] = 0
+        self.receive_queue: Optional[asyncio.Queue] = None
+
+        # Single worker thread: parsers and exporter only ever run here
+        self.parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parser")
+
+        if self.shedder is not None:
+            self.shedder.add_signal('receive_queue', self.receive_queue_fill)
+
+    def process_batch(self, batch):
+        """Parse a batch of datagrams (runs on the parser thread)."""
+        for datagram in batch:
+            self.process_datagram(datagram)
+
+    async def consume(self, queue: asyncio.Queue):
+        """Move datagrams from the receive queue to the parser thread in batches."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await loop.run_in_executor(self.parse_executor, self.process_batch, batch)
+            except Exception as e:
+                log_both(f"Unexpected error processing batch: {e}", "error")
+
+    async def run_periodic(self, name: str, interval: float, task):
+        """Run a housekeeping callable on the parser thread every `interval` seconds."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(self.parse_executor, task)
+            except Exception as e:
+                log_both(f"Periodic task {name} failed: {e}", "error")
+
+    def receive_queue_fill(self) -> float:
+        """Receive queue depth relative to its size (load-shedding signal)."""
+        return self.receive_queue.qsize() / self.queue_size if self.receive_queue is not None else 0.0
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Depth of the receive queue (read from the debug endpoint's thread)."""
+        if self.receive_queue is None:
+            return {}
+        return {"receive": {"depth": self.receive_queue.qsize(), "capacity": self.queue_size,
+                            "dropped": self.stats['queue_dropped']}}
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        queue = self.receive_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        self.server_socket.setblocking(False)
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: datagramProtocol(queue, self.stats, self.on_receive), sock=self.server_socket)
+
+        tasks = [asyncio.create_task(self.consume(queue))]
+        for name, interval, task in self.get_periodic_tasks():
+            if interval > 0:
+                tasks.append(asyncio.create_task(self.run_periodic(name, interval, task)))
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            transport.close()
+
+    def run(self):
+        log_both("Starting asyncio collection loop")
+
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            log_both("Shutdown requested")
+        finally:
+            self.parse_executor.shutdown(wait=True)
+            self.shutdown()
@@ -0,0 +1,342 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exporters.appResourceUsageMetricsParser import appResourceUsageMetricsParser
+from exporters.captureFile import read_capture
+from exporters.cellMetricsParser import cellMetricsParser
+from exporters.cuUpMetricsParser import cuUpMetricsParser
+from exporters.duMetricsParser import duMetricsParser
+from exporters.imeisvParser import imeisvParser
+from exporters.lineProtocol import lineBuffer, line_count
+from exporters.messageRouter import messageRouter
+from exporters.rlcMetricsParser import rlcMetricsParser
+from exporters.ruMetricsParser import ruMetricsParser
+from exporters.tagSetRegistry import tagSetRegistry
+from trafficGenerator import trafficGenerator
+
+"""
+# -- Parser Benchmark and Output Snapshot --
+
+Drives each parser's `update_metrics` with a corpus of decoded messages and a capturing fake in
+place of `exporter`, and reports per parser:
+   - messages/second (best of `--rounds` timed passes over the corpus),
+   - peak traced memory per message and memory retained after a pass (tracemalloc; CPython has
+     no counter of individual allocations, so these stand in for "allocations per message").
+
+It also snapshots the emitted line protocol and compares it with `golden.json`, so a performance
+rewrite can be shown to produce identical output:
+
+    python benchmarks/parserBenchmark.py                        # benchmark + snapshot check
+    python benchmarks/parserBenchmark.py --parser rlcMetricsParser --rounds 10
+    python benchmarks/parserBenchmark.py --dump /tmp/lp          # write the line protocol to diff
+    python benchmarks/parserBenchmark.py --update-golden        # accept an intended output change
+    python benchmarks/parserBenchmark.py --corpus /captures     # a recorded capture (or .jsonl)
+    python benchmarks/parserBenchmark.py --wide                 # time INFLUX_WIDE_ROWS output
+
+The default corpus is synthetic (`trafficGenerator` with a fixed seed and fixed timestamps);
+pass a capture recorded with `CAPTURE_DIR` to benchmark real traffic. Within each message the
+snapshot lines are sorted (some parsers iterate sets), and timestamps outside the corpus time
+range (wall-clock `utcnow()` points) are masked.
+
+With `--wide` the parsers are timed in wide-row mode. The snapshot is still taken (and checked)
+per field, and the wide-row output, split back into one line per field, must match it.
+"""
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden.json")
+CORPUS_START = 1760000000.0
+CORPUS_ROUNDS = 20
+MASK_MARGIN_SECONDS = 3600
+
+PARSERS: Dict[str, Tuple[str, Callable]] = {
+    'cellMetricsParser': ('cell_metrics', cellMetricsParser),
+    'duMetricsParser': ('du', duMetricsParser),
+    'ruMetricsParser': ('ru', ruMetricsParser),
+    'appResourceUsageMetricsParser': ('app_resource_usage', appResourceUsageMetricsParser),
+    'cuUpMetricsParser': ('cu-up', cuUpMetricsParser),
+    'rlcMetricsParser': ('rlc_metrics', rlcMetricsParser),
+    'imeisvParser': ('imeisv', imeisvParser),
+}
+
+
+class captureExporter:
+    """
+    Stand-in for `exporter`: keeps the points parsers hand over, or (keep=False) serializes and
+    discards them, so Point-based and `lineBuffer` parsers are timed with serialization included.
+    """
+
+    def __init__(self, keep: bool = True, wide: bool = False):
+        self.keep = keep
+        self.points = []
+        self.point_count = 0
+        self.handoff = None
+        self.write_ns = 0
+        self.lines = lineBuffer({"source": "srs_ran"}, wide=wide)
+        self.tag_sets = tagSetRegistry(self.lines)
+
+    def write_to_influx(self, points):
+        self.point_count += sum(line_count(point) for point in points)
+        if self.keep:
+            self.points.extend(points)
+            return
+        for point in points:
+            if not isinstance(point, bytes):
+                point.tag("source", "srs_ran")
+                point.to_line_protocol()
+
+    write_points = write_to_influx
+
+    def commit(self):
+        if self.lines:
+            self.write_to_influx([self.lines.take()])
+
+    def take_lines(self) -> List[str]:
+        """Return the captured points as line protocol (tagged like `exporter.write_points`)."""
+        lines = []
+        for point in self.points:
+            if isinstance(point, bytes):
+                lines.extend(point.decode().split("\n"))
+                continue
+            point.tag("source", "srs_ran")
+            lines.append(point.to_line_protocol())
+        self.points = []
+        return lines
+
+
+def synthetic_corpus() -> List[bytes]:
+    """A fixed, reproducible corpus: 3 cells x 6 UEs x 2 DRBs with some UE churn."""
+    generator = trafficGenerator(cells=3, ues_per_cell=6, drbs_per_ue=2, refresh_rounds=5, seed=0)
+    corpus = []
+    for round_index in range(CORPUS_ROUNDS):
+        if round_index:
+            for _ in range(2):
+                generator.churn_event()
+        prefix = b'{"timestamp":%.3f,' % (CORPUS_START + round_index)
+        corpus.extend(prefix + body for body in generator.next_round())
+    return corpus
+
+
+def load_corpus(paths: List[str]) -> List[bytes]:
+    """Read datagrams from .jsonl files (one message per line) and capture segments/directories."""
+    corpus = []
+    captures = []
+    for path in paths:
+        if path.endswith(".jsonl"):
+            with open(path, "rb") as corpus_file:
+                corpus.extend(line.strip() for line in corpus_file if line.strip())
+        else:
+            captures.append(path)
+    if captures:
+        corpus.extend(bytes(payload) for _, _, payload in read_capture(captures))
+    return corpus
+
+
+def split_corpus(corpus: List[bytes]) -> Tuple[Dict[str, List[Dict[str, Any]]], Tuple[float, float]]:
+    """Decode the corpus and group messages by type; also return its timestamp range."""
+    router = messageRouter()
+    for message_type, _ in PARSERS.values():
+        router.register(message_type, None)
+
+    by_type = {message_type: [] for message_type, _ in PARSERS.values()}
+    timestamps = []
+    for datagram in corpus:
+        try:
+            entry = json.loads(datagram)
+        except ValueError:
+            continue
+        message_type = router.categorise(entry, router.sniff(datagram))
+        if message_type is not None:
+            by_type[message_type].append(entry)
+            if isinstance(entry.get("timestamp"), (int, float)):
+                timestamps.append(entry["timestamp"])
+
+    return by_type, (min(timestamps, default=0), max(timestamps, default=0))
+
+
+def split_fields(line: str) -> List[str]:
+    """Split a line-protocol line into one line per field (backslash escapes and quotes respected)."""
+    head = None
+    fields = []
+    current = ''
+    escaped = quoted = False
+    for index, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '"' and head is not None:
+            quoted = not quoted
+        elif char == ' ' and not quoted:
+            if head is None:
+                head, current = current, ''
+                continue
+            fields.append(current)
+            return [f"{head} {field}{line[index:]}" for field in fields]
+        elif char == ',' and not quoted and head is not None:
+            fields.append(current)
+            current = ''
+            continue
+        current += char
+    fields.append(current)
+    return [f"{head} {field}" for field in fields]
+
+
+def snapshot(factory, messages, time_range: Tuple[float, float], wide: bool = False) -> List[str]:
+    """Run a fresh parser over `messages` once and return its normalised line protocol."""
+    fake = captureExporter(wide=wide)
+    parser = factory(fake)
+    low_ns = int((time_range[0] - MASK_MARGIN_SECONDS) * 1e9)
+    high_ns = int((time_range[1] + MASK_MARGIN_SECONDS) * 1e9)
+
+    lines = []
+    for index, message in enumerate(messages):
+        parser.update_metrics(message)
+        message_lines = []
+        for line in fake.take_lines():
+            head, _, stamp = line.rpartition(" ")
+            if stamp.isdigit() and not low_ns <= int(stamp) <= high_ns:
+                line = f"{head} <now>"
+            message_lines.append(line)
+        lines.append(f"# message {index}")
+        lines.extend(sorted(message_lines))
+    return lines
+
+
+def per_field(lines: List[str]) -> List[str]:
+    """A snapshot with every line split into one line per field, sorted within each message."""
+    result = []
+    message_lines = []
+    for line in lines + ["# end"]:
+        if line.startswith("# message") or line == "# end":
+            result.extend(sorted(message_lines))
+            result.append(line)
+            message_lines = []
+        else:
+            message_lines.extend(split_fields(line))
+    return result[1:-1]
+
+
+def measure(factory, messages, rounds: int, wide: bool = False) -> Dict[str, float]:
+    """Time `rounds` passes over `messages` and trace memory for one more."""
+    fake = captureExporter(keep=False, wide=wide)
+    parser = factory(fake)
+
+    # Warm-up pass: first-seen UEs/DRBs/cells take a different path from steady state
+    for message in messages:
+        parser.update_metrics(message)
+
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for message in messages:
+            parser.update_metrics(message)
+        best = min(best, time.perf_counter() - start)
+
+    points_per_message = fake.point_count / ((rounds + 1) * len(messages))
+
+    tracemalloc.start()
+    peak_total = 0
+    baseline, _ = tracemalloc.get_traced_memory()
+    for message in messages:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        parser.update_metrics(message)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "messages_per_second": len(messages) / best if best else 0.0,
+        "points_per_message": points_per_message,
+        "peak_bytes_per_message": peak_total / len(messages),
+        "retained_bytes_per_message": (retained - baseline) / len(messages),
+    }
+
+
+def digest(lines: List[str]) -> str:
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the srsRAN parsers and check their output")
+    arg_parser.add_argument("--corpus", nargs="+", help="capture segments/directories or .jsonl files")
+    arg_parser.add_argument("--parser", action="append", choices=sorted(PARSERS), help="limit to these parsers")
+    arg_parser.add_argument("--rounds", type=int, default=5, help="timed passes over the corpus per parser")
+    arg_parser.add_argument("--dump", help="write each parser's line protocol to this directory")
+    arg_parser.add_argument("--update-golden", action="store_true", help="rewrite golden.json from this run")
+    arg_parser.add_argument("--wide", action="store_true", help="time wide-row output (INFLUX_WIDE_ROWS)")
+    arg_parser.add_argument("--log-level", default="CRITICAL", help="collector log level while benchmarking")
+    args = arg_parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    by_type, time_range = split_corpus(corpus)
+    corpus_digest = hashlib.sha256(b"\n".join(corpus)).hexdigest()
+
+    golden = {}
+    if os.path.exists(GOLDEN_PATH):
+        with open(GOLDEN_PATH) as golden_file:
+            golden = json.load(golden_file)
+    check = not args.corpus and golden.get("corpus_sha256") == corpus_digest
+
+    results = {}
+    mismatches = []
+    print(f"{'parser':32} {'messages':>8} {'msg/s':>10} {'points/msg':>10} {'peak KiB/msg':>12} "
+          f"{'retained B/msg':>14}  snapshot")
+    for name in args.parser or PARSERS:
+        message_type, factory = PARSERS[name]
+        messages = by_type[message_type]
+        if not messages:
+            print(f"{name:32} {0:>8}  (no messages in corpus)")
+            continue
+
+        lines = snapshot(factory, messages, time_range)
+        results[name] = {"messages": len(messages), "lines": len(lines), "sha256": digest(lines)}
+        if args.dump:
+            os.makedirs(args.dump, exist_ok=True)
+            with open(os.path.join(args.dump, f"{name}.lp"), "w") as dump_file:
+                dump_file.write("\n".join(lines) + "\n")
+
+        status = "-"
+        if check:
+            status = "ok" if golden.get("parsers", {}).get(name) == results[name] else "CHANGED"
+            if status == "CHANGED":
+                mismatches.append(name)
+        if args.wide and per_field(snapshot(factory, messages, time_range, wide=True)) != \
+                per_field(lines):
+            status = "WIDE DIFFERS"
+            mismatches.append(name)
+
+        stats = measure(factory, messages, args.rounds, wide=args.wide)
+        print(f"{name:32} {len(messages):>8} {stats['messages_per_second']:>10.0f} "
+              f"{stats['points_per_message']:>10.1f} {stats['peak_bytes_per_message'] / 1024:>12.1f} "
+              f"{stats['retained_bytes_per_message']:>14.0f}  {status}")
+
+    if args.update_golden:
+        if args.corpus or args.parser:
+            sys.exit("--update-golden needs the default corpus and every parser")
+        with open(GOLDEN_PATH, "w") as golden_file:
+            json.dump({"corpus_sha256": corpus_digest, "parsers": results}, golden_file, indent=2)
+            golden_file.write("\n")
+        print(f"Wrote {GOLDEN_PATH}")
+    elif not args.corpus and not check:
+        print("golden.json does not match this corpus (trafficGenerator changed?); snapshot not checked")
+
+    if mismatches:
+        print(f"Line protocol changed for: {', '.join(mismatches)} "
+              f"(use --dump on both revisions and diff the files)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
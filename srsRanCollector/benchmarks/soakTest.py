@@ -0,0 +1,305 @@
+import argparse
+import gzip
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+COLLECTOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, COLLECTOR_DIR)
+
+from trafficGenerator import trafficGenerator
+
+"""
+# -- End-to-End Soak Test --
+
+Qualifies a collector build under sustained load:
+
+1. Starts a fake InfluxDB in this process: `POST /api/v2/write` counts the points it receives
+   (gzip bodies included), after an injected `--write-latency`. Requests fail at random with
+   `--error-rate`, and for `--outage-duration` seconds out of every `--outage-every` all writes
+   get 503 to simulate an InfluxDB outage.
+2. Starts `collector.py` as a child process with `INFLUX_URL` pointed at the fake (other
+   collector settings are taken from the environment, e.g. `COLLECTOR_MODE`, `WORKER_COUNT`).
+3. Runs `trafficGenerator` in a separate process against UDP port 55555.
+
+Every `--report-interval` seconds, and once at the end, it prints:
+   - datagrams/s sent and received by the collector (from its `collector_metrics` self-metrics),
+   - UDP loss (sent minus received) and the kernel's drop counter for the collector socket,
+   - points/s accepted by the fake InfluxDB, and the latency of those writes,
+   - collector RSS (the whole process tree when sharded) and its growth since the first report,
+   - recovery time after each injected outage: from its end to the first accepted write.
+
+    python benchmarks/soakTest.py --duration 3600 --rate 20000 --cells 8 --ues-per-cell 32
+    python benchmarks/soakTest.py --duration 600 --outage-every 120 --outage-duration 20
+"""
+
+COLLECTOR_PORT = 55555
+
+
+class fakeInfluxServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, write_latency: float, error_rate: float, outage_every: float,
+                 outage_duration: float):
+        super().__init__(("127.0.0.1", port), fakeInfluxHandler)
+        self.write_latency = write_latency
+        self.error_rate = error_rate
+        self.outage_every = outage_every
+        self.outage_duration = outage_duration
+        self.started = time.monotonic()
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.points = 0
+        self.bytes = 0
+        self.write_times: List[float] = []
+        self.collector_fields: Dict[str, float] = {}
+        self.outage_end: Optional[float] = None
+        self.recoveries: List[float] = []
+
+    def outage(self, now: float) -> Optional[float]:
+        """Return the end time of the outage in progress at `now`, if any."""
+        if self.outage_every <= 0 or self.outage_duration <= 0:
+            return None
+        elapsed = now - self.started
+        phase = elapsed % self.outage_every
+        if elapsed >= self.outage_every and phase < self.outage_duration:
+            return now - phase + self.outage_duration
+        return None
+
+    def accept(self, body: bytes, elapsed: float):
+        now = time.monotonic()
+        lines = body.splitlines()
+        with self.lock:
+            self.requests += 1
+            self.points += len(lines)
+            self.bytes += len(body)
+            self.write_times.append(elapsed)
+            if self.outage_end is not None and now >= self.outage_end:
+                self.recoveries.append(now - self.outage_end)
+                self.outage_end = None
+
+            # Keep the collector's own counters (one field per point) for the loss figures
+            for line in lines:
+                if line.startswith(b"collector_metrics"):
+                    try:
+                        _, fields, _ = line.rsplit(b" ", 2)
+                        name, value = fields.split(b"=", 1)
+                        self.collector_fields[name.decode()] = float(value.rstrip(b"i"))
+                    except ValueError:
+                        continue
+
+    def reject(self, outage_end: Optional[float]):
+        with self.lock:
+            self.requests += 1
+            self.rejected += 1
+            if outage_end is not None:
+                self.outage_end = outage_end
+
+    def take_interval(self):
+        """Return and reset the per-interval write latencies."""
+        with self.lock:
+            write_times, self.write_times = self.write_times, []
+        return write_times
+
+
+class fakeInfluxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        start = time.monotonic()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        server: fakeInfluxServer = self.server
+        if server.write_latency > 0:
+            time.sleep(server.write_latency)
+
+        outage_end = server.outage(time.monotonic())
+        if not self.path.startswith("/api/v2/write"):
+            self.respond(404, b'{"code":"not found"}')
+        elif outage_end is not None or random.random() < server.error_rate:
+            server.reject(outage_end)
+            self.respond(503, b'{"code":"unavailable","message":"injected failure"}')
+        else:
+            server.accept(body, time.monotonic() - start)
+            self.respond(204, b"")
+
+    def do_GET(self):
+        # /health and /ping for clients that probe the server
+        self.respond(200, b'{"status":"pass"}')
+
+    def respond(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def generate(args, sent):
+    """Generator process: send synthetic traffic, publishing the running count in `sent`."""
+    generator = trafficGenerator(args.cells, args.ues_per_cell, args.drbs_per_ue, args.churn, seed=args.seed)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(("127.0.0.1", COLLECTOR_PORT))
+    count = 0
+
+    def send(datagram):
+        nonlocal count
+        try:
+            sender.send(datagram)
+        except ConnectionRefusedError:
+            return
+        count += 1
+        if count % 1000 == 0:
+            sent.value = count
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    generator.run(send, args.rate, args.duration, report_interval=args.duration + 1)
+    sent.value = count
+
+
+def tree_rss_bytes(pid: int) -> int:
+    """Resident set size of `pid` and all of its descendants (sharded workers)."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Soak-test the collector against a fake InfluxDB")
+    arg_parser.add_argument("--duration", type=float, default=300, help="seconds of traffic")
+    arg_parser.add_argument("--rate", type=float, default=5000, help="datagrams/s sent (0 = unpaced)")
+    arg_parser.add_argument("--cells", type=int, default=4)
+    arg_parser.add_argument("--ues-per-cell", type=int, default=16)
+    arg_parser.add_argument("--drbs-per-ue", type=int, default=2)
+    arg_parser.add_argument("--churn", type=float, default=1, help="UE lifecycle events/s")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--influx-port", type=int, default=18086)
+    arg_parser.add_argument("--write-latency", type=float, default=0.0, help="seconds added to every write")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of writes failed at random")
+    arg_parser.add_argument("--outage-every", type=float, default=0, help="seconds between injected outages")
+    arg_parser.add_argument("--outage-duration", type=float, default=0, help="length of each outage in seconds")
+    arg_parser.add_argument("--report-interval", type=float, default=10)
+    arg_parser.add_argument("--collector-log", default="soak-collector.log")
+    args = arg_parser.parse_args()
+
+    server = fakeInfluxServer(args.influx_port, args.write_latency, args.error_rate, args.outage_every,
+                              args.outage_duration)
+    threading.Thread(target=server.serve_forever, name="fake-influx", daemon=True).start()
+
+    env = dict(os.environ)
+    env["INFLUX_URL"] = f"http://127.0.0.1:{args.influx_port}"
+    env.setdefault("SELF_METRICS_INTERVAL", str(min(args.report_interval, 5)))
+    env.setdefault("WORKER_REPORT_INTERVAL", str(min(args.report_interval, 5)))
+    log_file = open(args.collector_log, "w")
+    collector = subprocess.Popen([sys.executable, "collector.py"], cwd=COLLECTOR_DIR, env=env,
+                                 stdout=log_file, stderr=subprocess.STDOUT)
+    time.sleep(2)
+    if collector.poll() is not None:
+        sys.exit(f"collector exited with {collector.returncode}, see {args.collector_log}")
+
+    sent = multiprocessing.Value("q", 0)
+    generator = multiprocessing.Process(target=generate, args=(args, sent), name="generator")
+    generator.start()
+
+    started = time.monotonic()
+    first_rss = None
+    previous = {"time": started, "sent": 0, "received": 0, "points": 0}
+    all_write_times: List[float] = []
+
+    print(f"{'elapsed':>7} {'sent/s':>8} {'recv/s':>8} {'loss%':>6} {'kdrops':>7} {'points/s':>9} "
+          f"{'write p50':>9} {'write p99':>9} {'rejected':>8} {'RSS MB':>7} {'growth':>7}")
+
+    def report():
+        nonlocal first_rss
+        now = time.monotonic()
+        interval = now - previous["time"]
+        with server.lock:
+            points = server.points
+            rejected = server.rejected
+            fields = dict(server.collector_fields)
+        write_times = server.take_interval()
+        all_write_times.extend(write_times)
+
+        received = fields.get("datagrams_received", 0)
+        total_sent = sent.value
+        loss = 100 * (1 - received / total_sent) if total_sent else 0.0
+        rss = tree_rss_bytes(collector.pid) / 1024 ** 2
+        if first_rss is None and rss:
+            first_rss = rss
+
+        print(f"{now - started:>7.0f} {(total_sent - previous['sent']) / interval:>8.0f} "
+              f"{(received - previous['received']) / interval:>8.0f} {max(loss, 0):>6.2f} "
+              f"{fields.get('kernel_drops', 0):>7.0f} {(points - previous['points']) / interval:>9.0f} "
+              f"{percentile(write_times, 0.5) * 1000:>8.1f}ms {percentile(write_times, 0.99) * 1000:>7.1f}ms "
+              f"{rejected:>8} {rss:>7.1f} {rss - (first_rss or rss):>+7.1f}", flush=True)
+        previous.update(time=now, sent=total_sent, received=received, points=points)
+
+    try:
+        while generator.is_alive():
+            generator.join(timeout=args.report_interval)
+            report()
+        # Let the collector drain and publish its final counters
+        time.sleep(max(float(env["SELF_METRICS_INTERVAL"]), 2) + 1)
+        report()
+    except KeyboardInterrupt:
+        generator.terminate()
+    finally:
+        collector.send_signal(signal.SIGINT)
+        try:
+            collector.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            collector.kill()
+        server.shutdown()
+        log_file.close()
+
+    elapsed = time.monotonic() - started
+    print("\n=== SOAK SUMMARY ===")
+    print(f"duration: {elapsed:.0f}s, datagrams sent: {sent.value}, "
+          f"received by collector: {server.collector_fields.get('datagrams_received', 0):.0f}, "
+          f"kernel drops: {server.collector_fields.get('kernel_drops', 0):.0f}")
+    print(f"points accepted: {server.points} ({server.points / elapsed:.0f}/s), write requests: {server.requests}, "
+          f"rejected (injected): {server.rejected}")
+    print(f"write latency p50/p99/max: {percentile(all_write_times, 0.5) * 1000:.1f} / "
+          f"{percentile(all_write_times, 0.99) * 1000:.1f} / {max(all_write_times, default=0) * 1000:.1f} ms")
+    if server.recoveries:
+        print(f"outage recoveries: {len(server.recoveries)}, time to first accepted write after outage "
+              f"mean {sum(server.recoveries) / len(server.recoveries):.2f}s, max {max(server.recoveries):.2f}s")
+    print(f"collector exit code: {collector.returncode} (log: {args.collector_log})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import fileinput
 import os
-from datetime import datetime
 from typing import List
 
 from influxdb_client import Point, InfluxDBClient
@@ -43,17 +42,16 @@ for line in fileinput.input():
     #   initialise a list of points
     points = []
 
-    #   parse time
-    timestamp_float = float(time)
-    timestamp_dt = datetime.fromtimestamp(timestamp_float)
+    #   parse time (epoch seconds) into integer nanoseconds, UTC
+    timestamp_ns = round(float(time) * 1_000_000) * 1000
 
     # for every field, create a point, append to points
     for field, value in zip(field_names, values[1:]):
         point = Point("ru") \
             .field("rx", field) \
             .tag("source", "ru")
-        if timestamp_dt:
-            point = point.time(timestamp_dt)
+        if timestamp_ns:
+            point = point.time(timestamp_ns)
         points.append(point)
 
 #   send to influx
@@ -1,17 +1,29 @@
+import signal
 import socket
 import json
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional
 import os
 
+from influxdb_client import Point
+
 from exporters.appResourceUsageMetricsParser import appResourceUsageMetricsParser
+from exporters.captureFile import captureWriter
 from exporters.cellMetricsParser import cellMetricsParser
 from exporters.duMetricsParser import duMetricsParser
 from exporters.exporter import exporter
 from exporters.helper_functions import log_both
 from exporters.imeisvParser import imeisvParser
+from exporters.latencyHistogram import latencyRecorder
+from exporters.loadShedder import (DEFAULT_CRITICAL_MEASUREMENTS, DEFAULT_CRITICAL_TYPES, DEFAULT_LOW_MEASUREMENTS,
+                                   DEFAULT_LOW_TYPES, loadShedder)
+from exporters.messageRouter import messageRouter
 from exporters.ruMetricsParser import ruMetricsParser
 from exporters.cuUpMetricsParser import cuUpMetricsParser
+from exporters.debugEndpoint import debugEndpoint, describe_structure, process_memory
 from exporters.rlcMetricsParser import rlcMetricsParser
+from exporters.socketStats import read_udp_socket_stats, set_receive_buffer
+from exporters.udpReceiver import udpReceiver
 
 """
 # -- Main Collector Class --
@@ -19,16 +31,24 @@ from exporters.rlcMetricsParser import rlcMetricsParser
 This class is responsible for receiving, categorizing, and exporting incoming metrics data.
 
 1. The `run()` method:
-   - Starts a persistent loop that listens on a UDP socket for incoming JSON-encoded messages.
-   - Each message is passed to the `categorise_and_parse()` function for further processing.
+   - Starts a persistent loop that listens on a UDP socket for incoming JSON-encoded messages
+     (`RECV_MODE=ring` drains it in batches into preallocated buffers, see `udpReceiver`).
+   - Each datagram goes through `process_datagram()`, which sniffs the message type from the raw
+     bytes so that disabled or shed message types are dropped before any JSON decoding.
+   - `asyncCollector`, `pipelineCollector` and `shardedCollector` (`WORKER_COUNT>1`) run the same
+     parsing in other runtimes. All of them flush through `shutdown()` on exit, SIGTERM included.
 
 2. The `categorise_and_parse()` method:
    - Inspects top-level JSON headers to determine the type or source of the metric.
-   - Dispatches the JSON payload to the appropriate metrics parser.
+   - Dispatches the JSON payload to the parser registered for it on the `messageRouter`.
 
 3. Metrics parsers:
    - A specific `*MetricsParser` class is selected based on the JSON category.
    - These parser classes extract and format relevant fields from the JSON and export the results
+     through `exporter` (batching, retries, spool and the optional sinks; see README.md).
+
+Housekeeping (timeout sweeps, statistics, self-metrics, latency histograms) is exposed through
+`get_periodic_tasks()`; `get_stats()` and `get_debug_snapshot()` report the collector's state.
 
 -- InfluxDB Point Organization Strategy --
 
@@ -38,6 +58,9 @@ All points adhere to the following tagging and structure conventions:
    - A `_measurement` field defining the metric category.
    - A `_field` field representing the specific metric value.
 
+   Fields of one entity share the measurement, tags and timestamp, so they can be written as
+   one multi-field line (`INFLUX_WIDE_ROWS`) without changing what `_field` queries return.
+
 2. Required tags:
    - `component`: identifies the source subsystem of the metric. Valid values:
      - 'app_monitor', 'cell', 'ru', 'du', 'cu_up', 'rlc'.
@@ -53,15 +76,109 @@ efficient querying, monitoring, and visualization across system components.
 """
 
 
+# (parser attribute, structure attribute) pairs reported by the debug endpoint
+DEBUG_STRUCTURES = (
+    ('cellMetricsParser', 'active_ues'),
+    ('cellMetricsParser', 'ue_last_seen'),
+    ('cellMetricsParser', 'rnti_to_imeisv_cache'),
+    ('cellMetricsParser', 'imeisv_persistent_ues'),
+    ('imeisvParser', 'imeisv_to_rnti'),
+    ('imeisvParser', 'rnti_to_imeisv'),
+    ('imeisvParser', 'imeisv_rnti_history'),
+    ('imeisvParser', 'last_mapping_update'),
+    ('rlcMetricsParser', 'active_drbs'),
+    ('rlcMetricsParser', 'drb_last_seen'),
+    ('rlcMetricsParser', 'drb_keys'),
+    ('rlcMetricsParser', 'rlc_performance_history'),
+    ('cuUpMetricsParser', 'pdcp_performance_history'),
+)
+
+PARSER_NAMES = ('cellMetricsParser', 'duMetricsParser', 'ruMetricsParser', 'appResourceUsageMetricsParser',
+                'cuUpMetricsParser', 'rlcMetricsParser', 'imeisvParser')
+
+
+def build_stats_points(stats: Dict[str, Any], timestamp_ns: Optional[int] = None) -> List[Point]:
+    """Convert a `collector.get_stats()` style dict into collector self-metric points."""
+    points = []
+
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            # Per-parser counters are tagged with the parser name
+            for field, field_value in value.items():
+                if isinstance(field_value, (int, float)) and not isinstance(field_value, bool):
+                    point = Point("collector_parser_metrics").field(field, field_value).tag("parser", key) \
+                        .tag("component", "collector")
+                    if timestamp_ns:
+                        point = point.time(timestamp_ns)
+                    points.append(point)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key != 'start_time':
+            point = Point("collector_metrics").field(key, value).tag("component", "collector")
+            if timestamp_ns:
+                point = point.time(timestamp_ns)
+            points.append(point)
+
+    return points
+
+
+def create_collector(mode: str, reuse_port: bool = False) -> 'collector':
+    """Build the collector runtime selected by COLLECTOR_MODE."""
+    if mode == 'asyncio':
+        from asyncCollector import asyncCollector
+        return asyncCollector(reuse_port=reuse_port)
+    if mode == 'pipeline':
+        from pipelineCollector import pipelineCollector
+        return pipelineCollector(reuse_port=reuse_port)
+
+    return collector(reuse_port=reuse_port)
+
+
 class collector:
-    def __init__(self):
+    def __init__(self, reuse_port: bool = False):
         log_both("=== STARTING METRICS COLLECTOR - INFLUXDB ===")
 
         # Setup UDP socket
         self.server_socket = socket.socket(family=socket.AF_INET, type=socket.SOCK_DGRAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            # Several worker processes bind the same port; the kernel hashes each sender to one of them
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+        # Kernel receive buffer: absorbs bursts while the collector is busy (0 keeps the system default)
+        requested_buffer = int(os.getenv('RECV_SOCKET_BUFFER', '0'))
+        if requested_buffer > 0:
+            granted = set_receive_buffer(self.server_socket, requested_buffer)
+            log_both(f"Requested {requested_buffer} byte socket receive buffer, kernel granted {granted}")
         self.server_socket.bind(("0.0.0.0", 55555))
 
+        # Receive mode: 'recv' reads one datagram per call, 'ring' drains batches into preallocated buffers
+        self.recv_mode = os.getenv('RECV_MODE', 'recv')
+        self.recv_buffer_size = int(os.getenv('RECV_BUFFER_SIZE', '65535'))
+        self.recv_ring_size = int(os.getenv('RECV_RING_SIZE', '64'))
+        self.recv_batch_size = int(os.getenv('RECV_BATCH_SIZE', '64'))
+
+        # Optional raw capture of every received datagram, for offline replay (see replay.py)
+        capture_dir = os.getenv('CAPTURE_DIR', '')
+        self.capture = captureWriter(capture_dir, int(os.getenv('CAPTURE_SEGMENT_BYTES', str(64 * 1024 ** 2))),
+                                     int(os.getenv('CAPTURE_MAX_SEGMENTS', '0'))) if capture_dir else None
+
+        # Housekeeping intervals (seconds)
+        self.sweep_interval = float(os.getenv('UE_SWEEP_INTERVAL', '5'))
+        self.stats_interval = float(os.getenv('STATS_INTERVAL', '600'))
+        self.self_metrics_interval = float(os.getenv('SELF_METRICS_INTERVAL', '10'))
+
+        # Per-stage / per-message-type latency histograms (0 turns the instrumentation off)
+        self.latency_interval = float(os.getenv('LATENCY_METRICS_INTERVAL', '10'))
+        self.latency = latencyRecorder() if self.latency_interval > 0 else None
+
+        # Statistics tracking
+        self.stats = {
+            'datagrams_received': 0,
+            'bytes_received': 0,
+            'datagrams_processed': 0,
+            'decode_errors': 0,
+            'start_time': time.time()
+        }
+
         # Setup cell_collector_id
         self.cell_id = os.getenv('CELL_ID', 'unknown')
         self.cell_name = os.getenv('CELL_NAME', 'Unknown Cell')
@@ -78,58 +195,348 @@ class collector:
         self.rlcMetricsParser = rlcMetricsParser(self.exporter)
         self.imeisvParser = imeisvParser(self.exporter)
 
-    def categorise_and_parse(self, entry: Dict[str, Any]):
+        # Parser registry keyed by message type, in categorisation priority order
+        self.router = messageRouter(disabled=os.getenv('DISABLED_MESSAGE_TYPES', '').split(','))
+        self.router.register('cell_metrics', self.cellMetricsParser.update_metrics)
+        self.router.register('du', self.duMetricsParser.update_metrics)
+        self.router.register('ru', self.ruMetricsParser.update_metrics)
+        self.router.register('app_resource_usage', self.appResourceUsageMetricsParser.update_metrics)
+        self.router.register('cu-up', self.cuUpMetricsParser.update_metrics)
+        self.router.register('rlc_metrics', self.rlcMetricsParser.update_metrics)
+        self.router.register('imeisv', self.imeisvParser.update_metrics)
+
+        # Priority-aware load shedding: drop low-value measurements and message types first under overload
+        self.shedder: Optional[loadShedder] = None
+        if os.getenv('LOAD_SHEDDING', 'false').lower() == 'true':
+            self.shedder = loadShedder(
+                critical_measurements=os.getenv('SHED_CRITICAL_MEASUREMENTS',
+                                                ','.join(DEFAULT_CRITICAL_MEASUREMENTS)).split(','),
+                low_measurements=os.getenv('SHED_LOW_MEASUREMENTS', ','.join(DEFAULT_LOW_MEASUREMENTS)).split(','),
+                critical_types=os.getenv('SHED_CRITICAL_MESSAGE_TYPES', ','.join(DEFAULT_CRITICAL_TYPES)).split(','),
+                low_types=os.getenv('SHED_LOW_MESSAGE_TYPES', ','.join(DEFAULT_LOW_TYPES)).split(','),
+                low_watermark=float(os.getenv('SHED_LOW_WATERMARK', '0.5')),
+                high_watermark=float(os.getenv('SHED_HIGH_WATERMARK', '0.8')),
+                latency_budget=float(os.getenv('SHED_LATENCY_BUDGET_MS', '0')) / 1000)
+            self.socket_buffer = self.server_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            self.shedder.add_signal('socket', self.socket_queue_fill)
+            if self.exporter.writer is not None:
+                self.shedder.add_signal('writer', self.exporter.writer.backlog)
+            self.exporter.attach_shedder(self.shedder)
+
+        # Live JSON view of the collector's internals (0 disables it)
+        debug_port = int(os.getenv('DEBUG_PORT', '0'))
+        self.debug = debugEndpoint(self.get_debug_snapshot, debug_port) if debug_port > 0 else None
+
+    def categorise_and_parse(self, entry: Dict[str, Any], message_type: Optional[str] = None):
         try:
-            if entry.get('cell_metrics') is not None:
-                self.cellMetricsParser.update_metrics(entry)
-                # log_both("cell metrics received and parsed")
-            elif entry.get('du') is not None:
-                self.duMetricsParser.update_metrics(entry)
-                # log_both("du metrics received and parsed")
-            elif entry.get('ru') is not None:
-                self.ruMetricsParser.update_metrics(entry)
-                # log_both("ru metrics received and parsed")
-            elif entry.get('app_resource_usage') is not None:
-                self.appResourceUsageMetricsParser.update_metrics(entry)
-                # log_both("app_resource metrics received and parsed")
-            elif entry.get('cu-up') is not None:
-                self.cuUpMetricsParser.update_metrics(entry)
-                # log_both("cu_up received and parsed")
-            elif entry.get('rlc_metrics') is not None:
-                self.rlcMetricsParser.update_metrics(entry)
-                # log_both("rlc metrics received and parsed")
-            elif entry.get('imeisv') is not None:
-                self.imeisvParser.update_metrics(entry)
-                # log_both(f"Entry details: {entry}")
-            else:
+            message_type = self.router.categorise(entry, message_type)
+            if message_type is None:
+                self.router.unknown_count += 1
                 log_both(f"unknown entry: {entry}", "error")
-                pass
+            elif not self.router.is_enabled(message_type):
+                self.router.filtered[message_type] += 1
+            elif self.latency is None:
+                self.router.dispatch(message_type, entry)
+            else:
+                self.timed_dispatch(message_type, entry)
 
         except Exception as e:
             log_both(f"error categorising data: {entry}", "warning")
 
+    def timed_dispatch(self, message_type: str, entry: Dict[str, Any]):
+        """Dispatch to the parser, splitting its time into parsing and exporter writes."""
+        written_before = self.exporter.write_ns
+        start = time.perf_counter_ns()
+        try:
+            self.router.dispatch(message_type, entry)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            written = self.exporter.write_ns - written_before
+            self.latency.record('parse', message_type, elapsed - written)
+            if written:
+                self.latency.record('write', message_type, written)
+
+    def process_datagram(self, datagram, message_type: Optional[str] = None):
+        """
+        Decode a raw datagram (str, bytes or bytearray) and dispatch it to its parser.
+
+        For bytes the message type is sniffed before decoding, so disabled types are dropped
+        without touching the JSON. Callers that already sniffed the type can pass it in.
+        """
+        latency = self.latency
+        shedder = self.shedder
+        start = time.perf_counter_ns() if latency is not None or shedder is not None else 0
+
+        self.stats['datagrams_processed'] += 1
+        if message_type is None and not isinstance(datagram, str):
+            message_type = self.router.sniff(datagram)
+
+        if not self.router.is_enabled(message_type):
+            self.router.filtered[message_type] += 1
+            return
+
+        if shedder is not None:
+            shedder.update()
+            if message_type is not None and shedder.shed_message(message_type):
+                # Shed datagrams count towards the average too, so shedding brings it down
+                shedder.record_latency((time.perf_counter_ns() - start) / 1e9)
+                return
+
+        try:
+            if latency is None:
+                entry = self.router.decode(message_type, datagram)
+            else:
+                decode_start = time.perf_counter_ns()
+                entry = self.router.decode(message_type, datagram)
+                latency.record('ingest', message_type, decode_start - start)
+                latency.record('decode', message_type, time.perf_counter_ns() - decode_start)
+
+            self.categorise_and_parse(entry, message_type)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.stats['decode_errors'] += 1
+            log_both(f"JSON parse error (total: parse_error_count): {e}", "error")
+        except Exception as e:
+            log_both(f"Unexpected error processing message: {e}", "error")
+
+        if shedder is not None:
+            shedder.record_latency((time.perf_counter_ns() - start) / 1e9)
+
+    def socket_queue_fill(self) -> float:
+        """Bytes waiting in the kernel receive buffer relative to its size (load-shedding signal)."""
+        socket_stats = read_udp_socket_stats(self.server_socket)
+        if not socket_stats:
+            return 0.0
+        return socket_stats['socket_rx_queue_bytes'] / self.socket_buffer
+
+    def sweep_timeouts(self):
+        """Expire stale UEs, IMEISV mappings and RLC DRBs even when no messages are arriving."""
+        disconnected_count = self.cellMetricsParser.check_ue_timeouts()
+        if disconnected_count > 0:
+            log_both(f"Timeout sweep auto-disconnected {disconnected_count} UEs")
+
+        self.imeisvParser.check_mapping_timeouts()
+        self.rlcMetricsParser.check_drb_timeouts()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return collector and per-parser statistics."""
+        stats = dict(self.stats)
+        stats['uptime_seconds'] = time.time() - self.stats['start_time']
+        stats['messages_filtered'] = sum(self.router.filtered.values())
+        stats['messages_unknown'] = self.router.unknown_count
+        stats['socket_receive_buffer'] = self.server_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        if self.exporter.writer is not None:
+            for key, value in self.exporter.writer.get_stats().items():
+                stats[f'writer_{key}'] = value
+        if self.exporter.retry is not None:
+            for key, value in self.exporter.retry.get_stats().items():
+                stats[f'retry_{key}'] = value
+        if self.exporter.spool is not None:
+            for key, value in self.exporter.spool.get_stats().items():
+                stats[f'spool_{key}'] = value
+        if self.exporter.transport is not None:
+            for key, value in self.exporter.transport.get_stats().items():
+                stats[f'transport_{key}'] = value
+        if self.exporter.archive is not None:
+            for key, value in self.exporter.archive.get_stats().items():
+                stats[f'archive_{key}'] = value
+        if self.exporter.latest is not None:
+            for key, value in self.exporter.latest.get_stats().items():
+                stats[f'latest_{key}'] = value
+        for key, value in self.exporter.tag_sets.get_stats().items():
+            stats[f'tag_sets_{key}'] = value
+        if self.shedder is not None:
+            for key, value in self.shedder.get_stats().items():
+                stats[f'shed_{key}'] = value
+
+        # Datagrams the kernel dropped because we did not read them fast enough
+        socket_stats = read_udp_socket_stats(self.server_socket)
+        if socket_stats:
+            stats.update(socket_stats)
+
+        for name in PARSER_NAMES:
+            parser = getattr(self, name)
+            stats[name] = {
+                'message_count': parser.message_count,
+                'parse_error_count': parser.parse_error_count
+            }
+
+        return stats
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Depth of the runtime's internal queues, by queue name (none for the blocking loops)."""
+        return {}
+
+    def get_debug_snapshot(self) -> Dict[str, Any]:
+        """Live view of collector internals for the debug endpoint (runs on its thread)."""
+        stats = self.get_stats()
+        parsers = {}
+        for name in PARSER_NAMES:
+            stats.pop(name, None)
+            parser = getattr(self, name)
+            if hasattr(parser, 'get_stats'):
+                parsers[name] = parser.get_stats()
+            else:
+                parsers[name] = {
+                    'message_count': parser.message_count,
+                    'parse_error_count': parser.parse_error_count
+                }
+
+        structures = {}
+        for parser_name, attribute in DEBUG_STRUCTURES:
+            structures[f'{parser_name}.{attribute}'] = describe_structure(getattr(getattr(self, parser_name), attribute))
+        structures['exporter.tag_sets'] = describe_structure(self.exporter.tag_sets.owners)
+
+        # Points buffered for InfluxDB, waiting for a retry, or spooled to disk
+        backlog = {key: stats.pop(key) for key in list(stats) if key.startswith(('writer_', 'retry_', 'spool_'))}
+
+        return {
+            'collector': stats,
+            'parsers': parsers,
+            'structures': structures,
+            'queues': self.get_queue_stats(),
+            'writer': backlog,
+            'process': process_memory()
+        }
+
+    def log_statistics(self):
+        """Log collection statistics."""
+        stats = self.get_stats()
+
+        log_both("=== COLLECTION STATISTICS ===")
+        for key, value in stats.items():
+            log_both(f"{key}: {value}")
+        log_both("=============================")
+
+    def write_self_metrics(self):
+        """Write the collector's own counters (traffic, kernel drops, per-parser) through the exporter."""
+        points = build_stats_points(self.get_stats(), time.time_ns())
+        if points:
+            self.exporter.write_to_influx(points)
+
+    def write_latency_metrics(self):
+        """Write the latency histograms gathered since the last call as `collector_latency` points."""
+        points = self.latency.to_points(time.time_ns())
+        if points:
+            self.exporter.write_to_influx(points)
+
+    def get_periodic_tasks(self):
+        """Return (name, interval_seconds, callable) for housekeeping that should run on a timer."""
+        return [
+            ("ue_timeout_sweep", self.sweep_interval, self.sweep_timeouts),
+            ("stats_report", self.stats_interval, self.log_statistics),
+            ("self_metrics", self.self_metrics_interval, self.write_self_metrics),
+            ("latency_metrics", self.latency_interval, self.write_latency_metrics),
+            ("capture_flush", 1.0 if self.capture is not None else 0, self.flush_capture),
+        ]
+
+    def run_due_tasks(self, tasks, next_run: Dict[str, float]):
+        """Run every periodic task whose interval has elapsed (for runtimes without their own scheduler)."""
+        current_time = time.time()
+        for name, interval, task in tasks:
+            if interval <= 0 or current_time < next_run[name]:
+                continue
+
+            next_run[name] = current_time + interval
+            try:
+                task()
+            except Exception as e:
+                log_both(f"Periodic task {name} failed: {e}", "error")
+
+    def on_receive(self, datagram, address=None):
+        """Count a datagram straight off the socket and append it to the capture, if enabled."""
+        self.stats['datagrams_received'] += 1
+        self.stats['bytes_received'] += len(datagram)
+        if self.capture is not None:
+            self.capture.write(datagram, address)
+
+    def flush_capture(self):
+        self.capture.flush()
+
+    def shutdown(self):
+        """Flush buffered points and close the capture (end of every runtime's run())."""
+        self.exporter.close()
+        if self.debug is not None:
+            self.debug.close()
+        if self.capture is not None:
+            self.capture.close()
+            log_both(f"Capture closed: {self.capture.get_stats()}")
+
     def run(self):
         # Main loop
         log_both("Starting main collection loop - this is the right one")
 
-        while True:
-            try:
-                line = self.server_socket.recv(1024 ** 2).decode('utf-8', errors='replace')
-                # log_both(line)
+        if self.recv_mode == 'ring':
+            self.run_ring()
+            return
+
+        tasks = self.get_periodic_tasks()
+        next_run = {name: time.time() + interval for name, interval, _ in tasks}
+
+        # Wake up at least once a second so housekeeping runs while no datagrams arrive
+        self.server_socket.settimeout(1.0)
+
+        try:
+            while True:
                 try:
-                    entry = json.loads(line)
-                    self.categorise_and_parse(entry)
-                except json.JSONDecodeError as e:
-                    log_both(f"JSON parse error (total: parse_error_count): {e}", "error")
+                    try:
+                        # Kept as bytes so the router can sniff the message type before decoding
+                        datagram, address = self.server_socket.recvfrom(1024 ** 2)
+                        self.on_receive(datagram, address)
+                        self.process_datagram(datagram)
+                    except socket.timeout:
+                        pass
+
+                    self.run_due_tasks(tasks, next_run)
+
                 except Exception as e:
-                    log_both(f"Unexpected error processing message: {e}", "error")
+                    log_both(f"Socket error: {e}", "error")
 
-            except KeyboardInterrupt:
-                log_both("Shutdown requested")
-                break
-            except Exception as e:
-                log_both(f"Socket error: {e}", "error")
+        except KeyboardInterrupt:
+            log_both("Shutdown requested")
+        finally:
+            self.shutdown()
+
+    def run_ring(self):
+        """Main loop for RECV_MODE=ring: batched recv_into a preallocated buffer ring."""
+        receiver = udpReceiver(self.server_socket, self.recv_buffer_size, self.recv_ring_size,
+                               self.recv_batch_size)
+        log_both(f"Receiving into {receiver.ring_size} x {receiver.buffer_size} byte buffers, "
+                 f"up to {receiver.batch_size} datagrams per wakeup")
+
+        tasks = self.get_periodic_tasks()
+        next_run = {name: time.time() + interval for name, interval, _ in tasks}
+
+        try:
+            while True:
+                try:
+                    for datagram, address in zip(receiver.receive_batch(timeout=1.0), receiver.addresses):
+                        self.on_receive(datagram, address)
+                        # json.loads takes bytes directly; this is the only copy, sized to the datagram
+                        self.process_datagram(bytes(datagram))
+
+                    self.run_due_tasks(tasks, next_run)
+
+                except Exception as e:
+                    log_both(f"Socket error: {e}", "error")
+
+        except KeyboardInterrupt:
+            log_both("Shutdown requested")
+        finally:
+            self.shutdown()
+
+
+def stop_on_sigterm():
+    """Treat SIGTERM (docker stop, pod deletion) like Ctrl-C, so every runtime flushes on the way out."""
+    def handler(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, handler)
 
 
 if __name__ == "__main__":
-    collector().run()
+    stop_on_sigterm()
+    if int(os.getenv('WORKER_COUNT', '1')) > 1:
+        from shardedCollector import shardedCollector
+        shardedCollector().run()
+    else:
+        create_collector(os.getenv('COLLECTOR_MODE', 'blocking')).run()
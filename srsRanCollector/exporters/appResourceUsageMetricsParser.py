@@ -1,9 +1,9 @@
 from collections import defaultdict
 from typing import Dict, Any, Optional
-from datetime import datetime
 from influxdb_client import Point
 from exporters.helper_functions import log_both, safe_numeric, timestamp_to_influx_time
 from exporters.exporter import exporter
+from exporters.messageSchema import appResourceUsageRecord
 
 
 class appResourceUsageMetricsParser:
@@ -12,27 +12,24 @@ class appResourceUsageMetricsParser:
         self.message_count = 0
         self.parse_error_count = 0
 
-        # Expected fields for the app resource usage
-        self.EXPECTED_RESOURCE_FIELDS = {'cpu_usage_percent', 'memory_usage_MB', 'power_consumption_Watts'}
+        # Expected fields (resource fields are declared by messageSchema.appResourceUsageRecord)
         self.EXPECTED_TOP_FIELDS = {'timestamp', 'app_resource_usage'}
 
-    def update_app_resource_metrics(self, usage_metrics: Dict[str, Any], timestamp_dt: Optional[datetime] = None):
+    def update_app_resource_metrics(self, usage_metrics: Dict[str, Any], timestamp_ns: Optional[int] = None):
         """Update app resource usage metrics to InfluxDB."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
+            usage = appResourceUsageRecord.decode(usage_metrics)
+
             # Process each resource metric
-            for field in self.EXPECTED_RESOURCE_FIELDS:
-                value = safe_numeric(usage_metrics.get(field), field)
-                if value is not None:
-                    point = Point("app_resource_usage").field(field, value).tag("component", "app_monitor")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
+            usage_tags = tag_sets.tag_set("app_monitor", component="app_monitor")
+            for field, value in usage.numeric_items():
+                lines.add("app_resource_usage", usage_tags, field, value, timestamp_ns)
 
             # Write to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating app resource usage metrics: {e}", "error")
@@ -46,12 +43,12 @@ class appResourceUsageMetricsParser:
 
         try:
             timestamp = entry.get("timestamp")
-            timestamp_dt = timestamp_to_influx_time(timestamp)
+            timestamp_ns = timestamp_to_influx_time(timestamp)
 
             # Update app resource usage metrics
             app_resource_usage = entry.get("app_resource_usage", {})
             if app_resource_usage:
-                self.update_app_resource_metrics(app_resource_usage, timestamp_dt)
+                self.update_app_resource_metrics(app_resource_usage, timestamp_ns)
 
             # Update system tracking metrics
             self.message_count += 1
@@ -75,8 +72,8 @@ class appResourceUsageMetricsParser:
             )
 
             # Add timestamp to system points
-            if timestamp_dt:
-                system_points = [p.time(timestamp_dt) for p in system_points]
+            if timestamp_ns:
+                system_points = [p.time(timestamp_ns) for p in system_points]
 
             self.exporter.write_to_influx(system_points)
 
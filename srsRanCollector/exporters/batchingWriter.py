@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+from exporters.helper_functions import log_both
+from exporters.lineProtocol import line_count
+
+# Seconds per throughput window; points_per_second covers the previous and the current window
+RATE_WINDOW = 10.0
+
+
+class batchingWriter:
+    """
+    Collects points from every parser and writes them to InfluxDB from a background thread.
+
+    `submit()` only appends to an in-memory buffer, so parsers never wait on the network. The
+    writer thread flushes when any limit is reached:
+        max_points: points buffered
+        max_bytes:  estimated line-protocol size of the buffer (running average bytes per point)
+        linger:     seconds since the oldest buffered point arrived
+
+    The buffer holds at most `max_pending` points; beyond that the oldest are dropped and
+    counted. `close()` flushes whatever is still buffered before stopping the thread.
+
+    Records are `Point`s or line-protocol `bytes` built with `lineBuffer`; a bytes record counts
+    as one point per line and is kept (or dropped) whole.
+    """
+
+    def __init__(self, serialize: Callable[[object], bytes], write_lines: Callable[[List[bytes]], bool],
+                 max_points: int = 5000, max_bytes: int = 1024 ** 2, linger: float = 1.0,
+                 max_pending: int = 100000, name: str = "influx-writer"):
+        self.serialize = serialize
+        self.write_lines = write_lines
+        self.max_points = max(1, max_points)
+        self.max_bytes = max_bytes
+        self.linger = linger
+        self.max_pending = max(self.max_points, max_pending)
+
+        # (record, point count) pairs
+        self.pending = deque()
+        self.pending_points = 0
+        self.oldest_pending = None
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.stopping = False
+        self.flush_requested = False
+        self.idle = threading.Event()
+        self.idle.set()
+
+        # Running estimate of serialized bytes per point, for the byte limit
+        self.average_point_bytes = 100.0
+
+        # Counters
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_errors = 0
+        self.flushes = 0
+        # (time, written points) at the start of the previous and the current throughput window;
+        # advanced by the writer thread and replaced as a whole, so readers never change it
+        started = (time.monotonic(), 0)
+        self.rate_marks = (started, started)
+
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, points: List[object]):
+        """Buffer points for the next flush (never blocks on the network)."""
+        with self.lock:
+            if not self.pending:
+                self.oldest_pending = time.monotonic()
+            for record in points:
+                count = line_count(record)
+                self.pending.append((record, count))
+                self.pending_points += count
+                self.submitted += count
+
+            while self.pending_points > self.max_pending and len(self.pending) > 1:
+                _, count = self.pending.popleft()
+                self.pending_points -= count
+                self.dropped += count
+
+            if self.batch_ready():
+                self.wakeup.notify()
+
+    def batch_ready(self) -> bool:
+        return self.pending_points >= self.max_points or \
+            self.pending_points * self.average_point_bytes >= self.max_bytes
+
+    def take_batch(self) -> List[tuple]:
+        """Remove up to max_points (and about max_bytes) points from the buffer (lock held)."""
+        limit = min(self.max_points, max(1, int(self.max_bytes / self.average_point_bytes)))
+        batch = []
+        points = 0
+        while self.pending and (not batch or points + self.pending[0][1] <= limit):
+            record, count = self.pending.popleft()
+            batch.append((record, count))
+            points += count
+        self.pending_points -= points
+        self.oldest_pending = time.monotonic() if self.pending else None
+        return batch
+
+    def run(self):
+        while True:
+            with self.lock:
+                while not (self.stopping or self.flush_requested or self.batch_ready() or
+                           (self.pending and time.monotonic() - self.oldest_pending >= self.linger)):
+                    timeout = self.linger - (time.monotonic() - self.oldest_pending) if self.pending else None
+                    self.wakeup.wait(timeout)
+
+                if not self.pending:
+                    self.flush_requested = False
+                    self.idle.set()
+                    if self.stopping:
+                        return
+                    continue
+
+                self.idle.clear()
+                batch = self.take_batch()
+
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                self.write_errors += 1
+                log_both(f"Unexpected error writing batch of {len(batch)} records: {e}", "error")
+
+    def write_batch(self, batch: List[tuple]):
+        chunks = []
+        size = 0
+        points = 0
+        for record, count in batch:
+            try:
+                chunk = self.serialize(record)
+            except Exception as e:
+                log_both(f"Dropping point that failed to serialize: {e}", "error")
+                continue
+            if chunk:
+                chunks.append(chunk)
+                size += len(chunk) + 1
+                points += count
+
+        if not chunks:
+            return
+
+        self.average_point_bytes = 0.8 * self.average_point_bytes + 0.2 * (size / points)
+        self.flushes += 1
+        if self.write_lines(chunks):
+            self.written += points
+        else:
+            self.write_errors += 1
+
+        now = time.monotonic()
+        if now - self.rate_marks[1][0] >= RATE_WINDOW:
+            self.rate_marks = (self.rate_marks[1], (now, self.written))
+
+    def points_per_second(self) -> float:
+        """Write throughput over the last one to two `RATE_WINDOW`s (decays to 0 when idle)."""
+        since, written = self.rate_marks[0]
+        elapsed = time.monotonic() - since
+        return round((self.written - written) / elapsed, 1) if elapsed > 0 else 0.0
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Write everything buffered so far; returns False if it did not finish within `timeout`."""
+        with self.lock:
+            self.flush_requested = True
+            self.wakeup.notify()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if not self.pending and self.idle.is_set():
+                    return True
+            self.idle.wait(0.05)
+        return False
+
+    def close(self, timeout: float = 30.0):
+        """Flush pending points and stop the writer thread."""
+        with self.lock:
+            self.stopping = True
+            self.wakeup.notify()
+        self.thread.join(timeout)
+        if self.pending:
+            log_both(f"Writer stopped with {self.pending_points} points still buffered", "warning")
+
+    def backlog(self) -> float:
+        """Fill of the buffer (0 to 1), a load signal for `loadShedder`."""
+        return self.pending_points / self.max_pending
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return writer statistics."""
+        return {
+            "pending_points": self.pending_points,
+            "submitted_points": self.submitted,
+            "written_points": self.written,
+            "dropped_points": self.dropped,
+            "write_errors": self.write_errors,
+            "flushes": self.flushes,
+            "points_per_second": self.points_per_second()
+        }
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class boundedQueue:
+    """
+    Thread-safe bounded FIFO of (message_type, payload) items with an explicit overflow policy.
+
+    Policies:
+        drop_oldest: evict the oldest queued item to make room for the new one
+        drop_newest: reject the new item
+        block:       wait until a consumer makes room (backpressure to the producer)
+
+    Every dropped item is counted against its message type, so overload is visible per type.
+    """
+
+    POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+    def __init__(self, name: str, capacity: int, policy: str = 'drop_oldest'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {self.POLICIES}")
+
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.policy = policy
+
+        self.items = deque()
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+
+        # Counters
+        self.put_count = 0
+        self.dropped: Dict[str, int] = defaultdict(int)
+        self.high_watermark = 0
+
+    def put(self, message_type: str, payload: Any) -> bool:
+        """Queue an item. Returns False if the item itself was dropped."""
+        with self.lock:
+            if len(self.items) >= self.capacity:
+                if self.policy == 'drop_newest':
+                    self.dropped[message_type] += 1
+                    return False
+                elif self.policy == 'drop_oldest':
+                    dropped_type, _ = self.items.popleft()
+                    self.dropped[dropped_type] += 1
+                else:
+                    while len(self.items) >= self.capacity:
+                        self.not_full.wait()
+
+            self.items.append((message_type, payload))
+            self.put_count += 1
+            if len(self.items) > self.high_watermark:
+                self.high_watermark = len(self.items)
+
+            self.not_empty.notify()
+            return True
+
+    def get_batch(self, max_items: int, timeout: Optional[float] = None) -> List[Tuple[str, Any]]:
+        """Wait up to `timeout` seconds for data, then return up to `max_items` queued items."""
+        with self.lock:
+            if not self.items:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self.items:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return []
+                    self.not_empty.wait(remaining)
+
+            batch = []
+            while self.items and len(batch) < max_items:
+                batch.append(self.items.popleft())
+
+            self.not_full.notify_all()
+            return batch
+
+    def fill(self) -> float:
+        """Depth relative to capacity (0 to 1), a load signal for `loadShedder`."""
+        return len(self.items) / self.capacity
+
+    def __len__(self):
+        return len(self.items)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue statistics."""
+        with self.lock:
+            return {
+                "depth": len(self.items),
+                "capacity": self.capacity,
+                "high_watermark": self.high_watermark,
+                "put_count": self.put_count,
+                "dropped": sum(self.dropped.values()),
+                "dropped_by_type": dict(self.dropped)
+            }
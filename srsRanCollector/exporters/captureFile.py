@@ -0,0 +1,219 @@
+import heapq
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from exporters.helper_functions import log_both
+
+"""
+# -- Raw Datagram Capture Files --
+
+Append-only record of every datagram the collector received, for replaying production traffic
+offline (see `replay.py`).
+
+1. Segment layout:
+   - 8 byte file header: `SRSCAP` + 2 byte format version.
+   - One record per datagram: a fixed 32 byte little-endian header (receive time in ns since the
+     epoch, payload length, sender port, 2 pad bytes, sender address as 16 bytes with IPv4 stored
+     IPv4-mapped), then the payload, zero-padded to a multiple of 8 bytes.
+   - Every header therefore starts 8-byte aligned, and a segment can be walked in place through
+     `mmap` with `struct.unpack_from`, without reading it into memory.
+
+2. Rotation:
+   - A new segment (`<prefix>-<YYYYmmdd-HHMMSS>-<seq>.cap`) is started once the current one
+     reaches `segment_bytes`. With `max_segments` set, the oldest segments are deleted so the
+     capture directory stays bounded.
+   - The default prefix contains the process id, so sharded workers never share a segment.
+"""
+
+MAGIC = b"SRSCAP\x00\x01"
+RECORD_HEADER = struct.Struct("<QIH2x16s")
+ALIGNMENT = 8
+PADDING = bytes(ALIGNMENT)
+SEGMENT_SUFFIX = ".cap"
+
+
+def pack_address(address: Optional[Tuple]) -> Tuple[bytes, int]:
+    """Return the 16 byte address field and port for a socket address tuple."""
+    if not address:
+        return bytes(16), 0
+
+    host, port = address[0], address[1]
+    try:
+        return socket.inet_pton(socket.AF_INET6, host), port
+    except OSError:
+        return socket.inet_pton(socket.AF_INET6, f"::ffff:{host}"), port
+
+
+def unpack_address(packed: bytes, port: int) -> Tuple[str, int]:
+    """Inverse of `pack_address`; IPv4-mapped addresses come back in dotted form."""
+    if packed[:12] == b"\x00" * 10 + b"\xff\xff":
+        return socket.inet_ntop(socket.AF_INET, packed[12:]), port
+    return socket.inet_ntop(socket.AF_INET6, packed), port
+
+
+class captureWriter:
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 ** 2, max_segments: int = 0,
+                 prefix: Optional[str] = None, flush_interval: float = 1.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.prefix = prefix or f"capture-{os.getpid()}"
+        self.flush_interval = flush_interval
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Receiver threads write while the housekeeping timer flushes
+        self.lock = threading.Lock()
+        self.segments: List[str] = []
+        self.sequence = 0
+        self.file = None
+        self.segment_size = 0
+        self.last_flush = time.monotonic()
+
+        # Counters
+        self.record_count = 0
+        self.byte_count = 0
+        self.error_count = 0
+
+        self.open_segment()
+
+    def open_segment(self):
+        if self.file is not None:
+            self.file.close()
+
+        self.sequence += 1
+        name = f"{self.prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{self.sequence:06d}{SEGMENT_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        self.file = open(path, "wb", buffering=1024 ** 2)
+        self.file.write(MAGIC)
+        self.segment_size = len(MAGIC)
+        self.segments.append(path)
+        log_both(f"Capturing datagrams to {path}")
+
+        while self.max_segments and len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            try:
+                os.remove(oldest)
+            except OSError as e:
+                log_both(f"Could not remove old capture segment {oldest}: {e}", "warning")
+
+    def write(self, datagram, address: Optional[Tuple] = None, timestamp_ns: Optional[int] = None):
+        """Append one datagram (bytes-like) with its receive time and sender address."""
+        length = len(datagram)
+        packed, port = pack_address(address)
+        header = RECORD_HEADER.pack(timestamp_ns or time.time_ns(), length, port, packed)
+        padding = -length % ALIGNMENT
+
+        with self.lock:
+            try:
+                if self.segment_size + len(header) + length + padding > self.segment_bytes \
+                        and self.segment_size > len(MAGIC):
+                    self.open_segment()
+
+                self.file.write(header)
+                self.file.write(datagram)
+                if padding:
+                    self.file.write(PADDING[:padding])
+            except (OSError, ValueError) as e:
+                self.error_count += 1
+                log_both(f"Capture write failed: {e}", "error")
+                return
+
+            self.segment_size += len(header) + length + padding
+            self.record_count += 1
+            self.byte_count += length
+
+            now = time.monotonic()
+            if now - self.last_flush >= self.flush_interval:
+                self.file.flush()
+                self.last_flush = now
+
+    def flush(self):
+        """Push buffered records to disk (also called from the housekeeping timer)."""
+        with self.lock:
+            try:
+                self.file.flush()
+            except (OSError, ValueError) as e:
+                log_both(f"Capture flush failed: {e}", "error")
+            self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def get_stats(self):
+        """Return capture statistics."""
+        return {
+            "record_count": self.record_count,
+            "byte_count": self.byte_count,
+            "error_count": self.error_count,
+            "segment_count": len(self.segments)
+        }
+
+
+def read_segment(path: str) -> Iterator[Tuple[int, Tuple[str, int], memoryview]]:
+    """
+    Yield (timestamp_ns, sender, payload) for every complete record of one segment.
+
+    Payloads are views into the segment's memory map, so nothing is copied. The map is left for
+    the garbage collector to release because callers may still hold views into it. A record cut
+    short (e.g. the collector was killed mid-write) ends the segment.
+    """
+    with open(path, "rb") as segment_file:
+        if os.fstat(segment_file.fileno()).st_size <= len(MAGIC):
+            return
+        mapped = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a capture segment")
+
+    view = memoryview(mapped)
+    size = len(mapped)
+    offset = len(MAGIC)
+
+    while offset + RECORD_HEADER.size <= size:
+        timestamp_ns, length, port, packed = RECORD_HEADER.unpack_from(mapped, offset)
+        start = offset + RECORD_HEADER.size
+        if start + length > size:
+            break
+
+        yield timestamp_ns, unpack_address(packed, port), view[start:start + length]
+        offset = start + length + (-length % ALIGNMENT)
+
+
+def find_segments(paths: Iterable[str]) -> List[str]:
+    """Expand capture directories into their segment files (files are taken as given)."""
+    segments = []
+    for path in paths:
+        if os.path.isdir(path):
+            segments.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                            if name.endswith(SEGMENT_SUFFIX))
+        else:
+            segments.append(path)
+    return segments
+
+
+def read_capture(paths: Iterable[str]) -> Iterator[Tuple[int, Tuple[str, int], memoryview]]:
+    """
+    Yield the records of every segment under `paths` in receive-time order.
+
+    Segments sharing a prefix (one writer) are read back to back; the streams of different
+    writers (e.g. sharded workers) are merged by timestamp.
+    """
+    writers = {}
+    for segment in find_segments(paths):
+        prefix = os.path.basename(segment).rsplit("-", 3)[0]
+        writers.setdefault(prefix, []).append(segment)
+
+    streams = [(record for segment in sorted(segments) for record in read_segment(segment))
+               for segments in writers.values()]
+    if len(streams) == 1:
+        return streams[0]
+    return heapq.merge(*streams, key=lambda record: record[0])
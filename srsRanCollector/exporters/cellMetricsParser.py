@@ -1,10 +1,12 @@
+import time
 from collections import defaultdict
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, TYPE_CHECKING
-from datetime import datetime, timedelta
 from influxdb_client import InfluxDBClient, Point, WriteOptions
 from exporters.helper_functions import log_both, safe_numeric, timestamp_to_influx_time
 from exporters.exporter import exporter
 from exporters.imeisvParser import imeisvParser
+from exporters.messageSchema import cellRecord, ueRecord
 
 
 class cellMetricsParser:
@@ -26,7 +28,7 @@ class cellMetricsParser:
 
         # UE tracking - now with IMEISV support
         self.active_ues = set()  # Track which RNTIs are currently active
-        self.ue_last_seen = {}  # Track last seen timestamps for each UE {rnti_str: datetime}
+        self.ue_last_seen = {}  # Track when each UE was last seen {rnti_str: time.monotonic()}
         self.ue_timeout_seconds = ue_timeout_seconds
 
         # IMEISV-enhanced tracking
@@ -35,46 +37,7 @@ class cellMetricsParser:
 
         self.event_counter = defaultdict(int)
 
-        # Expected field sets for validation
-        self.EXPECTED_UE_FIELDS = {
-            'pci',
-            'rnti',
-            'cqi',
-            'dl_ri',
-            'ul_ri',
-            'ri',
-            'dl_mcs',
-            'dl_brate',
-            'dl_nof_ok',
-            'dl_nof_nok',
-            'dl_bs',
-            'pusch_snr_db',
-            'pusch_rsrp_db',
-            'pucch_snr_db',
-            'ta_ns',
-            'pusch_ta_ns',
-            'pucch_ta_ns',
-            'srs_ta_ns',
-            'ul_mcs',
-            'ul_brate',
-            'ul_nof_ok',
-            'ul_nof_nok',
-            'last_phr',
-            'bsr',
-            'nof_pucch_f0f1_invalid_harqs',
-            'nof_pucch_f2f3f4_invalid_harqs',
-            'nof_pucch_f2f3f4_invalid_csis',
-            'nof_pusch_invalid_harqs',
-            'nof_pusch_invalid_csis',
-            'avg_ce_delay',
-            'max_ce_delay',
-            'avg_crc_delay',
-            'max_crc_delay',
-            'avg_pusch_harq_delay',
-            'max_pusch_harq_delay',
-            'avg_pucch_harq_delay',
-            'max_pucch_harq_delay'
-        }
+        # Expected field sets for validation (UE and cell fields are declared by messageSchema records)
         self.EXPECTED_EVENT_FIELDS = {'sfn', 'slot_index', 'rnti', 'event_type'}
         self.EXPECTED_TOP_FIELDS = {'timestamp', 'cell_metrics', 'ue_list', 'event_list'}
 
@@ -103,52 +66,45 @@ class cellMetricsParser:
         self.rnti_to_imeisv_cache[rnti] = imeisv
 
     def _clear_rnti_from_cache(self, rnti: int):
-        """Remove RNTI from cache when UE disconnects."""
+        """Remove RNTI from cache (and its interned tag sets) when UE disconnects."""
         if rnti in self.rnti_to_imeisv_cache:
             del self.rnti_to_imeisv_cache[rnti]
+        self.exporter.tag_sets.evict(("ue", str(rnti)))
 
-    def update_cell_metrics(self, cell_metrics: Dict[str, Any], timestamp_dt: Optional[datetime] = None):
+    def update_cell_metrics(self, cell_metrics: Dict[str, Any], timestamp_ns: Optional[int] = None):
         """Update cell-level metrics to InfluxDB."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
+            cell = cellRecord.decode(cell_metrics)
+
             # Handle basic cell metrics
-            for field in ["average_latency", "error_indication_count", "max_latency", "nof_failed_pdcch_allocs",
-                          "nof_failed_uci_allocs"]:
-                value = safe_numeric(cell_metrics.get(field), field)
-                if value is not None:
-                    point = Point("cell_metrics").field(field, value).tag("component", "cell")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
+            cell_tags = tag_sets.tag_set("cell", component="cell")
+            for field, value in cell.numeric_items():
+                lines.add("cell_metrics", cell_tags, field, value, timestamp_ns)
 
             # Handle latency histogram
-            hist = cell_metrics.get("latency_histogram", [])
+            hist = cell.latency_histogram
             if isinstance(hist, list):
                 for i, bucket_val in enumerate(hist[:10]):  # Limit to 10 buckets
                     bucket_val = safe_numeric(bucket_val, f"latency_histogram[{i}]")
                     if bucket_val is not None:
-                        point = Point("cell_metrics") \
-                            .field("latency_histogram_bucket", bucket_val) \
-                            .tag("bucket", str(i)) \
-                            .tag("component", "cell")
-                        if timestamp_dt:
-                            point = point.time(timestamp_dt)
-                        influx_points.append(point)
+                        lines.add("cell_metrics", tag_sets.tag_set("cell", bucket=i, component="cell"),
+                                  "latency_histogram_bucket", bucket_val, timestamp_ns)
 
             # Write all cell metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating cell metrics: {e}", "error")
             self.parse_error_count += 1
 
     def handle_ue_lifecycle_events(self, event_list: List[Dict[str, Any]],
-                                   timestamp_dt: Optional[datetime] = None) -> None:
+                                   timestamp_ns: Optional[int] = None) -> None:
         """Enhanced UE lifecycle event handling with IMEISV awareness."""
         influx_points = []
-        now = timestamp_dt or datetime.utcnow()
+        now = timestamp_ns or time.time_ns()
 
         for event in event_list:
             try:
@@ -176,7 +132,7 @@ class cellMetricsParser:
         if influx_points:
             self.exporter.write_to_influx(influx_points)
 
-    def _process_single_cell_event_enhanced(self, cell_event: Dict[str, Any], now: datetime,
+    def _process_single_cell_event_enhanced(self, cell_event: Dict[str, Any], now: int,
                                             influx_points: List) -> None:
         """Enhanced single cell event processing with IMEISV tracking."""
         if not cell_event:
@@ -211,7 +167,7 @@ class cellMetricsParser:
                 return
 
             self.active_ues.add(rnti_str)
-            self.ue_last_seen[rnti_str] = now
+            self.ue_last_seen[rnti_str] = time.monotonic()
             self.ue_create += 1
 
             # Add to persistent tracking if IMEISV available
@@ -299,7 +255,7 @@ class cellMetricsParser:
                 if imeisv:
                     self.imeisv_persistent_ues.add(imeisv)
 
-            self.ue_last_seen[rnti_str] = now
+            self.ue_last_seen[rnti_str] = time.monotonic()
 
             point = (
                 Point("ue_lifecycle")
@@ -323,11 +279,11 @@ class cellMetricsParser:
             log_both(f"Unknown event type: {event_type} for RNTI {rnti_str}{timing_info}", level="warning")
             self.parse_error_count += 1
 
-    def auto_discover_ue(self, rnti_str: str, timestamp_dt: Optional[datetime] = None):
+    def auto_discover_ue(self, rnti_str: str, timestamp_ns: Optional[int] = None):
         """Enhanced auto-discovery with IMEISV awareness."""
         if rnti_str not in self.active_ues:
             self.active_ues.add(rnti_str)
-            self.ue_last_seen[rnti_str] = timestamp_dt or datetime.utcnow()
+            self.ue_last_seen[rnti_str] = time.monotonic()
             self.ue_auto_discovered += 1
 
             # Check for IMEISV mapping
@@ -348,17 +304,17 @@ class cellMetricsParser:
 
             if imeisv:
                 point = point.tag("imeisv", str(imeisv))
-            if timestamp_dt:
-                point = point.time(timestamp_dt)
+            if timestamp_ns:
+                point = point.time(timestamp_ns)
 
             self.exporter.write_to_influx([point])
 
-    def check_ue_timeouts(self, current_time: Optional[datetime] = None):
-        """Enhanced timeout checking with IMEISV persistence."""
+    def check_ue_timeouts(self, current_time: Optional[float] = None):
+        """Enhanced timeout checking with IMEISV persistence (`current_time` is time.monotonic())."""
         if current_time is None:
-            current_time = datetime.utcnow()
+            current_time = time.monotonic()
 
-        timeout_threshold = timedelta(seconds=self.ue_timeout_seconds)
+        timeout_threshold = self.ue_timeout_seconds
         timed_out_ues = []
         influx_points = []
 
@@ -405,7 +361,7 @@ class cellMetricsParser:
             point = Point("ue_lifecycle").field("event", self.ue_auto_disconnected).tag("event_type",
                                                                                         "auto_disconnected").tag("rnti",
                                                                                                                  rnti_str).tag(
-                "component", "cell").time(current_time)
+                "component", "cell").time(time.time_ns())
 
             if imeisv:
                 point = point.tag("imeisv", str(imeisv))
@@ -418,22 +374,16 @@ class cellMetricsParser:
 
         return len(timed_out_ues)
 
-    def update_ue_metrics(self, ue_list: List[Dict[str, Any]], timestamp_dt: Optional[datetime] = None):
+    def update_ue_metrics(self, ue_list: List[Dict[str, Any]], timestamp_ns: Optional[int] = None):
         """Enhanced UE metrics update with IMEISV correlation."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
             # Write UE counts to InfluxDB (both RNTI and IMEISV based)
-            point = Point("ue_metrics").field("ue_count_rnti", len(ue_list)).tag("component", "cell")
-            if timestamp_dt:
-                point = point.time(timestamp_dt)
-            influx_points.append(point)
-
-            point = Point("ue_metrics").field("ue_count_imeisv", len(self.imeisv_persistent_ues)).tag("component",
-                                                                                                      "cell")
-            if timestamp_dt:
-                point = point.time(timestamp_dt)
-            influx_points.append(point)
+            cell_tags = tag_sets.tag_set("cell", component="cell")
+            lines.add("ue_metrics", cell_tags, "ue_count_rnti", len(ue_list), timestamp_ns)
+            lines.add("ue_metrics", cell_tags, "ue_count_imeisv", len(self.imeisv_persistent_ues), timestamp_ns)
 
             # Track which RNTIs we received data for in this update
             received_rntis = set()
@@ -447,7 +397,8 @@ class cellMetricsParser:
                         continue
 
                     pci = ue.get("pci")
-                    rnti = container.get("rnti")
+                    ue_record = ueRecord.decode(container)
+                    rnti = ue_record.rnti
 
                     if rnti is None:
                         log_both(f"UE container missing RNTI: {container}", "warning")
@@ -462,32 +413,19 @@ class cellMetricsParser:
                     # Auto-discover UE if not already tracked
                     if rnti_str not in self.active_ues:
                         log_both(f"Auto-discovering UE with RNTI {rnti_str} from metrics data", "info")
-                        self.auto_discover_ue(rnti_str, timestamp_dt)
+                        self.auto_discover_ue(rnti_str, timestamp_ns)
                     else:
                         # Update last seen time for existing UE
-                        self.ue_last_seen[rnti_str] = timestamp_dt or datetime.utcnow()
-
-                    # Update all UE metrics for this UE
-                    for field in self.EXPECTED_UE_FIELDS:
-                        if field == "rnti":  # Skip rnti as it's used as a tag
-                            continue
-
-                        value = safe_numeric(container.get(field), field)
-                        if value is not None:
-                            point = Point("ue_metrics").field(field, value).tag("rnti", rnti_str).tag("component",
-                                                                                                      "cell")
+                        self.ue_last_seen[rnti_str] = time.monotonic()
 
-                            if pci is not None:
-                                point = point.tag("pci", str(pci))
-                            if imeisv is not None:
-                                point = point.tag("imeisv", str(imeisv))
-                            if timestamp_dt:
-                                point = point.time(timestamp_dt)
-
-                            influx_points.append(point)
+                    # Update all UE metrics for this UE (pci/imeisv tags are left out when unknown)
+                    ue_tags = tag_sets.tag_set(("ue", rnti_str), rnti=rnti_str, component="cell", pci=pci,
+                                               imeisv=imeisv)
+                    for field, value in ue_record.numeric_items():
+                        lines.add("ue_metrics", ue_tags, field, value, timestamp_ns)
 
                     # Check for unexpected fields
-                    unexpected_fields = set(container.keys()) - self.EXPECTED_UE_FIELDS
+                    unexpected_fields = ue_record.unknown_fields
                     if unexpected_fields:
                         log_both(f"Unexpected UE fields for RNTI {rnti_str}: {unexpected_fields}", "warning")
                         self.parse_error_count += 1
@@ -498,14 +436,13 @@ class cellMetricsParser:
                     continue
 
             # Write all UE metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating UE metrics: {e}", "error")
             self.parse_error_count += 1
 
-    def update_event_metrics(self, event_list: List[Dict[str, Any]], timestamp_dt: Optional[datetime] = None):
+    def update_event_metrics(self, event_list: List[Dict[str, Any]], timestamp_ns: Optional[int] = None):
         """Update event-related metrics with IMEISV correlation."""
         influx_points = []
 
@@ -539,8 +476,8 @@ class cellMetricsParser:
 
                         if imeisv is not None:
                             point = point.tag("imeisv", str(imeisv))
-                        if timestamp_dt:
-                            point = point.time(timestamp_dt)
+                        if timestamp_ns:
+                            point = point.time(timestamp_ns)
 
                         influx_points.append(point)
 
@@ -553,8 +490,8 @@ class cellMetricsParser:
 
                                 if imeisv is not None:
                                     point = point.tag("imeisv", str(imeisv))
-                                if timestamp_dt:
-                                    point = point.time(timestamp_dt)
+                                if timestamp_ns:
+                                    point = point.time(timestamp_ns)
 
                                 influx_points.append(point)
 
@@ -565,8 +502,8 @@ class cellMetricsParser:
 
                             if imeisv is not None:
                                 point = point.tag("imeisv", str(imeisv))
-                            if timestamp_dt:
-                                point = point.time(timestamp_dt)
+                            if timestamp_ns:
+                                point = point.time(timestamp_ns)
 
                             influx_points.append(point)
 
@@ -598,11 +535,10 @@ class cellMetricsParser:
 
         try:
             timestamp = entry.get("timestamp")
-            timestamp_dt = timestamp_to_influx_time(timestamp)
-            current_time = timestamp_dt or datetime.utcnow()
+            timestamp_ns = timestamp_to_influx_time(timestamp)
 
             # STEP 0: Check for UE timeouts and auto-disconnect stale UEs
-            disconnected_count = self.check_ue_timeouts(current_time)
+            disconnected_count = self.check_ue_timeouts()
             if disconnected_count > 0:
                 log_both(f"Auto-disconnected {disconnected_count} UEs due to timeout")
 
@@ -613,7 +549,7 @@ class cellMetricsParser:
                     log_both(f"event_list is not a list: {type(event_list)}", "error")
                     self.parse_error_count += 1
                 else:
-                    self.handle_ue_lifecycle_events(event_list, timestamp_dt)
+                    self.handle_ue_lifecycle_events(event_list, timestamp_ns)
 
             # STEP 2: Update cell metrics
             cell_metrics = entry.get("cell_metrics", {})
@@ -622,7 +558,7 @@ class cellMetricsParser:
                     log_both(f"cell_metrics is not a dict: {type(cell_metrics)}", "error")
                     self.parse_error_count += 1
                 else:
-                    self.update_cell_metrics(cell_metrics, timestamp_dt)
+                    self.update_cell_metrics(cell_metrics, timestamp_ns)
 
             # STEP 3: Update UE metrics (with auto-discovery and IMEISV correlation)
             ue_list = entry.get("ue_list", [])
@@ -630,11 +566,11 @@ class cellMetricsParser:
                 log_both(f"ue_list is not a list: {type(ue_list)}", "error")
                 self.parse_error_count += 1
             else:
-                self.update_ue_metrics(ue_list, timestamp_dt)
+                self.update_ue_metrics(ue_list, timestamp_ns)
 
             # STEP 4: Update event metrics
             if event_list and isinstance(event_list, list):
-                self.update_event_metrics(event_list, timestamp_dt)
+                self.update_event_metrics(event_list, timestamp_ns)
 
             # STEP 5: Update enhanced system metrics
             self.message_count += 1
@@ -667,8 +603,8 @@ class cellMetricsParser:
             ])
 
             # Add timestamp to system points
-            if timestamp_dt:
-                system_points = [p.time(timestamp_dt) for p in system_points]
+            if timestamp_ns:
+                system_points = [p.time(timestamp_ns) for p in system_points]
 
             self.exporter.write_to_influx(system_points)
 
@@ -705,7 +641,8 @@ class cellMetricsParser:
 
     def get_ue_connection_status_enhanced(self):
         """Return enhanced UE connection status with IMEISV correlation."""
-        current_time = datetime.utcnow()
+        current_time = time.monotonic()
+        wall_time = time.time()
         status = {}
 
         for rnti_str in self.active_ues:
@@ -715,9 +652,9 @@ class cellMetricsParser:
             if last_seen:
                 time_since_last_seen = current_time - last_seen
                 status[rnti_str] = {
-                    "last_seen": last_seen.isoformat(),
-                    "seconds_since_last_seen": time_since_last_seen.total_seconds(),
-                    "is_stale": time_since_last_seen.total_seconds() > self.ue_timeout_seconds,
+                    "last_seen": datetime.fromtimestamp(wall_time - time_since_last_seen, timezone.utc).isoformat(),
+                    "seconds_since_last_seen": time_since_last_seen,
+                    "is_stale": time_since_last_seen > self.ue_timeout_seconds,
                     "imeisv": imeisv,
                     "has_imeisv_mapping": imeisv is not None
                 }
@@ -1,9 +1,9 @@
 from collections import defaultdict
-from datetime import datetime
 from typing import Dict, Any, Optional
 from influxdb_client import Point
 
 from exporters.helper_functions import log_both, safe_numeric, timestamp_to_influx_time
+from exporters.messageSchema import pdcpDirectionRecord
 
 
 class cuUpMetricsParser:
@@ -17,10 +17,7 @@ class cuUpMetricsParser:
         self.max_history_length = 50  # Keep last 50 readings for trend analysis
 
         # Expected field sets for validation
-        self.EXPECTED_PDCP_DIRECTION_FIELDS = {
-            'average_latency_us', 'min_latency_us', 'max_latency_us',
-            'average_throughput_Mbps', 'cpu_usage_percent'
-        }
+        # (PDCP DL/UL fields are declared by messageSchema.pdcpDirectionRecord)
         self.EXPECTED_PDCP_FIELDS = {'dl', 'ul'}
         self.EXPECTED_CU_UP_FIELDS = {'pdcp'}
         self.EXPECTED_TOP_FIELDS = {'timestamp', 'cu-up'}
@@ -93,9 +90,10 @@ class cuUpMetricsParser:
             return None
 
     def check_pdcp_performance_thresholds(self, direction: str, metrics: Dict[str, float],
-                                          timestamp_dt: Optional[datetime] = None):
+                                          timestamp_ns: Optional[int] = None):
         """Check PDCP performance against thresholds and generate alerts."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
             alerts = []
@@ -137,42 +135,28 @@ class cuUpMetricsParser:
                 log_both(alert_message, log_level)
 
                 # Write alert to InfluxDB
-                point = Point("cu_up_pdcp_alerts") \
-                    .field("alert_level_numeric", 2 if alert_level == "critical" else 1) \
-                    .tag("direction", direction) \
-                    .tag("alert_level", alert_level) \
-                    .tag("alert_message", alert_message) \
-                    .tag("component", "cu_up")
-
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-
-                influx_points.append(point)
+                lines.add("cu_up_pdcp_alerts",
+                          lines.tag_set(direction=direction, alert_level=alert_level, alert_message=alert_message,
+                                        component="cu_up"),
+                          "alert_level_numeric", 2 if alert_level == "critical" else 1, timestamp_ns)
 
             # Write normal status if no alerts
             if not alerts:
-                point = Point("cu_up_pdcp_alerts") \
-                    .field("alert_level_numeric", 0) \
-                    .tag("direction", direction) \
-                    .tag("alert_level", "normal") \
-                    .tag("component", "cu_up")
-
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-
-                influx_points.append(point)
+                lines.add("cu_up_pdcp_alerts",
+                          tag_sets.tag_set("cu_up", direction=direction, alert_level="normal", component="cu_up"),
+                          "alert_level_numeric", 0, timestamp_ns)
 
             # Write alert metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error checking PDCP performance thresholds for {direction}: {e}", "error")
 
     def calculate_pdcp_derived_metrics(self, dl_metrics: Dict[str, float], ul_metrics: Dict[str, float],
-                                       timestamp_dt: Optional[datetime] = None):
+                                       timestamp_ns: Optional[int] = None):
         """Calculate derived metrics from DL and UL PDCP data."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
             # Calculate total throughput
@@ -181,37 +165,22 @@ class cuUpMetricsParser:
             total_throughput = dl_throughput + ul_throughput
 
             if total_throughput > 0:
-                point = Point("cu_up_pdcp_derived") \
-                    .field("total_throughput_Mbps", total_throughput) \
-                    .tag("metric_type", "throughput") \
-                    .tag("component", "cu_up")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("cu_up_pdcp_derived", tag_sets.tag_set("cu_up", metric_type="throughput", component="cu_up"),
+                          "total_throughput_Mbps", total_throughput, timestamp_ns)
 
             # Calculate throughput asymmetry ratio (DL/UL)
             if ul_throughput > 0 and dl_throughput > 0:
                 asymmetry_ratio = dl_throughput / ul_throughput
-                point = Point("cu_up_pdcp_derived") \
-                    .field("throughput_asymmetry_ratio", asymmetry_ratio) \
-                    .tag("metric_type", "asymmetry") \
-                    .tag("component", "cu_up")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("cu_up_pdcp_derived", tag_sets.tag_set("cu_up", metric_type="asymmetry", component="cu_up"),
+                          "throughput_asymmetry_ratio", asymmetry_ratio, timestamp_ns)
 
             # Calculate total CPU usage
             dl_cpu = dl_metrics.get('cpu_usage_percent', 0)
             ul_cpu = ul_metrics.get('cpu_usage_percent', 0)
             total_cpu = dl_cpu + ul_cpu
 
-            point = Point("cu_up_pdcp_derived") \
-                .field("total_cpu_usage_percent", total_cpu) \
-                .tag("metric_type", "cpu") \
-                .tag("component", "cu_up")
-            if timestamp_dt:
-                point = point.time(timestamp_dt)
-            influx_points.append(point)
+            lines.add("cu_up_pdcp_derived", tag_sets.tag_set("cu_up", metric_type="cpu", component="cu_up"),
+                      "total_cpu_usage_percent", total_cpu, timestamp_ns)
 
             # Calculate latency difference (UL - DL)
             dl_latency = dl_metrics.get('average_latency_us')
@@ -219,93 +188,67 @@ class cuUpMetricsParser:
 
             if dl_latency is not None and ul_latency is not None:
                 latency_diff = ul_latency - dl_latency
-                point = Point("cu_up_pdcp_derived") \
-                    .field("latency_difference_us", latency_diff) \
-                    .tag("metric_type", "latency") \
-                    .tag("component", "cu_up")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("cu_up_pdcp_derived", tag_sets.tag_set("cu_up", metric_type="latency", component="cu_up"),
+                          "latency_difference_us", latency_diff, timestamp_ns)
 
             # Calculate efficiency metrics (throughput per CPU usage)
             if dl_cpu > 0:
                 dl_efficiency = dl_throughput / dl_cpu
-                point = Point("cu_up_pdcp_derived") \
-                    .field("dl_efficiency_mbps_per_cpu_percent", dl_efficiency) \
-                    .tag("metric_type", "efficiency") \
-                    .tag("direction", "dl") \
-                    .tag("component", "cu_up")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("cu_up_pdcp_derived",
+                          tag_sets.tag_set("cu_up", metric_type="efficiency", direction="dl", component="cu_up"),
+                          "dl_efficiency_mbps_per_cpu_percent", dl_efficiency, timestamp_ns)
 
             if ul_cpu > 0:
                 ul_efficiency = ul_throughput / ul_cpu
-                point = Point("cu_up_pdcp_derived") \
-                    .field("ul_efficiency_mbps_per_cpu_percent", ul_efficiency) \
-                    .tag("metric_type", "efficiency") \
-                    .tag("direction", "ul") \
-                    .tag("component", "cu_up")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("cu_up_pdcp_derived",
+                          tag_sets.tag_set("cu_up", metric_type="efficiency", direction="ul", component="cu_up"),
+                          "ul_efficiency_mbps_per_cpu_percent", ul_efficiency, timestamp_ns)
 
             # Write derived metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error calculating PDCP derived metrics: {e}", "error")
 
     def update_pdcp_direction_metrics(self, direction_data: Dict[str, Any], direction: str,
-                                      timestamp_dt: Optional[datetime] = None):
+                                      timestamp_ns: Optional[int] = None):
         """Update PDCP metrics for a specific direction (DL or UL)."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
         current_metrics = {}
 
         try:
+            pdcp_direction = pdcpDirectionRecord.decode(direction_data)
+            metric_tags = tag_sets.tag_set("cu_up", direction=direction, component="cu_up")
+
             # Process all PDCP direction metrics
-            for field in self.EXPECTED_PDCP_DIRECTION_FIELDS:
-                value = safe_numeric(direction_data.get(field), field)
-                if value is not None:
-                    current_metrics[field] = value
-
-                    # Write current value
-                    point = Point("cu_up_pdcp_metrics") \
-                        .field(field, value) \
-                        .tag("direction", direction) \
-                        .tag("component", "cu_up")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
-
-                    # Calculate and write statistics
-                    stats = self.calculate_pdcp_statistics(direction, field, value)
-                    if stats:
-                        for stat_name, stat_value in stats.items():
-                            if stat_value is not None:
-                                stat_point = Point("cu_up_pdcp_statistics") \
-                                    .field(f"{field}_{stat_name}", stat_value) \
-                                    .tag("direction", direction) \
-                                    .tag("metric_type", field) \
-                                    .tag("statistic", stat_name) \
-                                    .tag("component", "cu_up")
-                                if timestamp_dt:
-                                    stat_point = stat_point.time(timestamp_dt)
-                                influx_points.append(stat_point)
+            for field, value in pdcp_direction.numeric_items():
+                current_metrics[field] = value
+
+                # Write current value
+                lines.add("cu_up_pdcp_metrics", metric_tags, field, value, timestamp_ns)
+
+                # Calculate and write statistics
+                stats = self.calculate_pdcp_statistics(direction, field, value)
+                if stats:
+                    for stat_name, stat_value in stats.items():
+                        if stat_value is not None:
+                            lines.add("cu_up_pdcp_statistics",
+                                      tag_sets.tag_set("cu_up", direction=direction, metric_type=field,
+                                                       statistic=stat_name, component="cu_up"),
+                                      f"{field}_{stat_name}", stat_value, timestamp_ns)
 
             # Check for unexpected fields
-            unexpected_fields = set(direction_data.keys()) - self.EXPECTED_PDCP_DIRECTION_FIELDS
+            unexpected_fields = pdcp_direction.unknown_fields
             if unexpected_fields:
                 log_both(f"Unexpected PDCP {direction} fields: {unexpected_fields}", "warning")
 
             # Write PDCP direction metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
             # Check performance thresholds
             # if_current_metrics:
-            #self.check_pdcp_performance_thresholds(direction, current_metrics, timestamp_dt)
+            #self.check_pdcp_performance_thresholds(direction, current_metrics, timestamp_ns)
 
             # log_both(f"PDCP {direction.upper()} metrics updated - "
             #          f"Latency: {current_metrics.get('average_latency_us', 'N/A')}μs, "
@@ -318,7 +261,7 @@ class cuUpMetricsParser:
             log_both(f"Error updating PDCP {direction} metrics: {e}", "error")
             return {}
 
-    def update_pdcp_metrics(self, pdcp_data: Dict[str, Any], timestamp_dt: Optional[datetime] = None):
+    def update_pdcp_metrics(self, pdcp_data: Dict[str, Any], timestamp_ns: Optional[int] = None):
         """Update PDCP protocol metrics."""
         try:
             # Check for unexpected PDCP fields
@@ -332,25 +275,25 @@ class cuUpMetricsParser:
             # Process DL metrics
             dl_data = pdcp_data.get('dl', {})
             if dl_data:
-                dl_metrics = self.update_pdcp_direction_metrics(dl_data, 'dl', timestamp_dt)
+                dl_metrics = self.update_pdcp_direction_metrics(dl_data, 'dl', timestamp_ns)
             else:
                 log_both("PDCP missing DL data", "warning")
 
             # Process UL metrics
             ul_data = pdcp_data.get('ul', {})
             if ul_data:
-                ul_metrics = self.update_pdcp_direction_metrics(ul_data, 'ul', timestamp_dt)
+                ul_metrics = self.update_pdcp_direction_metrics(ul_data, 'ul', timestamp_ns)
             else:
                 log_both("PDCP missing UL data", "warning")
 
             # Calculate derived metrics if we have both DL and UL data
             if dl_metrics and ul_metrics:
-                self.calculate_pdcp_derived_metrics(dl_metrics, ul_metrics, timestamp_dt)
+                self.calculate_pdcp_derived_metrics(dl_metrics, ul_metrics, timestamp_ns)
 
         except Exception as e:
             log_both(f"Error updating PDCP metrics: {e}", "error")
 
-    def update_cu_up_metrics(self, cu_up_data: Dict[str, Any], timestamp_dt: Optional[datetime] = None):
+    def update_cu_up_metrics(self, cu_up_data: Dict[str, Any], timestamp_ns: Optional[int] = None):
         """Update CU-UP level metrics."""
         influx_points = []
 
@@ -370,8 +313,8 @@ class cuUpMetricsParser:
                 .field("pdcp_ul_active", 1 if has_ul else 0) \
                 .field("pdcp_fully_active", 1 if (has_dl and has_ul) else 0) \
                 .tag("component", "cu_up")
-            if timestamp_dt:
-                point = point.time(timestamp_dt)
+            if timestamp_ns:
+                point = point.time(timestamp_ns)
             influx_points.append(point)
 
             # Write CU-UP metrics to InfluxDB
@@ -380,7 +323,7 @@ class cuUpMetricsParser:
 
             # Process PDCP data
             if pdcp_data:
-                self.update_pdcp_metrics(pdcp_data, timestamp_dt)
+                self.update_pdcp_metrics(pdcp_data, timestamp_ns)
             else:
                 log_both("CU-UP missing PDCP data", "warning")
 
@@ -396,12 +339,12 @@ class cuUpMetricsParser:
 
         try:
             timestamp = entry.get("timestamp")
-            timestamp_dt = timestamp_to_influx_time(timestamp)
+            timestamp_ns = timestamp_to_influx_time(timestamp)
 
             # STEP 1: Update CU-UP metrics
             cu_up_data = entry.get("cu-up", {})
             if cu_up_data:
-                self.update_cu_up_metrics(cu_up_data, timestamp_dt)
+                self.update_cu_up_metrics(cu_up_data, timestamp_ns)
             else:
                 log_both("Message missing CU-UP data", "warning")
 
@@ -440,8 +383,8 @@ class cuUpMetricsParser:
             )
 
             # Add timestamp to system points
-            if timestamp_dt:
-                system_points = [p.time(timestamp_dt) for p in system_points]
+            if timestamp_ns:
+                system_points = [p.time(timestamp_ns) for p in system_points]
 
             self.exporter.write_to_influx(system_points)
 
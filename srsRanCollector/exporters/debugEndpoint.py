@@ -0,0 +1,135 @@
+import json
+import resource
+import sys
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from typing import Any, Callable, Dict
+
+from exporters.helper_functions import log_both
+
+"""
+# -- Debug Endpoint --
+
+Serves a JSON snapshot of the collector's internals on `port` (`GET /debug`), so that slow growth
+of the parsers' tracking dictionaries shows up long before the pod is OOM-killed:
+
+    curl -s localhost:8080/debug | jq .structures
+
+The snapshot is built on request by the `snapshot` callable (see `collector.get_debug_snapshot()`)
+on the server's thread, while the parsers keep running. Sizes are therefore a live, unlocked
+view: a structure that changes while it is being measured is retried once and otherwise reported
+with an `error`.
+
+1. `approximate_size()`:
+   - `sys.getsizeof()` of the container plus its keys and values, followed `max_depth` levels
+     down. Only the first `sample` items of each container are measured and the average is
+     extrapolated to its length, so a request costs the same for 100 or 100000 UEs.
+   - Objects shared between structures (interned strings, small ints, tag fragments) are counted
+     in each of them; the figures are for spotting growth, not for summing up the heap.
+
+2. `process_memory()`: resident set size from `/proc/self/status` (current and peak), falling
+   back to `getrusage()` peak RSS where there is no procfs.
+"""
+
+CONTAINERS = (list, tuple, set, frozenset, deque)
+
+
+def approximate_size(value: Any, sample: int = 64, max_depth: int = 4) -> int:
+    """Approximate deep size in bytes of a container (see module docstring)."""
+    size = sys.getsizeof(value)
+    if max_depth <= 0:
+        return size
+
+    if isinstance(value, dict):
+        items = list(islice(value.items(), sample))
+        if items:
+            measured = sum(approximate_size(key, sample, max_depth - 1) +
+                           approximate_size(item, sample, max_depth - 1) for key, item in items)
+            size += measured * len(value) // len(items)
+    elif isinstance(value, CONTAINERS):
+        items = list(islice(value, sample))
+        if items:
+            measured = sum(approximate_size(item, sample, max_depth - 1) for item in items)
+            size += measured * len(value) // len(items)
+    return size
+
+
+def describe_structure(value: Any, sample: int = 64) -> Dict[str, Any]:
+    """Entry count and approximate bytes of one tracked structure."""
+    for attempt in range(2):
+        try:
+            return {"entries": len(value), "approx_bytes": approximate_size(value, sample)}
+        except RuntimeError as e:
+            # Changed size while being measured by the parser thread
+            if attempt:
+                return {"entries": len(value), "error": str(e)}
+
+
+def process_memory() -> Dict[str, int]:
+    """Current and peak resident set size of this process in bytes."""
+    memory = {}
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    memory["rss_bytes"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    memory["peak_rss_bytes"] = int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if "peak_rss_bytes" not in memory:
+        # ru_maxrss is in kilobytes on Linux
+        memory["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    memory["threads"] = threading.active_count()
+    return memory
+
+
+class debugRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/debug"):
+            self.respond(404, {"error": "not found", "paths": ["/debug"]})
+            return
+        try:
+            snapshot = self.server.snapshot()
+        except Exception as e:
+            log_both(f"Debug snapshot failed: {e}", "error")
+            self.respond(500, {"error": str(e)})
+            return
+        self.server.requests += 1
+        self.respond(200, snapshot)
+
+    def respond(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body, indent=1, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        log_both(f"Debug endpoint: {format % args}", "debug")
+
+
+class debugEndpoint:
+    def __init__(self, snapshot: Callable[[], Dict[str, Any]], port: int = 8080):
+        self.server = None
+        self.thread = None
+        try:
+            self.server = ThreadingHTTPServer(("0.0.0.0", port), debugRequestHandler)
+        except OSError as e:
+            log_both(f"Could not serve the debug endpoint on port {port}: {e}", "error")
+            return
+        self.server.daemon_threads = True
+        self.server.snapshot = snapshot
+        self.server.requests = 0
+
+        self.thread = threading.Thread(target=self.server.serve_forever, name="debug-endpoint", daemon=True)
+        self.thread.start()
+        log_both(f"Serving collector internals as JSON on port {port} (/debug)")
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
@@ -1,8 +1,19 @@
 import os
-from typing import List
-from influxdb_client import Point, InfluxDBClient
-from influxdb_client.client.write_api import SYNCHRONOUS
+import time
+from typing import Callable, List, Optional, Union
+from influxdb_client import Point
+from exporters.batchingWriter import batchingWriter
 from exporters.helper_functions import log_both
+from exporters.influxTransport import influxTransport, is_retryable
+from exporters.lineProtocol import PRECISION_DIVISORS, lineBuffer, line_with_tags
+from exporters.loadShedder import loadShedder
+from exporters.retryScheduler import retryScheduler
+from exporters.tagSetRegistry import tagSetRegistry
+from exporters.writeSpool import writeSpool
+from exporters.writerPool import writerPool
+
+# A record handed to write_to_influx: a Point, or line protocol built with `lines` (see lineProtocol)
+Record = Union[Point, bytes]
 
 
 class exporter:
@@ -16,25 +27,224 @@ class exporter:
         self.cell_id = cell_id
         self.cell_name = cell_name
 
+        # Optional hand-off (e.g. a pipeline export queue); when set, write_to_influx defers to it
+        self.handoff: Optional[Callable[[List[Record]], None]] = None
+
+        # Direct line-protocol emission for hot paths: parsers add() lines here and commit()
+        # Wide rows: one multi-field line per entity and timestamp instead of one line per field
+        self.wide_rows = os.getenv("INFLUX_WIDE_ROWS", "false").lower() == "true"
+        # Several writer workers: one record per measurement per commit, so each can be routed whole
+        self.writer_workers = max(1, int(os.getenv("INFLUX_WRITER_WORKERS", "1")))
+        # Timestamps are carried as integer epoch nanoseconds and written at this precision
+        self.write_precision = os.getenv("INFLUX_WRITE_PRECISION", "ns").lower()
+        if self.write_precision not in PRECISION_DIVISORS:
+            log_both(f"Unknown INFLUX_WRITE_PRECISION {self.write_precision!r}, writing nanoseconds", "warning")
+            self.write_precision = "ns"
+        self.time_divisor = PRECISION_DIVISORS[self.write_precision]
+        self.lines = lineBuffer({"source": "srs_ran"}, wide=self.wide_rows, partitioned=self.writer_workers > 1,
+                                precision=self.write_precision)
+        # Tag sets serialized once per UE/DRB/cell and reused until the owner is evicted
+        self.tag_sets = tagSetRegistry(self.lines)
+
+        # Priority load shedding, set by the collector with attach_shedder() (LOAD_SHEDDING)
+        self.shedder: Optional[loadShedder] = None
+
+        # Total time spent in write_to_influx, so callers can separate write time from their own
+        self.write_ns = 0
+
+        # Parquet archive of everything written, next to InfluxDB or (INFLUX_ENABLED=false) instead of it
+        self.influx_enabled = os.getenv("INFLUX_ENABLED", "true").lower() == "true"
+        self.archive = None
+        parquet_dir = os.getenv("PARQUET_DIR", "")
+        if parquet_dir:
+            from exporters.parquetSink import parquetSink
+            self.archive = parquetSink(parquet_dir, self.serialize_point, precision=self.write_precision,
+                                       row_group_rows=int(os.getenv("PARQUET_ROW_GROUP_ROWS", "100000")),
+                                       flush_interval=float(os.getenv("PARQUET_FLUSH_INTERVAL", "60")),
+                                       rotate_seconds=float(os.getenv("PARQUET_ROTATE_SECONDS", "300")),
+                                       compression=os.getenv("PARQUET_COMPRESSION", "zstd"),
+                                       max_pending_lines=int(os.getenv("PARQUET_MAX_PENDING_LINES", "1000000")))
+            log_both(f"Archiving metrics as Parquet under {parquet_dir}")
+
+        # Latest value per series, scraped in Prometheus format; UE/DRB series leave with their tag sets
+        self.latest = None
+        if os.getenv("PROMETHEUS_ENABLED", "false").lower() == "true":
+            from exporters.latestValueStore import latestValueStore
+            self.latest = latestValueStore(self.serialize_point,
+                                           port=int(os.getenv("PROMETHEUS_PORT", "8000")),
+                                           series_ttl=float(os.getenv("PROMETHEUS_SERIES_TTL", "300")))
+            self.tag_sets.on_evict.append(self.latest.evict_tag_sets)
+
+        # Keep-alive connection pool, gzip above INFLUX_GZIP_MIN_BYTES
+        self.transport: Optional[influxTransport] = None
+        if not self.influx_enabled:
+            log_both("InfluxDB writes disabled (INFLUX_ENABLED=false)")
+        else:
+            try:
+                self.transport = influxTransport(self.INFLUX_URL, self.INFLUX_TOKEN, self.INFLUX_ORG,
+                                                 self.INFLUX_BUCKET,
+                                                 gzip_level=int(os.getenv("INFLUX_GZIP_LEVEL", "6")),
+                                                 gzip_min_bytes=int(os.getenv("INFLUX_GZIP_MIN_BYTES", "1024")),
+                                                 pool_size=max(int(os.getenv("INFLUX_POOL_SIZE", "4")),
+                                                               self.writer_workers),
+                                                 precision=self.write_precision,
+                                                 timeout=float(os.getenv("INFLUX_WRITE_TIMEOUT", "10")))
+                log_both("InfluxDB transport initialized successfully")
+            except Exception as e:
+                log_both(f"Failed to initialize InfluxDB transport: {e}", "error")
+                self.transport = None
+
+        # Write-ahead spool: batches that cannot be written wait on disk until InfluxDB recovers
+        self.spool: Optional[writeSpool] = None
+        spool_dir = os.getenv("INFLUX_SPOOL_DIR", "")
+        if spool_dir and self.transport:
+            self.spool = writeSpool(spool_dir, self.transport.write,
+                                    segment_bytes=int(os.getenv("INFLUX_SPOOL_SEGMENT_BYTES", str(16 * 1024 ** 2))),
+                                    max_bytes=int(os.getenv("INFLUX_SPOOL_MAX_BYTES", str(1024 ** 3))),
+                                    replay_rate=float(os.getenv("INFLUX_SPOOL_REPLAY_RATE", "50000")),
+                                    retry_interval=float(os.getenv("INFLUX_SPOOL_RETRY_INTERVAL", "5")))
+
+        # Failed writes are retried from a background thread; give-ups go to the spool if there is one
+        self.retry: Optional[retryScheduler] = None
+        retry_attempts = int(os.getenv("INFLUX_RETRY_ATTEMPTS", "5"))
+        if retry_attempts > 1 and self.transport:
+            self.retry = retryScheduler(self.transport.write, self.spool_chunks if self.spool else None,
+                                        max_attempts=retry_attempts,
+                                        base_delay=float(os.getenv("INFLUX_RETRY_BASE_DELAY", "0.5")),
+                                        max_delay=float(os.getenv("INFLUX_RETRY_MAX_DELAY", "30")),
+                                        max_pending_bytes=int(os.getenv("INFLUX_RETRY_MAX_PENDING_BYTES",
+                                                                        str(64 * 1024 ** 2))))
+
+        # Background batching: parsers only buffer points, one thread (or one per worker, each
+        # owning a share of the measurements) writes them in batches
+        self.writer: Optional[Union[batchingWriter, writerPool]] = None
+        if os.getenv("INFLUX_BATCHING", "true").lower() == "true" and self.transport:
+            writer_options = dict(max_points=int(os.getenv("INFLUX_BATCH_POINTS", "5000")),
+                                  max_bytes=int(os.getenv("INFLUX_BATCH_BYTES", str(1024 ** 2))),
+                                  linger=float(os.getenv("INFLUX_FLUSH_INTERVAL", "1.0")),
+                                  max_pending=int(os.getenv("INFLUX_MAX_PENDING_POINTS", "100000")))
+            if self.writer_workers > 1:
+                self.writer = writerPool(self.serialize_point, self.write_lines, workers=self.writer_workers,
+                                         **writer_options)
+            else:
+                self.writer = batchingWriter(self.serialize_point, self.write_lines, **writer_options)
+
+    def write_to_influx(self, points: List[Record]):
+        """
+        Write points to InfluxDB: via the hand-off if one is set, else the batching writer if enabled.
+
+        The archive and the latest-value store, when enabled, also get the points; with
+        INFLUX_ENABLED=false only they do. While load is shed, `Point`s of shed measurements are
+        dropped here (lines already were, in `lines`).
+        """
+        start = time.perf_counter_ns()
+        shedder = self.shedder
+        if shedder is not None and shedder.shed_measurements:
+            points = shedder.filter_points(points, self.serialize_point)
+            if not points:
+                return
+        if self.archive is not None:
+            self.archive.submit(points)
+        if self.latest is not None:
+            self.latest.submit(points)
+        if not self.influx_enabled:
+            pass
+        elif self.handoff is not None:
+            self.handoff(points)
+        elif self.writer is not None:
+            self.writer.submit(points)
+        else:
+            self.write_points(points)
+        self.write_ns += time.perf_counter_ns() - start
+
+    def attach_shedder(self, shedder: loadShedder):
+        """Shed measurements in the line buffer and here, counting skipped samples in the shedder."""
+        self.shedder = shedder
+        self.lines.shed_counts = shedder.shed_samples
+        shedder.listeners.append(self.lines.set_shed)
+
+    def commit(self):
+        """Write the lines emitted into `lines` since the last commit as one record."""
+        if self.lines:
+            self.write_to_influx(self.lines.take_partitions())
+
+    def write_points(self, points: List[Record]):
+        """Write points to InfluxDB with error handling (blocks until the request completes)."""
+        if not self.transport:
+            log_both("InfluxDB transport not available, skipping write", "warning")
+            return
+
         try:
-            self.influx_client = InfluxDBClient(url=self.INFLUX_URL, token=self.INFLUX_TOKEN, org=self.INFLUX_ORG)
-            self.influx_write_api = self.influx_client.write_api(write_options=SYNCHRONOUS)
-            log_both("InfluxDB client initialized successfully")
+            lines = [self.serialize_point(point) for point in points]
         except Exception as e:
-            log_both(f"Failed to initialize InfluxDB client: {e}", "error")
-            self.influx_client = None
-            self.influx_write_api = None
-
-    def write_to_influx(self, points: List[Point]):
-        """Write points to InfluxDB with error handling."""
-        if not self.influx_write_api:
-            log_both("InfluxDB write API not available, skipping write", "warning")
+            log_both(f"Failed to serialize points for InfluxDB: {e}", "error")
             return
+        if self.write_lines(lines):
+            log_both(f"Successfully wrote {len(points)} points to InfluxDB", "debug")
+
+    def serialize_point(self, point: Record) -> bytes:
+        """
+        Line protocol for one record at the write precision, tagged like emitted lines already are.
+
+        The caller's `Point` is left unchanged: the default tags are added to its serialized line.
+        """
+        if isinstance(point, bytes):
+            return point
+        line = point.to_line_protocol()
+        if not line:
+            return b""
+        return line_with_tags(line, self.lines.default_tags, self.time_divisor).encode()
+
+    def write_lines(self, lines: List[bytes]) -> bool:
+        """
+        Write pre-serialized line protocol chunks in one request; returns False if they were lost.
+
+        Chunks that fail with a retryable error are queued for retry, and, with a spool, spooled once
+        retries give up; both count as handled. While InfluxDB is down (spool) or has asked to
+        back off (Retry-After), new chunks are queued without sending another request.
+        """
+        if self.spool is not None and self.spool.sink_down:
+            return self.spool.append(lines)
+        if self.retry is not None and self.retry.paused():
+            self.retry.schedule(lines, attempts=0)
+            return True
 
         try:
-            for point in points:
-                point.tag("source", "srs_ran")
-            self.influx_write_api.write(bucket=self.INFLUX_BUCKET, org=self.INFLUX_ORG, record=points)
-            log_both(f"Successfully wrote {len(points)} points to InfluxDB", "debug")
+            self.transport.write(lines)
+            log_both(f"Successfully wrote {len(lines)} line-protocol chunks to InfluxDB", "debug")
+            return True
         except Exception as e:
-            log_both(f"Failed to write to InfluxDB: {e}", "error")
+            if self.retry is not None and is_retryable(e):
+                log_both(f"Failed to write {len(lines)} line-protocol chunks to InfluxDB, retrying: {e}", "warning")
+                self.retry.schedule(lines, e)
+                return True
+            if self.spool is not None and is_retryable(e):
+                log_both(f"Failed to write {len(lines)} line-protocol chunks to InfluxDB, spooling: {e}", "warning")
+                return self.spool.append(lines, sink_failed=True)
+            log_both(f"Failed to write {len(lines)} line-protocol chunks to InfluxDB: {e}", "error")
+            return False
+
+    def spool_chunks(self, lines: List[bytes]) -> bool:
+        """Hand chunks the retries gave up on to the spool, marking InfluxDB down."""
+        return self.spool.append(lines, sink_failed=True)
+
+    def close(self):
+        """Flush buffered points (called on shutdown)."""
+        if self.writer is not None:
+            self.writer.close()
+            log_both(f"InfluxDB writer closed: {self.writer.get_stats()}")
+        if self.retry is not None:
+            self.retry.close()
+            log_both(f"InfluxDB retries closed: {self.retry.get_stats()}")
+        if self.spool is not None:
+            self.spool.close()
+            log_both(f"InfluxDB spool closed: {self.spool.get_stats()}")
+        if self.transport is not None:
+            log_both(f"InfluxDB transport closed: {self.transport.get_stats()}")
+            self.transport.close()
+        if self.archive is not None:
+            self.archive.close()
+            log_both(f"Parquet archive closed: {self.archive.get_stats()}")
+        if self.latest is not None:
+            self.latest.close()
+            log_both(f"Latest-value store closed: {self.latest.get_stats()}")
@@ -1,5 +1,4 @@
 import logging
-from datetime import datetime
 from typing import Any, Optional
 
 logging.basicConfig(
@@ -15,17 +14,16 @@ def log_both(message: str, level: str = "info"):
     getattr(logger, level)(message)
 
 
-def timestamp_to_influx_time(timestamp_value: Any) -> Optional[datetime]:
-    """Convert timestamp to InfluxDB-compatible datetime object."""
+def timestamp_to_influx_time(timestamp_value: Any) -> Optional[int]:
+    """Convert a Unix timestamp in seconds to integer nanoseconds since the epoch (UTC)."""
     if timestamp_value is None:
         return None
 
     try:
-        # Assume timestamp is in seconds (Unix timestamp)
-        timestamp_float = float(timestamp_value)
-        return datetime.fromtimestamp(timestamp_float)
-    except (ValueError, TypeError) as e:
-        log_both(f"Error converting timestamp {timestamp_value} to datetime: {e}", "warning")
+        # Microsecond resolution, like the reports carry; the epoch is UTC whatever the local zone
+        return round(float(timestamp_value) * 1_000_000) * 1000
+    except (ValueError, TypeError, OverflowError) as e:
+        log_both(f"Error converting timestamp {timestamp_value} to nanoseconds: {e}", "warning")
         return None
 
 
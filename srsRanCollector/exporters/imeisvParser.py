@@ -1,8 +1,10 @@
+import time
 from typing import Dict, Any, Optional, Set
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from collections import defaultdict
 from influxdb_client import Point
 from exporters.helper_functions import log_both, safe_numeric, timestamp_to_influx_time
+from exporters.messageSchema import ssbCellRecord
 from exporters.exporter import exporter
 
 
@@ -25,8 +27,8 @@ class imeisvParser:
         self.rnti_to_imeisv: Dict[int, int] = {}  # rnti -> imeisv
 
         # Historical tracking
-        self.imeisv_rnti_history: Dict[int, list] = defaultdict(list)  # imeisv -> [(rnti, timestamp), ...]
-        self.last_mapping_update: Dict[int, datetime] = {}  # imeisv -> last_update_time
+        self.imeisv_rnti_history: Dict[int, list] = defaultdict(list)  # imeisv -> [(rnti, timestamp_ns), ...]
+        self.last_mapping_update: Dict[int, float] = {}  # imeisv -> last update (time.monotonic())
 
         # Statistics
         self.message_count = 0
@@ -44,15 +46,15 @@ class imeisvParser:
         # Active tracking
         self.active_imeisvs: Set[int] = set()
 
-    def update_mapping(self, imeisv: int, new_rnti: int, timestamp_dt: Optional[datetime] = None) -> bool:
+    def update_mapping(self, imeisv: int, new_rnti: int, timestamp_ns: Optional[int] = None) -> bool:
         """
         Update IMEISV-to-RNTI mapping and detect handovers.
 
         Returns:
             bool: True if this was a handover (RNTI change), False if new mapping
         """
-        if timestamp_dt is None:
-            timestamp_dt = datetime.utcnow()
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
 
         is_handover = False
         old_rnti = None
@@ -73,7 +75,7 @@ class imeisvParser:
                 log_both(f"Handover detected: IMEISV {imeisv} changed from RNTI {old_rnti} to {new_rnti}")
             else:
                 # Same mapping, just update timestamp
-                self.last_mapping_update[imeisv] = timestamp_dt
+                self.last_mapping_update[imeisv] = time.monotonic()
                 return False
         else:
             # New UE
@@ -84,13 +86,13 @@ class imeisvParser:
         # Update mappings
         self.imeisv_to_rnti[imeisv] = new_rnti
         self.rnti_to_imeisv[new_rnti] = imeisv
-        self.last_mapping_update[imeisv] = timestamp_dt
+        self.last_mapping_update[imeisv] = time.monotonic()
 
         # Ensure IMEISV is in active set (for handovers)
         self.active_imeisvs.add(imeisv)
 
         # Add to history
-        self.imeisv_rnti_history[imeisv].append((new_rnti, timestamp_dt))
+        self.imeisv_rnti_history[imeisv].append((new_rnti, timestamp_ns))
 
         # Keep only last 10 mappings per IMEISV to prevent unbounded growth
         if len(self.imeisv_rnti_history[imeisv]) > 10:
@@ -99,7 +101,7 @@ class imeisvParser:
         self.mapping_updates += 1
 
         # Write mapping event to InfluxDB
-        self._write_mapping_event(imeisv, new_rnti, old_rnti, is_handover, timestamp_dt)
+        self._write_mapping_event(imeisv, new_rnti, old_rnti, is_handover, timestamp_ns)
 
         return is_handover
 
@@ -160,20 +162,21 @@ class imeisvParser:
                  .tag("event_type", "imeisv_removed")
                  .tag("reason", reason)
                  .tag("component", "imeisv_mapper")
-                 .time(datetime.utcnow()))
+                 .time(time.time_ns()))
 
         self.exporter.write_to_influx([point])
 
-    def check_mapping_timeouts(self, current_time: Optional[datetime] = None) -> int:
+    def check_mapping_timeouts(self, current_time: Optional[float] = None) -> int:
         """
         MODIFIED: Remove stale mappings, but respect persistent mode for active_imeisvs.
 
         In persistent mode: Only removes RNTI mappings, not IMEISVs unless no RNTIs remain.
+        `current_time` is time.monotonic().
         """
         if current_time is None:
-            current_time = datetime.utcnow()
+            current_time = time.monotonic()
 
-        timeout_threshold = timedelta(seconds=self.mapping_timeout_seconds)
+        timeout_threshold = self.mapping_timeout_seconds
         timed_out_imeisvs = []
 
         # Find timed out mappings
@@ -198,7 +201,7 @@ class imeisvParser:
         return removed_count
 
     def _write_mapping_event(self, imeisv: int, new_rnti: int, old_rnti: Optional[int],
-                             is_handover: bool, timestamp_dt: datetime):
+                             is_handover: bool, timestamp_ns: int):
         """Write mapping event to InfluxDB."""
         influx_points = []
 
@@ -211,7 +214,7 @@ class imeisvParser:
                  .tag("imeisv", str(imeisv))
                  .tag("event_type", event_type)
                  .tag("component", "imeisv_mapper")
-                 .time(timestamp_dt))
+                 .time(timestamp_ns))
 
         if old_rnti is not None:
             point = point.tag("old_rnti", str(old_rnti))
@@ -223,22 +226,22 @@ class imeisvParser:
             Point("imeisv_stats").field("_measurement", "imeisv_event").field("total_mappings",
                                                                               self.mapping_updates).tag("component",
                                                                                                         "imeisv_mapper").time(
-                timestamp_dt),
+                timestamp_ns),
             Point("imeisv_stats").field("_measurement", "imeisv_event").field("total_handovers",
                                                                               self.handover_detected).tag("component",
                                                                                                           "imeisv_mapper").time(
-                timestamp_dt),
+                timestamp_ns),
             Point("imeisv_stats").field("_measurement", "imeisv_event").field("total_new_ues",
                                                                               self.new_ue_detected).tag("component",
                                                                                                         "imeisv_mapper").time(
-                timestamp_dt),
+                timestamp_ns),
             Point("imeisv_stats").field("_measurement", "imeisv_event").field("active_imeisvs",
                                                                               len(self.active_imeisvs)).tag("component",
                                                                                                             "imeisv_mapper").time(
-                timestamp_dt),
+                timestamp_ns),
             Point("imeisv_stats").field("_measurement", "imeisv_event").field("imeisv_removed_no_rnti",
                                                                               self.imeisv_removed_no_rnti).tag(
-                "component", "imeisv_mapper").time(timestamp_dt)
+                "component", "imeisv_mapper").time(timestamp_ns)
         ]
 
         influx_points.extend(stats_points)
@@ -257,7 +260,7 @@ class imeisvParser:
         if imeisv not in self.last_mapping_update:
             return None
 
-        return (datetime.utcnow() - self.last_mapping_update[imeisv]).total_seconds()
+        return time.monotonic() - self.last_mapping_update[imeisv]
 
     def get_active_rntis_for_imeisv(self, imeisv: int) -> list:
         """NEW METHOD: Get all RNTIs currently associated with an IMEISV."""
@@ -270,11 +273,10 @@ class imeisvParser:
         try:
             # Extract timestamp
             timestamp = entry.get("timestamp")
-            timestamp_dt = timestamp_to_influx_time(timestamp)
-            current_time = timestamp_dt or datetime.utcnow()
+            timestamp_ns = timestamp_to_influx_time(timestamp)
 
             # Check for timeouts (now respects persistent mode)
-            timeout_count = self.check_mapping_timeouts(current_time)
+            timeout_count = self.check_mapping_timeouts()
             if timeout_count > 0:
                 log_both(f"Processed {timeout_count} timed-out IMEISV mappings")
 
@@ -297,17 +299,17 @@ class imeisvParser:
                 return
 
             # Update mapping
-            is_handover = self.update_mapping(imeisv, rnti, timestamp_dt)
+            is_handover = self.update_mapping(imeisv, rnti, timestamp_ns)
 
             # Log additional metrics if present (PCI, measurement data, etc.)
-            self._log_additional_metrics(entry, imeisv, rnti, timestamp_dt)
+            self._log_additional_metrics(entry, imeisv, rnti, timestamp_ns)
 
         except Exception as e:
             log_both(f"Error processing IMEISV mapping message: {e}", "error")
             self.parse_error_count += 1
 
     def _log_additional_metrics(self, entry: Dict[str, Any], imeisv: int, rnti: int,
-                                timestamp_dt: Optional[datetime]):
+                                timestamp_ns: Optional[int]):
         """Log additional measurement data from the IMEISV message."""
         influx_points = []
 
@@ -321,50 +323,46 @@ class imeisvParser:
                          .tag("rnti", str(rnti))
                          .tag("component", "imeisv_mapper"))
 
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
+                if timestamp_ns:
+                    point = point.time(timestamp_ns)
                 influx_points.append(point)
 
             # Log serving cell measurements
             serving_mo_list = entry.get("serving_mo_list", [])
             for serving_cell in serving_mo_list:
                 serving_data = serving_cell.get("serving_cell", {})
-                ssb_cell = serving_data.get("ssb_cell", {})
-
-                for metric in ["rsrp", "rsrq", "sinr"]:
-                    value = safe_numeric(ssb_cell.get(metric), metric)
-                    if value is not None:
-                        point = (Point("ue_measurements")
-                                 .field(f"serving_{metric}", value)
-                                 .tag("imeisv", str(imeisv))
-                                 .tag("rnti", str(rnti))
-                                 .tag("measurement_type", "serving")
-                                 .tag("component", "imeisv_mapper"))
-
-                        if timestamp_dt:
-                            point = point.time(timestamp_dt)
-                        influx_points.append(point)
+                ssb_cell = ssbCellRecord.decode(serving_data.get("ssb_cell", {}))
+
+                for metric, value in ssb_cell.numeric_items():
+                    point = (Point("ue_measurements")
+                             .field(f"serving_{metric}", value)
+                             .tag("imeisv", str(imeisv))
+                             .tag("rnti", str(rnti))
+                             .tag("measurement_type", "serving")
+                             .tag("component", "imeisv_mapper"))
+
+                    if timestamp_ns:
+                        point = point.time(timestamp_ns)
+                    influx_points.append(point)
 
             # Log neighbor cell measurements
             neighbor_cells = entry.get("neighbor_cells", [])
             for neighbor in neighbor_cells:
                 neighbor_pci = neighbor.get("pci")
-                neighbor_ssb = neighbor.get("ssb_cell", {})
-
-                for metric in ["rsrp", "rsrq", "sinr"]:
-                    value = safe_numeric(neighbor_ssb.get(metric), metric)
-                    if value is not None:
-                        point = (Point("ue_measurements")
-                                 .field(f"neighbor_{metric}", value)
-                                 .tag("imeisv", str(imeisv))
-                                 .tag("rnti", str(rnti))
-                                 .tag("neighbor_pci", str(neighbor_pci) if neighbor_pci else "unknown")
-                                 .tag("measurement_type", "neighbor")
-                                 .tag("component", "imeisv_mapper"))
-
-                        if timestamp_dt:
-                            point = point.time(timestamp_dt)
-                        influx_points.append(point)
+                neighbor_ssb = ssbCellRecord.decode(neighbor.get("ssb_cell", {}))
+
+                for metric, value in neighbor_ssb.numeric_items():
+                    point = (Point("ue_measurements")
+                             .field(f"neighbor_{metric}", value)
+                             .tag("imeisv", str(imeisv))
+                             .tag("rnti", str(rnti))
+                             .tag("neighbor_pci", str(neighbor_pci) if neighbor_pci else "unknown")
+                             .tag("measurement_type", "neighbor")
+                             .tag("component", "imeisv_mapper"))
+
+                    if timestamp_ns:
+                        point = point.time(timestamp_ns)
+                    influx_points.append(point)
 
             if influx_points:
                 self.exporter.write_to_influx(influx_points)
@@ -395,13 +393,14 @@ class imeisvParser:
     def get_all_mappings(self) -> Dict[str, Dict[str, Any]]:
         """Get all current mappings with metadata."""
         result = {}
-        current_time = datetime.utcnow()
+        current_time = time.monotonic()
+        wall_time = time.time()
 
         for imeisv, rnti in self.imeisv_to_rnti.items():
             last_update = self.last_mapping_update.get(imeisv)
             age_seconds = None
             if last_update:
-                age_seconds = (current_time - last_update).total_seconds()
+                age_seconds = current_time - last_update
 
             # Get all RNTIs for this IMEISV
             all_rntis = self.get_active_rntis_for_imeisv(imeisv)
@@ -410,7 +409,8 @@ class imeisvParser:
                 "current_rnti": rnti,
                 "all_rntis": all_rntis,
                 "rnti_count": len(all_rntis),
-                "last_update": last_update.isoformat() if last_update else None,
+                "last_update": datetime.fromtimestamp(wall_time - age_seconds, timezone.utc).isoformat()
+                if last_update else None,
                 "age_seconds": age_seconds,
                 "handover_count": len(self.imeisv_rnti_history.get(imeisv, [])),
                 "is_stale": age_seconds > self.mapping_timeout_seconds if age_seconds else False,
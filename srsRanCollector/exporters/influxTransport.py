@@ -0,0 +1,104 @@
+import gzip
+import threading
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+"""
+# -- InfluxDB Write Transport --
+
+Posts line protocol to InfluxDB's `/api/v2/write` endpoint over a `requests.Session` whose
+connection pool keeps up to `pool_size` connections alive between writes, so a batch costs one
+request on an open connection instead of a TCP (and TLS) handshake.
+
+Bodies of at least `gzip_min_bytes` are sent with `Content-Encoding: gzip` at `gzip_level`
+(1-9, 0 disables compression); smaller ones go uncompressed, where the gzip header and CPU time
+outweigh the saving. The transport counts the line-protocol bytes it was given and the bytes it
+actually sent, so `get_stats()` shows the bandwidth saved.
+
+Timestamps in the line protocol are read at `precision` (`ns`, `us`, `ms` or `s`), which must
+match the precision the lines were written at.
+
+`write()` raises on connection errors and non-2xx responses (`requests.HTTPError`, with the
+response attached); callers decide how to log, count or retry.
+"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """False for writes InfluxDB rejected as invalid (4xx other than 429): they would fail again."""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+
+class influxTransport:
+    def __init__(self, url: str, token: str, org: str, bucket: str, gzip_level: int = 6,
+                 gzip_min_bytes: int = 1024, pool_size: int = 4, timeout: float = 10.0, precision: str = "ns"):
+        self.write_url = f"{url.rstrip('/')}/api/v2/write"
+        self.params = {"org": org, "bucket": bucket, "precision": precision}
+        self.gzip_level = max(0, min(9, gzip_level))
+        self.gzip_min_bytes = gzip_min_bytes
+        self.timeout = timeout
+
+        self.headers = {
+            "Authorization": f"Token {token}",
+            "Content-Type": "text/plain; charset=utf-8",
+            "Accept": "application/json"
+        }
+        self.gzip_headers = {**self.headers, "Content-Encoding": "gzip"}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Counters (writes may come from several threads)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failed_requests = 0
+        self.compressed_requests = 0
+        self.bytes_uncompressed = 0
+        self.bytes_sent = 0
+
+    def write(self, chunks: List[bytes]):
+        """POST line-protocol chunks (joined by newlines) in one request."""
+        body = b"\n".join(chunks)
+        size = len(body)
+        headers = self.headers
+        compressed = self.gzip_level > 0 and size >= self.gzip_min_bytes
+        if compressed:
+            body = gzip.compress(body, compresslevel=self.gzip_level)
+            headers = self.gzip_headers
+
+        try:
+            response = self.session.post(self.write_url, params=self.params, data=body, headers=headers,
+                                         timeout=self.timeout)
+            if response.status_code >= 300:
+                raise requests.HTTPError(f"{response.status_code} {response.reason}: {response.text[:200]}",
+                                         response=response)
+        except Exception:
+            with self.lock:
+                self.requests += 1
+                self.failed_requests += 1
+            raise
+
+        with self.lock:
+            self.requests += 1
+            self.compressed_requests += compressed
+            self.bytes_uncompressed += size
+            self.bytes_sent += len(body)
+
+    def close(self):
+        self.session.close()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return transport statistics (bytes count successful writes only)."""
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "failed_requests": self.failed_requests,
+                "compressed_requests": self.compressed_requests,
+                "bytes_uncompressed": self.bytes_uncompressed,
+                "bytes_sent": self.bytes_sent,
+                "compression_ratio": round(self.bytes_uncompressed / self.bytes_sent, 2) if self.bytes_sent else 0.0
+            }
@@ -0,0 +1,108 @@
+from array import array
+from typing import Dict, List, Optional
+
+from influxdb_client import Point
+
+"""
+# -- Hot-Path Latency Histograms --
+
+Fixed log-scale histograms for timing the collector's own stages. Bucket `i` holds samples below
+`2**i` microseconds (bucket 0: under 1 us), up to `2**26` us (~67 s); anything slower lands in the
+overflow bucket. Counts live in a preallocated `array`, and a sample is placed with
+`int.bit_length()`, so recording is a couple of integer operations with nothing allocated.
+
+`latencyRecorder` keeps one histogram per stage and message type. `to_points()` turns every
+histogram that saw samples into a `collector_latency` point and resets it, so each point covers
+one reporting interval.
+"""
+
+BUCKET_COUNT = 27
+BUCKET_BOUNDS_US = tuple(2 ** i for i in range(BUCKET_COUNT))
+
+
+class latencyHistogram:
+    __slots__ = ('counts', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        # One extra slot for samples beyond the last bound
+        self.counts = array('Q', bytes(8 * (BUCKET_COUNT + 1)))
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int):
+        index = (elapsed_ns // 1000).bit_length()
+        self.counts[index if index < BUCKET_COUNT else BUCKET_COUNT] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound (us) of the bucket holding the given fraction of samples."""
+        threshold = fraction * self.count
+        seen = 0
+        for index in range(BUCKET_COUNT):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return float(BUCKET_BOUNDS_US[index])
+        return self.max_ns / 1000
+
+    def reset(self):
+        for index in range(BUCKET_COUNT + 1):
+            self.counts[index] = 0
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class latencyRecorder:
+    def __init__(self):
+        # stage -> message_type -> histogram (nested so a lookup builds no key tuple)
+        self.histograms: Dict[str, Dict[str, latencyHistogram]] = {}
+
+        # Extra tags for every emitted point (e.g. the worker id when sharded)
+        self.tags: Dict[str, str] = {}
+
+    def record(self, stage: str, message_type: Optional[str], elapsed_ns: int):
+        by_type = self.histograms.get(stage)
+        if by_type is None:
+            by_type = self.histograms[stage] = {}
+
+        histogram = by_type.get(message_type)
+        if histogram is None:
+            histogram = by_type[message_type] = latencyHistogram()
+        histogram.record(elapsed_ns)
+
+    def to_points(self, timestamp_ns: int) -> List[Point]:
+        """Return one `collector_latency` point per non-empty histogram and reset them."""
+        points = []
+
+        for stage, by_type in list(self.histograms.items()):
+            for message_type, histogram in list(by_type.items()):
+                if histogram.count:
+                    points.append(self.histogram_point(stage, message_type, histogram, timestamp_ns))
+                    histogram.reset()
+
+        return points
+
+    def histogram_point(self, stage: str, message_type: Optional[str], histogram: latencyHistogram,
+                        timestamp_ns: int) -> Point:
+        point = Point("collector_latency").tag("stage", stage).tag("message_type", message_type or 'unknown') \
+            .tag("component", "collector").time(timestamp_ns)
+        for tag, value in self.tags.items():
+            point.tag(tag, value)
+
+        point.field("count", histogram.count)
+        point.field("mean_us", histogram.total_ns / histogram.count / 1000)
+        point.field("max_us", histogram.max_ns / 1000)
+        point.field("p50_us", histogram.percentile(0.50))
+        point.field("p90_us", histogram.percentile(0.90))
+        point.field("p99_us", histogram.percentile(0.99))
+        for index, bound in enumerate(BUCKET_BOUNDS_US):
+            if histogram.counts[index]:
+                point.field(f"le_{bound}us", histogram.counts[index])
+        if histogram.counts[BUCKET_COUNT]:
+            point.field("le_inf", histogram.counts[BUCKET_COUNT])
+
+        return point
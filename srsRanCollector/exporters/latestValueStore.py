@@ -0,0 +1,229 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Set
+
+from prometheus_client import CollectorRegistry, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+from exporters.helper_functions import log_both
+from exporters.lineProtocol import line_count, parse_fields, parse_series, scan, split_line
+
+"""
+# -- Latest-Value Store and Prometheus Endpoint --
+
+Keeps the most recent value of every measurement, field and tag set the parsers emit and serves
+them in Prometheus text format on `port` (`/metrics`), for consumers that only need current
+values and would otherwise query InfluxDB for them.
+
+1. Updates:
+   - `submit()` only queues records (`Point`s or line protocol); a background thread applies
+     them, newest value per field wins. A series is keyed by its measurement and tag set as
+     written, so the tag fragments interned by `tagSetRegistry` identify it directly.
+   - `evict_tag_sets()` (registered in `tagSetRegistry.on_evict`) drops the series of a released
+     UE or a DRB that stopped reporting. It goes through the same queue, so updates queued
+     before the eviction cannot bring the series back.
+   - Series not updated for `series_ttl` seconds (0 keeps them) are dropped as well; this
+     covers series built from `Point`s, which are not interned.
+
+2. Exposition:
+   - Every numeric or boolean field becomes a gauge `srsran_<measurement>_<field>` labelled with
+     the series' tags (names reduced to `[a-zA-Z0-9_]`); a label a series lacks is empty.
+     String fields are not exported. Sample timestamps are left to the scraper.
+"""
+
+METRIC_PREFIX = "srsran_"
+INVALID_NAME_CHARACTERS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def metric_name(measurement: str, field: str) -> str:
+    return INVALID_NAME_CHARACTERS.sub("_", f"{METRIC_PREFIX}{measurement}_{field}")
+
+
+def label_name(tag: str) -> str:
+    name = INVALID_NAME_CHARACTERS.sub("_", tag)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+class latestValueStore:
+    def __init__(self, serialize: Callable[[object], bytes], port: int = 8000, series_ttl: float = 300.0,
+                 max_pending_lines: int = 1000000):
+        self.serialize = serialize
+        self.series_ttl = series_ttl
+        self.max_pending_lines = max_pending_lines
+
+        # Queued ("records", records, lines) and ("evict", fragments, 0) operations, applied in order
+        self.pending = deque()
+        self.pending_lines = 0
+        self.queue_lock = threading.Lock()
+        self.wakeup = threading.Condition(self.queue_lock)
+        self.stopping = False
+
+        # series -> [measurement, tags, {field: value}, last update (monotonic)]
+        self.series: Dict[str, list] = {}
+        # tag fragment -> series written with it
+        self.by_fragment: Dict[str, Set[str]] = {}
+        self.lock = threading.Lock()
+        self.last_sweep = time.monotonic()
+
+        # Counters
+        self.updates = 0
+        self.dropped_lines = 0
+        self.parse_errors = 0
+        self.evicted_series = 0
+        self.expired_series = 0
+        self.scrapes = 0
+
+        self.thread = threading.Thread(target=self.run, name="latest-values", daemon=True)
+        self.thread.start()
+
+        self.registry = CollectorRegistry(auto_describe=False)
+        self.registry.register(self)
+        self.server = None
+        try:
+            self.server, _ = start_http_server(port, registry=self.registry)
+            log_both(f"Serving latest metric values in Prometheus format on port {port}")
+        except OSError as e:
+            log_both(f"Could not serve Prometheus metrics on port {port}: {e}", "error")
+
+    def submit(self, records: List[object]):
+        """Queue records to update the store (never blocks on the store lock)."""
+        with self.queue_lock:
+            for record in records:
+                count = line_count(record)
+                self.pending.append(("records", record, count))
+                self.pending_lines += count
+            while self.pending_lines > self.max_pending_lines and self.pending[0][0] == "records":
+                _, _, count = self.pending.popleft()
+                self.pending_lines -= count
+                self.dropped_lines += count
+            self.wakeup.notify()
+
+    def evict_tag_sets(self, fragments: List[str]):
+        """Drop every series written with one of these tag fragments (an evicted UE or DRB)."""
+        with self.queue_lock:
+            self.pending.append(("evict", fragments, 0))
+            self.wakeup.notify()
+
+    def run(self):
+        while True:
+            with self.queue_lock:
+                if not self.pending and not self.stopping:
+                    self.wakeup.wait(1.0)
+                operations = self.pending
+                self.pending = deque()
+                self.pending_lines = 0
+                if self.stopping:
+                    return
+
+            for kind, payload, _ in operations:
+                if kind == "records":
+                    self.apply(payload)
+                else:
+                    self.evict(payload)
+
+            if self.series_ttl and time.monotonic() - self.last_sweep >= min(self.series_ttl, 10.0):
+                self.expire()
+
+    def apply(self, record: object):
+        try:
+            text = self.serialize(record).decode()
+        except Exception as e:
+            self.parse_errors += 1
+            log_both(f"Latest-value store could not serialize a record: {e}", "error")
+            return
+
+        now = time.monotonic()
+        with self.lock:
+            for line in text.split("\n"):
+                if not line:
+                    continue
+                try:
+                    series, field_set, _ = split_line(line)
+                    entry = self.series.get(series)
+                    if entry is None:
+                        measurement, tags = parse_series(series)
+                        entry = self.series[series] = [measurement, tags, {}, now]
+                        fragment = series[scan(series, 0, ","):]
+                        self.by_fragment.setdefault(fragment, set()).add(series)
+                    fields = entry[2]
+                    for field, value in parse_fields(field_set).items():
+                        if not isinstance(value, str):
+                            fields[field] = float(value)
+                    entry[3] = now
+                    self.updates += 1
+                except (ValueError, IndexError) as e:
+                    self.parse_errors += 1
+                    log_both(f"Latest-value store could not parse line {line[:120]!r}: {e}", "warning")
+
+    def evict(self, fragments: List[str]):
+        with self.lock:
+            for fragment in fragments:
+                for series in self.by_fragment.pop(fragment, ()):
+                    if self.series.pop(series, None) is not None:
+                        self.evicted_series += 1
+
+    def expire(self):
+        """Drop series that have not been updated for `series_ttl` seconds."""
+        self.last_sweep = time.monotonic()
+        cutoff = self.last_sweep - self.series_ttl
+        with self.lock:
+            stale = [series for series, entry in self.series.items() if entry[3] < cutoff]
+            for series in stale:
+                self.series.pop(series)
+                fragment = series[scan(series, 0, ","):]
+                written = self.by_fragment.get(fragment)
+                if written is not None:
+                    written.discard(series)
+                    if not written:
+                        del self.by_fragment[fragment]
+            self.expired_series += len(stale)
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        """Prometheus collector: one gauge family per measurement and field."""
+        with self.lock:
+            self.scrapes += 1
+            # metric name -> (label names, [(tags, value)])
+            metrics: Dict[str, tuple] = {}
+            for measurement, tags, fields, _ in self.series.values():
+                for field, value in fields.items():
+                    name = metric_name(measurement, field)
+                    metric = metrics.get(name)
+                    if metric is None:
+                        metric = metrics[name] = (set(), [])
+                    metric[0].update(tags)
+                    metric[1].append((tags, value))
+
+        for name, (tag_keys, samples) in metrics.items():
+            keys = sorted(tag_keys)
+            family = GaugeMetricFamily(name, "", labels=[label_name(key) for key in keys])
+            for tags, value in samples:
+                family.add_metric([tags.get(key, "") for key in keys], value)
+            yield family
+
+    def close(self, timeout: float = 5.0):
+        with self.queue_lock:
+            self.stopping = True
+            self.wakeup.notify()
+        self.thread.join(timeout)
+        if self.server is not None:
+            self.server.shutdown()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return store statistics."""
+        with self.lock:
+            return {
+                "series": len(self.series),
+                "values": sum(len(entry[2]) for entry in self.series.values()),
+                "pending_lines": self.pending_lines,
+                "updates": self.updates,
+                "dropped_lines": self.dropped_lines,
+                "parse_errors": self.parse_errors,
+                "evicted_series": self.evicted_series,
+                "expired_series": self.expired_series,
+                "scrapes": self.scrapes
+            }
@@ -0,0 +1,395 @@
+import math
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+"""
+# -- Direct Line-Protocol Serialization --
+
+Builds InfluxDB line protocol without `influxdb_client.Point` objects. A parser registers each
+tag combination once with `tag_set()`, which returns the sorted, escaped tag fragment (with the
+buffer's default tags such as `source=srs_ran` merged in), then calls
+
+    lines.add(measurement, tag_set, field, value, timestamp_ns)
+
+for every value. Each call appends one finished line to a reusable `bytearray`; `take()` hands
+the accumulated lines over as a single newline-separated `bytes` record, which the InfluxDB
+write API (and `batchingWriter`) accept next to `Point`s.
+
+The output is byte-for-byte what `Point.to_line_protocol()` produces for the same data:
+   - measurement, tag keys/values and field keys use the client's escaping,
+   - floats drop a trailing ".0", non-finite floats and None are skipped, ints get an "i" suffix,
+     bools are lowercase, strings are quoted,
+   - timestamps are integer nanoseconds since the epoch (UTC); naive datetimes are taken as UTC.
+
+A buffer created with a coarser `precision` ("us", "ms" or "s") writes its timestamps in that
+unit (truncated), for writes sent with the matching InfluxDB `precision` parameter: a
+second-precision timestamp is 10 digits instead of 19, on every line.
+
+In wide-row mode (`wide=True`) fields are not written as they arrive: every field added for the
+same measurement, tag set and timestamp before the next `take()` is collected into one
+multi-field line, so a message produces one line per UE, DU component, RU direction or DRB
+direction instead of one line per field. InfluxDB stores each field of such a line exactly as if
+it had been written on its own, so queries are unaffected; only the number of lines (and the
+bytes spent repeating measurement, tags and timestamp) changes. A field added twice for the
+same row keeps the last value, as InfluxDB would. Tags are written unchanged, so every series
+keeps its identity; fields whose tag sets differ (e.g. by `metric_type` or `statistic`) stay in
+separate rows.
+
+`split_line()`, `parse_series()` and `parse_fields()` go the other way, for consumers of the
+emitted records (the Parquet archive, the latest-value store); lines without escapes or quoted
+strings take a `str.split()` fast path.
+
+While a `loadShedder` sheds load, lines of the measurements in `shed` are skipped before they are
+formatted and counted in `shed_counts`.
+
+A partitioned buffer (`partitioned=True`) keeps one buffer per measurement, and
+`take_partitions()` returns one record per measurement, so a `writerPool` can route each record
+whole. Lines of one measurement stay in the order they were added.
+"""
+
+ESCAPE_MEASUREMENT = str.maketrans({',': r'\,', ' ': r'\ ', '\n': r'\n', '\t': r'\t', '\r': r'\r'})
+ESCAPE_KEY = str.maketrans({',': r'\,', '=': r'\=', ' ': r'\ ', '\n': r'\n', '\t': r'\t', '\r': r'\r'})
+ESCAPE_STRING = str.maketrans({'"': r'\"', '\\': r'\\'})
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Write precision -> nanoseconds per unit
+PRECISION_DIVISORS = {"ns": 1, "us": 10 ** 3, "ms": 10 ** 6, "s": 10 ** 9}
+
+BOOLEANS = {"t": True, "T": True, "true": True, "True": True, "TRUE": True,
+            "f": False, "F": False, "false": False, "False": False, "FALSE": False}
+
+# str.translate() is slow even when nothing changes, and almost nothing here needs escaping
+NEEDS_MEASUREMENT_ESCAPE = re.compile(r'[, \n\t\r]').search
+NEEDS_KEY_ESCAPE = re.compile(r'[,= \n\t\r]').search
+NEEDS_TAG_VALUE_ESCAPE = re.compile(r'[,= \n\t\r]|\\$').search
+# Escapes the parsers undo; any other backslash is literal text
+ESCAPED_NAME_CHAR = re.compile(r'\\([,= ])')
+ESCAPED_STRING_CHAR = re.compile(r'\\(["\\])')
+
+
+def escape_measurement(measurement: str) -> str:
+    return measurement.translate(ESCAPE_MEASUREMENT) if NEEDS_MEASUREMENT_ESCAPE(measurement) else measurement
+
+
+def escape_key(key: Any) -> str:
+    key = str(key)
+    return key.translate(ESCAPE_KEY) if NEEDS_KEY_ESCAPE(key) else key
+
+
+def escape_tag_value(value: Any) -> str:
+    value = str(value)
+    if not NEEDS_TAG_VALUE_ESCAPE(value):
+        return value
+    escaped = value.translate(ESCAPE_KEY)
+    # A trailing backslash would escape the separator that follows
+    return escaped + ' ' if escaped.endswith('\\') else escaped
+
+
+def tag_fragment(tags: Dict[str, Any]) -> str:
+    """Return ',key=value,...' for the tags (sorted by key, None values skipped)."""
+    fragment = ''
+    for key, value in sorted(tags.items()):
+        if value is None:
+            continue
+        value = escape_tag_value(value)
+        if key and value:
+            fragment += f",{escape_key(key)}={value}"
+    return fragment
+
+
+def format_field_value(value: Any) -> Optional[str]:
+    """Line-protocol representation of a field value, or None if the field is not written."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        text = str(value)
+        return text[:-2] if text.endswith('.0') else text
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return f"{value}i"
+    if isinstance(value, str):
+        return f'"{value.translate(ESCAPE_STRING)}"'
+    raise ValueError(f'Type: "{type(value)}" is not supported.')
+
+
+def timestamp_ns(timestamp: Any) -> int:
+    """Nanoseconds since the epoch for a datetime (naive = UTC) or an int already in nanoseconds."""
+    if isinstance(timestamp, int):
+        return timestamp
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    delta = timestamp - EPOCH
+    return delta.days * 86400 * 10 ** 9 + delta.seconds * 10 ** 9 + delta.microseconds * 10 ** 3
+
+
+def line_with_tags(line: str, tags: Dict[str, Any], divisor: int = 1) -> str:
+    """
+    A single line with `tags` added (replacing tags of the same name, keeping key order) and its
+    nanosecond timestamp, if it has one, converted to the write precision.
+    """
+    series, field_set, timestamp = split_line(line)
+    measurement, line_tags = parse_series(series)
+    line_tags.update(tags)
+    head = f"{escape_measurement(measurement)}{tag_fragment(line_tags)} {field_set}"
+    return head if timestamp is None else f"{head} {int(timestamp) // divisor}"
+
+
+class lineBuffer:
+    """Accumulates line protocol for one or more points until `take()` is called."""
+
+    def __init__(self, default_tags: Optional[Dict[str, Any]] = None, wide: bool = False,
+                 partitioned: bool = False, precision: str = "ns"):
+        self.default_tags = dict(default_tags or {})
+        self.wide = wide
+        self.partitioned = partitioned
+        self.divisor = PRECISION_DIVISORS[precision]
+
+        # Measurements not written while load is shed (see loadShedder), and samples skipped per measurement
+        self.shed: FrozenSet[str] = frozenset()
+        self.shed_counts: Dict[str, int] = defaultdict(int)
+        self.buffer = bytearray()
+        self.count = 0
+
+        # Partitioned mode: measurement -> its buffer (`buffer` is the one lines are added to)
+        self.partitions: Dict[str, bytearray] = {}
+
+        # Wide-row mode: (measurement, tag_set, timestamp) -> {escaped field: formatted value}
+        self.rows: Dict[tuple, Dict[str, str]] = {}
+        self.last_row_key = None
+        self.last_row: Dict[str, str] = {}
+
+        # Consecutive lines nearly always share a measurement/tag set and a timestamp
+        self.last_prefix_key = None
+        self.last_prefix = ''
+        self.last_timestamp = None
+        self.last_time_suffix = ''
+
+    def __len__(self) -> int:
+        return self.count
+
+    def tag_set(self, **tags) -> str:
+        """Serialize a tag combination (plus the default tags) for use with `add()`."""
+        if self.default_tags:
+            tags = {**self.default_tags, **tags}
+        return tag_fragment(tags)
+
+    def prefix(self, measurement: str, tag_set: str) -> str:
+        key = (measurement, tag_set)
+        if key != self.last_prefix_key:
+            self.last_prefix_key = key
+            self.last_prefix = f"{escape_measurement(measurement)}{tag_set} "
+            if self.partitioned:
+                self.buffer = self.partitions.get(measurement)
+                if self.buffer is None:
+                    self.buffer = self.partitions[measurement] = bytearray()
+        return self.last_prefix
+
+    def time_suffix(self, timestamp: Any) -> str:
+        if timestamp is None:
+            return ''
+        if timestamp is not self.last_timestamp:
+            self.last_timestamp = timestamp
+            self.last_time_suffix = f" {timestamp_ns(timestamp) // self.divisor}"
+        return self.last_time_suffix
+
+    def row(self, measurement: str, tag_set: str, timestamp: Any) -> Dict[str, str]:
+        """The fields collected so far for a wide row (created on first use)."""
+        key = (measurement, tag_set, timestamp)
+        if key != self.last_row_key:
+            self.last_row_key = key
+            self.last_row = self.rows.get(key)
+            if self.last_row is None:
+                self.last_row = self.rows[key] = {}
+                self.count += 1
+        return self.last_row
+
+    def add(self, measurement: str, tag_set: str, field: str, value: Any, timestamp: Any = None):
+        """Append a single-field point; skipped (like an empty Point) if the value is not writable."""
+        if self.shed and measurement in self.shed:
+            self.shed_counts[measurement] += 1
+            return
+        value = format_field_value(value)
+        if value is None:
+            return
+        if self.wide:
+            self.row(measurement, tag_set, timestamp)[escape_key(field)] = value
+            return
+        # prefix() may switch `buffer` to another partition, so build the line before appending
+        line = f"{self.prefix(measurement, tag_set)}{escape_key(field)}={value}{self.time_suffix(timestamp)}\n"
+        self.buffer += line.encode()
+        self.count += 1
+
+    def add_fields(self, measurement: str, tag_set: str, fields: Dict[str, Any], timestamp: Any = None):
+        """Append a point with several fields."""
+        if self.shed and measurement in self.shed:
+            self.shed_counts[measurement] += len(fields)
+            return
+        if self.wide:
+            row = None
+            for field, value in fields.items():
+                value = format_field_value(value)
+                if value is not None:
+                    if row is None:
+                        row = self.row(measurement, tag_set, timestamp)
+                    row[escape_key(field)] = value
+            return
+        parts = []
+        for field, value in sorted(fields.items()):
+            value = format_field_value(value)
+            if value is not None:
+                parts.append(f"{escape_key(field)}={value}")
+        if not parts:
+            return
+        line = f"{self.prefix(measurement, tag_set)}{','.join(parts)}{self.time_suffix(timestamp)}\n"
+        self.buffer += line.encode()
+        self.count += 1
+
+    def set_shed(self, measurements: FrozenSet[str]):
+        self.shed = measurements
+
+    def take(self) -> bytes:
+        """Return the buffered lines (newline separated, no trailing newline) and reset the buffer."""
+        if self.partitioned:
+            return b"\n".join(self.take_partitions())
+        if self.rows:
+            self.write_rows()
+        lines = bytes(self.buffer[:-1])
+        self.buffer.clear()
+        self.count = 0
+        return lines
+
+    def take_partitions(self) -> List[bytes]:
+        """Like `take()`, but one record per measurement when the buffer is partitioned."""
+        if not self.partitioned:
+            return [self.take()]
+        if self.rows:
+            self.write_rows()
+        records = []
+        for buffer in self.partitions.values():
+            if buffer:
+                records.append(bytes(buffer[:-1]))
+                buffer.clear()
+        self.count = 0
+        return records
+
+    def write_rows(self):
+        """Render the collected wide rows into the buffer, fields sorted like `Point`."""
+        for (measurement, tag_set, timestamp), fields in self.rows.items():
+            joined = ','.join(f"{field}={fields[field]}" for field in sorted(fields))
+            line = f"{self.prefix(measurement, tag_set)}{joined}{self.time_suffix(timestamp)}\n"
+            self.buffer += line.encode()
+        self.rows = {}
+        self.last_row_key = None
+        self.last_row = {}
+
+
+def line_count(record: Any) -> int:
+    """Number of points in a record handed to the writer: a Point/str line, or a `take()` blob."""
+    if isinstance(record, bytes):
+        return record.count(b'\n') + 1
+    return 1
+
+
+def unescape(text: str) -> str:
+    """Measurement, tag or field key text with its `\\,`, `\\=` and `\\ ` escapes removed."""
+    return ESCAPED_NAME_CHAR.sub(r"\1", text) if "\\" in text else text
+
+
+def parse_field_value(text: str) -> Any:
+    last = text[-1]
+    if last == "i" or last == "u":
+        return int(text[:-1])
+    if text[0] == '"':
+        value = text[1:-1]
+        return ESCAPED_STRING_CHAR.sub(r"\1", value) if "\\" in value else value
+    boolean = BOOLEANS.get(text)
+    if boolean is not None:
+        return boolean
+    return float(text)
+
+
+def scan(line: str, start: int, stops: str) -> int:
+    """Index of the first unescaped character of `stops` at or after `start` (len(line) if none)."""
+    index = start
+    while index < len(line):
+        char = line[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char in stops:
+            return index
+        index += 1
+    return len(line)
+
+
+def split_line(line: str) -> Tuple[str, str, Optional[str]]:
+    """Split a line into (measurement and tags, field set, timestamp or None)."""
+    if "\\" not in line and '"' not in line:
+        parts = line.split(" ")
+        return parts[0], parts[1], parts[2] if len(parts) > 2 else None
+
+    series_end = scan(line, 0, " ")
+    index = series_end + 1
+    # The field set ends at the first unescaped space outside a quoted string value
+    while index < len(line):
+        char = line[index]
+        if char == "\\":
+            index += 2
+        elif char == '"':
+            index += 1
+            while index < len(line) and line[index] != '"':
+                index += 2 if line[index] == "\\" else 1
+            index += 1
+        elif char == " ":
+            break
+        else:
+            index += 1
+    timestamp = line[index + 1:] if index < len(line) else None
+    return line[:series_end], line[series_end + 1:index], timestamp
+
+
+def parse_series(series: str) -> Tuple[str, Dict[str, str]]:
+    """Measurement and tags of the series part of a line."""
+    if "\\" not in series:
+        measurement, *pairs = series.split(",")
+        return measurement, dict(pair.split("=", 1) for pair in pairs)
+
+    end = scan(series, 0, ",")
+    measurement = unescape(series[:end])
+    tags = {}
+    while end < len(series):
+        key_end = scan(series, end + 1, "=")
+        value_end = scan(series, key_end + 1, ",")
+        tags[unescape(series[end + 1:key_end])] = unescape(series[key_end + 1:value_end].rstrip(" "))
+        end = value_end
+    return measurement, tags
+
+
+def parse_fields(field_set: str) -> Dict[str, Any]:
+    if "\\" not in field_set and '"' not in field_set:
+        fields = {}
+        for pair in field_set.split(","):
+            key, value = pair.split("=", 1)
+            fields[key] = parse_field_value(value)
+        return fields
+
+    fields = {}
+    start = 0
+    while start < len(field_set):
+        key_end = scan(field_set, start, "=")
+        index = key_end + 1
+        if index < len(field_set) and field_set[index] == '"':
+            index += 1
+            while index < len(field_set) and field_set[index] != '"':
+                index += 2 if field_set[index] == "\\" else 1
+            index += 1
+        else:
+            index = scan(field_set, index, ",")
+        fields[unescape(field_set[start:key_end])] = parse_field_value(field_set[key_end + 1:index])
+        start = index + 1
+    return fields
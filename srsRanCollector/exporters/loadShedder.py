@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, FrozenSet, Iterable, List
+
+from exporters.helper_functions import log_both
+from exporters.lineProtocol import parse_fields, scan, split_line, unescape
+
+"""
+# -- Priority Load Shedding --
+
+When the collector cannot keep up, sheds the least valuable work first instead of losing
+datagrams and points at random. Measurements (point families) and message types each fall into
+one of three priority classes:
+
+    critical: never shed (UE and cell metrics, lifecycle and IMEISV events, self-metrics)
+    normal:   everything not listed
+    low:      shed first (statistics/trend series, event timing, per-message system metrics)
+
+1. Pressure:
+   - Every registered signal reports a load between 0 and 1: the fill of a queue (kernel socket
+     buffer, pipeline/asyncio queues, writer backlog) or, with a latency budget, the average
+     time spent on one datagram (shed ones included) divided by the budget. Pressure is the highest of them and is
+     re-evaluated every `check_interval` seconds, from the parsing thread.
+
+2. Levels:
+   - 0: nothing is shed.
+   - 1 (pressure >= `low_watermark`): low-priority measurements are not written and
+     low-priority message types are dropped before decoding.
+   - 2 (pressure >= `high_watermark`): normal-priority measurements and message types are shed
+     as well; only critical ones are processed.
+   - A level is left only once pressure falls `hysteresis` below its watermark, so shedding does
+     not flap around a threshold.
+
+3. Accounting:
+   - Every shed sample (one field of a line or of a `Point`) is counted per measurement, and
+     every shed datagram per message type; `get_stats()` reports them with the current level and
+     pressure, so gaps in the data can be matched to shedding.
+   - Dropping a message type also stops it from refreshing the parsers' last-seen tracking: UEs
+     or DRBs only reported by shed types can time out under sustained level 2 overload.
+"""
+
+LEVEL_NAMES = ("none", "low", "normal")
+
+# Defaults for SHED_CRITICAL_MEASUREMENTS / SHED_LOW_MEASUREMENTS and the message-type equivalents
+DEFAULT_CRITICAL_MEASUREMENTS = ("ue_metrics", "cell_metrics", "ue_lifecycle", "event_metrics", "imeisv_mapping",
+                                 "collector_metrics", "collector_parser_metrics", "collector_queue_metrics",
+                                 "collector_latency")
+DEFAULT_LOW_MEASUREMENTS = ("rlc_statistics", "rlc_pull_latency_trends", "cu_up_pdcp_statistics", "event_timing",
+                            "system_metrics", "du_system_metrics", "ru_system_metrics", "cu_up_system_metrics",
+                            "rlc_system_metrics", "imeisv_stats")
+DEFAULT_CRITICAL_TYPES = ("cell_metrics", "imeisv")
+DEFAULT_LOW_TYPES = ("app_resource_usage",)
+
+
+class loadShedder:
+    def __init__(self, critical_measurements: Iterable[str] = (), low_measurements: Iterable[str] = (),
+                 critical_types: Iterable[str] = (), low_types: Iterable[str] = (),
+                 low_watermark: float = 0.5, high_watermark: float = 0.8, hysteresis: float = 0.1,
+                 latency_budget: float = 0.0, check_interval: float = 0.5):
+        self.critical_measurements = {name.strip() for name in critical_measurements if name.strip()}
+        self.low_measurements = {name.strip() for name in low_measurements if name.strip()}
+        self.critical_types = {name.strip() for name in critical_types if name.strip()}
+        self.low_types = {name.strip() for name in low_types if name.strip()}
+        self.watermarks = (low_watermark, max(low_watermark, high_watermark))
+        self.hysteresis = hysteresis
+        self.latency_budget = latency_budget
+        self.check_interval = check_interval
+
+        # name -> callable returning a load between 0 and 1
+        self.signals: Dict[str, Callable[[], float]] = {}
+        self.signal_values: Dict[str, float] = {}
+        # Average seconds spent on one datagram (exponentially weighted)
+        self.average_latency = 0.0
+        if latency_budget > 0:
+            self.signals["latency"] = lambda: self.average_latency / self.latency_budget
+
+        self.level = 0
+        self.pressure = 0.0
+        self.next_check = 0.0
+        # What the current level sheds; replaced (never mutated) so other threads can read them
+        self.shed_measurements: FrozenSet[str] = frozenset()
+        self.shed_types: FrozenSet[str] = frozenset()
+        # Called with the new set of shed measurements on every level change (`lineBuffer.set_shed`)
+        self.listeners: List[Callable[[FrozenSet[str]], None]] = []
+
+        # Counters; samples are shared with the line buffer, which counts the lines it skips.
+        # Datagrams can be shed on the receiver thread too.
+        self.lock = threading.Lock()
+        self.shed_samples: Dict[str, int] = defaultdict(int)
+        self.shed_messages: Dict[str, int] = defaultdict(int)
+        self.level_changes = 0
+        self.shedding_seconds = 0.0
+        self.shedding_since = None
+
+    def add_signal(self, name: str, signal: Callable[[], float]):
+        self.signals[name] = signal
+
+    def record_latency(self, seconds: float):
+        self.average_latency += (seconds - self.average_latency) * 0.05
+
+    def update(self):
+        """Re-evaluate pressure and level if `check_interval` has passed (cheap otherwise)."""
+        now = time.monotonic()
+        if now < self.next_check:
+            return
+        self.next_check = now + self.check_interval
+
+        pressure = 0.0
+        for name, signal in self.signals.items():
+            try:
+                value = signal()
+            except Exception as e:
+                log_both(f"Load-shedding signal {name} failed: {e}", "warning")
+                continue
+            self.signal_values[name] = value
+            pressure = max(pressure, value)
+        self.pressure = pressure
+
+        level = self.level
+        while level < len(self.watermarks) and pressure >= self.watermarks[level]:
+            level += 1
+        while level > 0 and pressure < self.watermarks[level - 1] - self.hysteresis:
+            level -= 1
+        if level != self.level:
+            self.set_level(level, now)
+
+    def set_level(self, level: int, now: float):
+        if self.shedding_since is not None:
+            self.shedding_seconds += now - self.shedding_since
+        self.shedding_since = now if level else None
+
+        previous, self.level = self.level, level
+        self.level_changes += 1
+        # Level 1 sheds the low class, level 2 everything but the critical class
+        if level == 2:
+            self.shed_measurements = allExcept(self.critical_measurements)
+            self.shed_types = allExcept(self.critical_types)
+        elif level == 1:
+            self.shed_measurements = frozenset(self.low_measurements)
+            self.shed_types = frozenset(self.low_types)
+        else:
+            self.shed_measurements = frozenset()
+            self.shed_types = frozenset()
+        for listener in self.listeners:
+            listener(self.shed_measurements)
+
+        signals = ", ".join(f"{name} {value:.2f}" for name, value in self.signal_values.items())
+        log_both(f"Load shedding {LEVEL_NAMES[previous]} -> {LEVEL_NAMES[level]} at pressure "
+                 f"{self.pressure:.2f} ({signals})", "warning" if level > previous else "info")
+
+    def shed_message(self, message_type: str) -> bool:
+        """True (and counted) if a datagram of this type is shed at the current level."""
+        if message_type in self.shed_types:
+            with self.lock:
+                self.shed_messages[message_type] += 1
+            return True
+        return False
+
+    def filter_points(self, points: List[object], serialize: Callable[[object], bytes]) -> List[object]:
+        """
+        Drop (and count) `Point`s of shed measurements; line-protocol records pass through.
+
+        Points are classified by their `serialize`d line, and the ones kept are returned serialized
+        so the writers do not serialize them again.
+        """
+        shed = self.shed_measurements
+        kept = []
+        for point in points:
+            if isinstance(point, bytes):
+                kept.append(point)
+                continue
+            try:
+                line = serialize(point)
+            except Exception:
+                # Kept as is: the writer drops and reports records that fail to serialize
+                kept.append(point)
+                continue
+            if not line:
+                continue
+            series, field_set, _ = split_line(line.decode())
+            measurement = unescape(series[:scan(series, 0, ",")])
+            if measurement in shed:
+                self.shed_samples[measurement] += len(parse_fields(field_set)) or 1
+            else:
+                kept.append(line)
+        return kept
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return level, pressure and shed counts as flat counters."""
+        stats = {
+            "level": self.level,
+            "pressure": round(self.pressure, 3),
+            "level_changes": self.level_changes,
+            "shedding_seconds": round(self.shedding_seconds + (time.monotonic() - self.shedding_since
+                                                               if self.shedding_since is not None else 0.0), 1),
+            "samples": sum(self.shed_samples.values()),
+            "messages": sum(self.shed_messages.values())
+        }
+        for name, value in self.signal_values.items():
+            stats[f"signal_{name}"] = round(value, 3)
+        for measurement, count in list(self.shed_samples.items()):
+            stats[f"samples_{measurement}"] = count
+        with self.lock:
+            for message_type, count in self.shed_messages.items():
+                stats[f"messages_{message_type}"] = count
+        return stats
+
+
+class allExcept(frozenset):
+    """Set of every name except the given ones (membership inverted), shed at level 2."""
+
+    def __contains__(self, name) -> bool:
+        return not frozenset.__contains__(self, name)
+
+    def __bool__(self) -> bool:
+        return True
@@ -0,0 +1,88 @@
+import json
+import re
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+# `{"timestamp": <number>, "<type>": ...` or `{"<type>": ...` at the start of a datagram
+LEADING_KEYS = re.compile(rb'\s*\{\s*"([^"\\]+)"\s*:\s*(?:[-+0-9.eE]+\s*,\s*"([^"\\]+)")?')
+
+# The category key follows "timestamp" at the start of every srsRAN message
+SNIFF_BYTES = 256
+
+
+class messageRouter:
+    """
+    Registry of message handlers keyed by message type (the top-level JSON key that identifies it).
+
+    The type of a raw datagram is read from its bytes before any JSON decoding: the first key after
+    `{` (skipping a leading numeric "timestamp"), falling back to a scan of the first bytes for a
+    registered `"<type>"` key. Disabled types can therefore be dropped without decoding, and each
+    type can have its own decoder.
+
+    Registration order is the categorisation priority used when a decoded entry has to be
+    categorised by its keys.
+    """
+
+    def __init__(self, disabled: Iterable[str] = ()):
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self.decoders: Dict[str, Callable[[Union[bytes, str]], Any]] = {}
+        self.markers = []
+        self.disabled = {message_type.strip() for message_type in disabled if message_type.strip()}
+
+        # Counters
+        self.routed = defaultdict(int)
+        self.filtered = defaultdict(int)
+        self.unknown_count = 0
+
+    def register(self, message_type: str, handler: Callable[[Dict[str, Any]], Any],
+                 decoder: Callable[[Union[bytes, str]], Any] = json.loads):
+        """Route messages of `message_type` to `handler`, decoding them with `decoder`."""
+        self.handlers[message_type] = handler
+        self.decoders[message_type] = decoder
+        self.markers.append((message_type, f'"{message_type}"'.encode()))
+
+    def is_enabled(self, message_type: Optional[str]) -> bool:
+        return message_type not in self.disabled
+
+    def sniff(self, datagram: Union[bytes, bytearray, memoryview]) -> Optional[str]:
+        """Return the registered message type of a raw datagram, or None if it cannot be told."""
+        match = LEADING_KEYS.match(datagram)
+        if match:
+            key = match.group(1).decode()
+            if key == 'timestamp' and match.group(2):
+                key = match.group(2).decode()
+            if key in self.handlers:
+                return key
+
+        head = bytes(datagram[:SNIFF_BYTES])
+        for message_type, marker in self.markers:
+            if marker in head:
+                return message_type
+        return None
+
+    def decode(self, message_type: Optional[str], datagram: Union[bytes, str]) -> Any:
+        """Decode a datagram with the decoder registered for its type (json.loads if unknown)."""
+        return self.decoders.get(message_type, json.loads)(datagram)
+
+    def categorise(self, entry: Dict[str, Any], message_type: Optional[str] = None) -> Optional[str]:
+        """Confirm a sniffed type against the decoded entry, or find the type from its keys."""
+        if message_type is not None and entry.get(message_type) is not None:
+            return message_type
+
+        for registered_type in self.handlers:
+            if entry.get(registered_type) is not None:
+                return registered_type
+        return None
+
+    def dispatch(self, message_type: str, entry: Dict[str, Any]):
+        self.routed[message_type] += 1
+        self.handlers[message_type](entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return router statistics."""
+        return {
+            "routed": dict(self.routed),
+            "filtered": dict(self.filtered),
+            "unknown_count": self.unknown_count,
+            "disabled": sorted(self.disabled)
+        }
@@ -0,0 +1,347 @@
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+from exporters.helper_functions import safe_numeric
+
+"""
+# -- srsRAN Message Schema --
+
+Typed, slotted records for the leaf objects of every srsRAN message type. Parsers used to probe
+each leaf dict once per expected field (`safe_numeric(data.get(field), field)` for every entry of
+an `EXPECTED_*_FIELDS` set, then a set difference for unexpected keys). `record.decode(data)`
+instead walks the keys actually present once, and in that single pass:
+   - coerces numeric fields (`Optional[float]` annotations) with `safe_numeric` semantics,
+     taking a fast path for plain int/float values,
+   - stores structural fields (nested dicts, lists, tag values) unchanged,
+   - collects anything else into `unknown_fields`.
+
+Records compare and print like normal dataclasses; `numeric_items()` yields the coerced values
+that are present, in declaration order.
+"""
+
+
+@dataclass(slots=True)
+class record:
+    unknown_fields: Optional[Set[str]] = None
+
+    NUMERIC_FIELDS: ClassVar[Tuple[str, ...]] = ()
+    NUMERIC_SET: ClassVar[FrozenSet[str]] = frozenset()
+    KNOWN_SET: ClassVar[FrozenSet[str]] = frozenset()
+
+    @classmethod
+    def decode(cls, data: Dict[str, Any]) -> 'record':
+        """Decode one JSON object into this record type."""
+        decoded = cls()
+        numeric = cls.NUMERIC_SET
+        known = cls.KNOWN_SET
+        unknown = None
+
+        for key, value in data.items():
+            if key in numeric:
+                value_type = type(value)
+                if value_type is not float:
+                    value = float(value) if value_type is int else safe_numeric(value, key)
+                setattr(decoded, key, value)
+            elif key in known:
+                setattr(decoded, key, value)
+            else:
+                if unknown is None:
+                    unknown = set()
+                unknown.add(key)
+
+        decoded.unknown_fields = unknown
+        return decoded
+
+    def numeric_items(self) -> Iterator[Tuple[str, float]]:
+        """Yield (field, value) for every numeric field that was present and convertible."""
+        for name in self.NUMERIC_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                yield name, value
+
+
+def schema(cls):
+    """Make `cls` a slotted dataclass record and index its fields for `record.decode`."""
+    cls = dataclass(slots=True)(cls)
+    own_fields = [f for f in fields(cls) if f.name != 'unknown_fields']
+    cls.NUMERIC_FIELDS = tuple(f.name for f in own_fields if f.type == Optional[float])
+    cls.NUMERIC_SET = frozenset(cls.NUMERIC_FIELDS)
+    cls.KNOWN_SET = frozenset(f.name for f in own_fields)
+    return cls
+
+
+# -- cell_metrics --
+
+@schema
+class cellRecord(record):
+    average_latency: Optional[float] = None
+    error_indication_count: Optional[float] = None
+    max_latency: Optional[float] = None
+    nof_failed_pdcch_allocs: Optional[float] = None
+    nof_failed_uci_allocs: Optional[float] = None
+    latency_histogram: Optional[List[Any]] = None
+
+
+@schema
+class ueRecord(record):
+    rnti: Any = None  # tag value, kept as sent
+    pci: Optional[float] = None
+    cqi: Optional[float] = None
+    dl_ri: Optional[float] = None
+    ul_ri: Optional[float] = None
+    ri: Optional[float] = None
+    dl_mcs: Optional[float] = None
+    dl_brate: Optional[float] = None
+    dl_nof_ok: Optional[float] = None
+    dl_nof_nok: Optional[float] = None
+    dl_bs: Optional[float] = None
+    pusch_snr_db: Optional[float] = None
+    pusch_rsrp_db: Optional[float] = None
+    pucch_snr_db: Optional[float] = None
+    ta_ns: Optional[float] = None
+    pusch_ta_ns: Optional[float] = None
+    pucch_ta_ns: Optional[float] = None
+    srs_ta_ns: Optional[float] = None
+    ul_mcs: Optional[float] = None
+    ul_brate: Optional[float] = None
+    ul_nof_ok: Optional[float] = None
+    ul_nof_nok: Optional[float] = None
+    last_phr: Optional[float] = None
+    bsr: Optional[float] = None
+    nof_pucch_f0f1_invalid_harqs: Optional[float] = None
+    nof_pucch_f2f3f4_invalid_harqs: Optional[float] = None
+    nof_pucch_f2f3f4_invalid_csis: Optional[float] = None
+    nof_pusch_invalid_harqs: Optional[float] = None
+    nof_pusch_invalid_csis: Optional[float] = None
+    avg_ce_delay: Optional[float] = None
+    max_ce_delay: Optional[float] = None
+    avg_crc_delay: Optional[float] = None
+    max_crc_delay: Optional[float] = None
+    avg_pusch_harq_delay: Optional[float] = None
+    max_pusch_harq_delay: Optional[float] = None
+    avg_pucch_harq_delay: Optional[float] = None
+    max_pucch_harq_delay: Optional[float] = None
+
+
+# -- du --
+
+@schema
+class duHighCellRecord(record):
+    pci: Any = None  # tag value, kept as sent
+    average_latency_us: Optional[float] = None
+    min_latency_us: Optional[float] = None
+    max_latency_us: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class duDlRecord(record):
+    average_latency_us: Optional[float] = None
+    max_latency_us: Optional[float] = None
+    max_latency_slot: Optional[float] = None
+    average_throughput_Mbps: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+    ldpc_encoder: Optional[Dict[str, Any]] = None
+    ldpc_rate_matcher: Optional[Dict[str, Any]] = None
+    scrambling: Optional[Dict[str, Any]] = None
+    modulation_mapper: Optional[Dict[str, Any]] = None
+    precoding_layer_mapping: Optional[Dict[str, Any]] = None
+    fec: Optional[Dict[str, Any]] = None
+
+    COMPONENTS: ClassVar[Tuple[str, ...]] = ('ldpc_encoder', 'ldpc_rate_matcher', 'scrambling', 'modulation_mapper',
+                                             'precoding_layer_mapping', 'fec')
+
+
+@schema
+class duUlRecord(record):
+    average_latency_us: Optional[float] = None
+    max_latency_us: Optional[float] = None
+    max_latency_slot: Optional[float] = None
+    average_throughput_Mbps: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+    ldpc_decoder: Optional[Dict[str, Any]] = None
+    ldpc_rate_dematcher: Optional[Dict[str, Any]] = None
+    descrambling: Optional[Dict[str, Any]] = None
+    demodulation_mapper: Optional[Dict[str, Any]] = None
+    channel_estimation: Optional[Dict[str, Any]] = None
+    transform_precoder: Optional[Dict[str, Any]] = None
+    fec: Optional[Dict[str, Any]] = None
+    algo_efficiency: Optional[Dict[str, Any]] = None
+
+    COMPONENTS: ClassVar[Tuple[str, ...]] = ('ldpc_decoder', 'ldpc_rate_dematcher', 'descrambling',
+                                             'demodulation_mapper', 'channel_estimation', 'transform_precoder',
+                                             'fec', 'algo_efficiency')
+
+
+@schema
+class ldpcCodecRecord(record):
+    average_cb_size_bits: Optional[float] = None
+    average_latency_us: Optional[float] = None
+    min_latency_us: Optional[float] = None
+    max_latency_us: Optional[float] = None
+    average_throughput_Mbps: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class processingStageRecord(record):
+    average_latency_us: Optional[float] = None
+    min_latency_us: Optional[float] = None
+    max_latency_us: Optional[float] = None
+    average_throughput_Mbps: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class cpuUsageRecord(record):
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class modulationMapperRecord(record):
+    qpsk_mod_throughput_Mbps: Optional[float] = None
+    qam16_mod_throughput_Mbps: Optional[float] = None
+    qam64_mod_throughput_Mbps: Optional[float] = None
+    qam256_mod_throughput_Mbps: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class precodingLayerMappingRecord(record):
+    average_latency_us: Optional[float] = None
+    throughput_per_nof_layers_MREsps: Optional[List[Any]] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class fecRecord(record):
+    average_throughput_Mbps: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class transformPrecoderRecord(record):
+    average_latency_us: Optional[float] = None
+    average_throughput_MREps: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class algoEfficiencyRecord(record):
+    bler: Optional[float] = None
+    evm: Optional[float] = None
+    sinr_db: Optional[float] = None
+
+
+DU_COMPONENT_RECORDS = {
+    'ldpc_encoder': ldpcCodecRecord,
+    'ldpc_rate_matcher': processingStageRecord,
+    'scrambling': cpuUsageRecord,
+    'modulation_mapper': modulationMapperRecord,
+    'precoding_layer_mapping': precodingLayerMappingRecord,
+    'fec': fecRecord,
+    'ldpc_decoder': ldpcCodecRecord,
+    'ldpc_rate_dematcher': processingStageRecord,
+    'descrambling': cpuUsageRecord,
+    'demodulation_mapper': modulationMapperRecord,
+    'channel_estimation': processingStageRecord,
+    'transform_precoder': transformPrecoderRecord,
+    'algo_efficiency': algoEfficiencyRecord
+}
+
+
+# -- ru --
+
+@schema
+class receivedPacketsRecord(record):
+    total: Optional[float] = None
+    early: Optional[float] = None
+    on_time: Optional[float] = None
+    late: Optional[float] = None
+
+
+@schema
+class ethernetRecord(record):
+    average_throughput_Mbps: Optional[float] = None
+    average_latency_us: Optional[float] = None
+    max_latency_us: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class messageProcessingRecord(record):
+    average_latency_us: Optional[float] = None
+    max_latency_us: Optional[float] = None
+    cpu_usage_percent: Optional[float] = None
+
+
+@schema
+class transmitterStatsRecord(record):
+    late_dl_grids: Optional[float] = None
+    late_ul_requests: Optional[float] = None
+
+
+# -- cu-up --
+
+# PDCP DL/UL carry the same fields as the DU processing stages
+pdcpDirectionRecord = processingStageRecord
+
+
+# -- rlc_metrics --
+
+@schema
+class drbRecord(record):
+    du_id: Optional[float] = None
+    ue_id: Optional[float] = None
+    drb_id: Optional[float] = None
+    tx: Optional[Dict[str, Any]] = None
+    rx: Optional[Dict[str, Any]] = None
+
+
+@schema
+class rlcTxRecord(record):
+    num_sdus: Optional[float] = None
+    num_sdu_bytes: Optional[float] = None
+    num_dropped_sdus: Optional[float] = None
+    num_discarded_sdus: Optional[float] = None
+    num_discard_failures: Optional[float] = None
+    num_pdus: Optional[float] = None
+    num_pdu_bytes: Optional[float] = None
+    sum_sdu_latency_us: Optional[float] = None
+    sum_pdu_latency_ns: Optional[float] = None
+    max_pdu_latency_ns: Optional[float] = None
+    pull_latency_histogram: Optional[List[Any]] = None
+
+
+@schema
+class rlcRxRecord(record):
+    num_sdus: Optional[float] = None
+    num_sdu_bytes: Optional[float] = None
+    num_pdus: Optional[float] = None
+    num_pdu_bytes: Optional[float] = None
+    num_lost_pdus: Optional[float] = None
+    num_malformed_pdus: Optional[float] = None
+
+
+@schema
+class pullLatencyBinRecord(record):
+    pull_latency_bin_start_usec: Optional[float] = None
+    pull_latency_bin_count: Optional[float] = None
+
+
+# -- app_resource_usage --
+
+@schema
+class appResourceUsageRecord(record):
+    cpu_usage_percent: Optional[float] = None
+    memory_usage_MB: Optional[float] = None
+    power_consumption_Watts: Optional[float] = None
+
+
+# -- imeisv --
+
+@schema
+class ssbCellRecord(record):
+    rsrp: Optional[float] = None
+    rsrq: Optional[float] = None
+    sinr: Optional[float] = None
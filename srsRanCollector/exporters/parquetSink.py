@@ -0,0 +1,361 @@
+import glob
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from exporters.helper_functions import log_both
+from exporters.lineProtocol import PRECISION_DIVISORS, line_count, parse_fields, parse_series, split_line
+
+"""
+# -- Parquet Archive Sink --
+
+Archives everything the parsers emit as Parquet, for offline analysis of testbed runs without
+querying InfluxDB. It runs next to InfluxDB (`PARQUET_DIR`) or instead of it
+(`INFLUX_ENABLED=false`).
+
+1. Buffering:
+   - `submit()` only appends records (`Point`s or line protocol) to an in-memory queue, bounded
+     by `max_pending_lines` (the oldest are dropped and counted beyond it). A background thread
+     parses them into rows.
+   - Lines with the same measurement, tag set and timestamp become one row, like InfluxDB
+     stores them, so per-field and wide-row output archive the same way.
+   - A measurement's rows are written as one row group once there are `row_group_rows` of them,
+     and at least every `flush_interval` seconds.
+
+2. Layout:
+   - One directory per measurement:
+     `<directory>/<measurement>/<measurement>-<run>-<pid>-<YYYYmmdd-HHMMSS>-<seq>.parquet`, where
+     `<run>` is a random token of the collector run (the sharded supervisor hands its own to the
+     workers through `COLLECTOR_RUN_ID`).
+   - Columns: `time` (UTC, in the write `precision`), one dictionary-encoded string column per tag, and one typed
+     column per field (int64, float64, bool or string, from the first value seen; an int column
+     that later receives floats becomes float64). Missing values are null.
+   - A file is written as `.parquet.partial` and renamed when it is closed: every
+     `rotate_seconds`, when a new column appears, and on shutdown. Only complete files end in
+     `.parquet`.
+   - A `.partial` file has no footer and cannot be read. Those left behind by an earlier run, or
+     by a worker of this run that no longer runs, are renamed to `.parquet.partial.orphaned` at
+     startup and reported, so a lost file shows up instead of silently disappearing; the default
+     rotation of 5 minutes bounds what such a kill can lose. The run token, not the pid alone,
+     tells runs apart: in a container the collector is pid 1 on every start.
+
+`read_measurement()` loads every complete file of a measurement through memory maps into one
+`pyarrow.Table` (columns a file lacks come back as nulls).
+"""
+
+FILE_SUFFIX = ".parquet"
+PARTIAL_SUFFIX = ".partial"
+ORPHANED_SUFFIX = ".orphaned"
+TAG_TYPE = pa.dictionary(pa.int32(), pa.string())
+FIELD_TYPES = {bool: pa.bool_(), int: pa.int64(), float: pa.float64(), str: pa.string()}
+MAX_CACHED_SERIES = 100000
+
+
+class archiveTable:
+    """Rows buffered for one measurement, its column types and its open file."""
+
+    def __init__(self, measurement: str, time_type: pa.DataType):
+        self.measurement = measurement
+        self.time_type = time_type
+        # (series, timestamp) -> row
+        self.rows: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        self.tags: Dict[str, pa.DataType] = {}
+        self.fields: Dict[str, pa.DataType] = {}
+        self.schema: Optional[pa.Schema] = None
+
+        self.path: Optional[str] = None
+        self.writer: Optional[pq.ParquetWriter] = None
+        self.file_schema: Optional[pa.Schema] = None
+        self.opened_at = 0.0
+        self.last_write = time.monotonic()
+
+    def current_schema(self) -> pa.Schema:
+        if self.schema is None:
+            self.schema = pa.schema([("time", self.time_type)] +
+                                    [(key, TAG_TYPE) for key in sorted(self.tags)] +
+                                    [(key, self.fields[key]) for key in sorted(self.fields)])
+        return self.schema
+
+
+class parquetSink:
+    def __init__(self, directory: str, serialize: Callable[[object], bytes], row_group_rows: int = 100000,
+                 flush_interval: float = 60.0, rotate_seconds: float = 300.0, compression: str = "zstd",
+                 max_pending_lines: int = 1000000, precision: str = "ns"):
+        self.directory = directory
+        self.serialize = serialize
+        self.row_group_rows = max(1, row_group_rows)
+        self.flush_interval = flush_interval
+        self.rotate_seconds = rotate_seconds
+        self.compression = compression
+        self.max_pending_lines = max_pending_lines
+        # Records arrive with timestamps in the write precision; the time column keeps that unit
+        self.time_type = pa.timestamp(precision, tz="UTC")
+        self.divisor = PRECISION_DIVISORS[precision]
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # (record, line count) pairs
+        self.pending = deque()
+        self.pending_lines = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.stopping = False
+
+        self.tables: Dict[str, archiveTable] = {}
+        # series (measurement and tags as written) -> (table, tags)
+        self.series: Dict[str, Tuple[archiveTable, Dict[str, str]]] = {}
+        self.sequence = 0
+        self.run_id = os.getenv("COLLECTOR_RUN_ID") or os.urandom(4).hex()
+
+        # Counters
+        self.archived_lines = 0
+        self.dropped_lines = 0
+        self.parse_errors = 0
+        self.type_conflicts = 0
+        self.row_groups = 0
+        self.rows_written = 0
+        self.files_closed = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        self.orphaned_files = 0
+
+        self.quarantine_partials()
+
+        self.thread = threading.Thread(target=self.run, name="parquet-archive", daemon=True)
+        self.thread.start()
+
+    def quarantine_partials(self):
+        """Rename unfinished files of earlier runs and exited workers to `.orphaned` and report them."""
+        orphaned_bytes = 0
+        pattern = os.path.join(glob.escape(self.directory), "*", f"*{FILE_SUFFIX}{PARTIAL_SUFFIX}")
+        for path in glob.glob(pattern):
+            # Workers of this run share the directory: only their files are still being written
+            writer = file_writer(path)
+            if writer is not None and writer[0] == self.run_id and process_running(writer[1]):
+                continue
+            try:
+                orphaned_bytes += os.path.getsize(path)
+                os.replace(path, path + ORPHANED_SUFFIX)
+                self.orphaned_files += 1
+            except OSError as e:
+                log_both(f"Archive could not set aside unfinished file {path}: {e}", "error")
+        if self.orphaned_files:
+            log_both(f"Archive found {self.orphaned_files} unfinished files ({orphaned_bytes} bytes) from a process "
+                     f"that did not shut down cleanly; renamed to *{PARTIAL_SUFFIX}{ORPHANED_SUFFIX}", "warning")
+
+    def submit(self, records: List[object]):
+        """Queue records for archiving (never blocks on disk)."""
+        with self.lock:
+            for record in records:
+                count = line_count(record)
+                self.pending.append((record, count))
+                self.pending_lines += count
+            while self.pending_lines > self.max_pending_lines and len(self.pending) > 1:
+                _, count = self.pending.popleft()
+                self.pending_lines -= count
+                self.dropped_lines += count
+            self.wakeup.notify()
+
+    def run(self):
+        while True:
+            with self.lock:
+                if not self.pending and not self.stopping:
+                    self.wakeup.wait(min(1.0, self.flush_interval))
+                records = self.pending
+                self.pending = deque()
+                self.pending_lines = 0
+                stopping = self.stopping
+
+            for record, _ in records:
+                self.add_record(record)
+
+            now = time.monotonic()
+            for table in self.tables.values():
+                if len(table.rows) >= self.row_group_rows or \
+                        (table.rows and now - table.last_write >= self.flush_interval):
+                    self.write_rows(table)
+                if table.writer is not None and time.time() - table.opened_at >= self.rotate_seconds:
+                    self.close_file(table)
+
+            if stopping:
+                for table in self.tables.values():
+                    if table.rows:
+                        self.write_rows(table)
+                    self.close_file(table)
+                return
+
+    def add_record(self, record: object):
+        try:
+            text = self.serialize(record).decode()
+        except Exception as e:
+            self.parse_errors += 1
+            log_both(f"Archive could not serialize a record: {e}", "error")
+            return
+
+        # Lines without a timestamp are stamped when they are archived
+        now = str(time.time_ns() // self.divisor)
+        for line in text.split("\n"):
+            if not line:
+                continue
+            try:
+                series, field_set, timestamp = split_line(line)
+                cached = self.series.get(series)
+                if cached is None:
+                    cached = self.series[series] = self.register_series(series)
+                table, tags = cached
+
+                timestamp = timestamp or now
+                row = table.rows.get((series, timestamp))
+                if row is None:
+                    row = table.rows[(series, timestamp)] = {"time": int(timestamp), **tags}
+                for key, value in parse_fields(field_set).items():
+                    if key in tags or key == "time":
+                        key = f"{key}_field"
+                    row[key] = self.typed_value(table, key, value)
+                self.archived_lines += 1
+            except (ValueError, IndexError) as e:
+                self.parse_errors += 1
+                log_both(f"Archive could not parse line {line[:120]!r}: {e}", "warning")
+
+    def register_series(self, series: str) -> Tuple[archiveTable, Dict[str, str]]:
+        """Table and tags of a series seen for the first time."""
+        if len(self.series) >= MAX_CACHED_SERIES:
+            self.series.clear()
+        measurement, tags = parse_series(series)
+        table = self.tables.get(measurement)
+        if table is None:
+            table = self.tables[measurement] = archiveTable(measurement, self.time_type)
+        for key in tags:
+            if key not in table.tags:
+                table.tags[key] = TAG_TYPE
+                table.schema = None
+        return table, tags
+
+    def typed_value(self, table: archiveTable, key: str, value: Any) -> Any:
+        """The value as stored in the column's type (widening int to float), or None on a conflict."""
+        value_type = FIELD_TYPES[type(value)]
+        column_type = table.fields.get(key)
+        if column_type is None:
+            table.fields[key] = value_type
+            table.schema = None
+            return value
+        if column_type == value_type:
+            return value
+        if column_type == pa.float64() and value_type == pa.int64():
+            return float(value)
+        if column_type == pa.int64() and value_type == pa.float64():
+            table.fields[key] = pa.float64()
+            table.schema = None
+            return value
+        self.type_conflicts += 1
+        return None
+
+    def write_rows(self, table: archiveTable):
+        rows = list(table.rows.values())
+        table.rows = {}
+        table.last_write = time.monotonic()
+
+        schema = table.current_schema()
+        if table.writer is not None and not table.file_schema.equals(schema):
+            self.close_file(table)
+        try:
+            if table.writer is None:
+                self.open_file(table, schema)
+            table.writer.write_table(pa.Table.from_pylist(rows, schema=schema), row_group_size=len(rows))
+        except (OSError, pa.ArrowException) as e:
+            self.write_errors += 1
+            log_both(f"Archive could not write {len(rows)} {table.measurement} rows: {e}", "error")
+            return
+        self.row_groups += 1
+        self.rows_written += len(rows)
+
+    def open_file(self, table: archiveTable, schema: pa.Schema):
+        directory = os.path.join(self.directory, table.measurement)
+        os.makedirs(directory, exist_ok=True)
+        self.sequence += 1
+        name = (f"{table.measurement}-{self.run_id}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-"
+                f"{self.sequence:06d}{FILE_SUFFIX}")
+        table.path = os.path.join(directory, name)
+        table.writer = pq.ParquetWriter(table.path + PARTIAL_SUFFIX, schema, compression=self.compression)
+        table.file_schema = schema
+        table.opened_at = time.time()
+
+    def close_file(self, table: archiveTable):
+        """Finish the measurement's open file and give it its final name."""
+        if table.writer is None:
+            return
+        try:
+            table.writer.close()
+            os.replace(table.path + PARTIAL_SUFFIX, table.path)
+            self.bytes_written += os.path.getsize(table.path)
+            self.files_closed += 1
+        except (OSError, pa.ArrowException) as e:
+            self.write_errors += 1
+            log_both(f"Archive could not close {table.path}: {e}", "error")
+        table.writer = None
+        table.file_schema = None
+
+    def close(self, timeout: float = 30.0):
+        """Archive everything queued, close the open files and stop the thread."""
+        with self.lock:
+            self.stopping = True
+            self.wakeup.notify()
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            log_both("Archive did not finish writing before shutdown", "warning")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return archive statistics."""
+        return {
+            "pending_lines": self.pending_lines,
+            "buffered_rows": sum(len(table.rows) for table in list(self.tables.values())),
+            "archived_lines": self.archived_lines,
+            "dropped_lines": self.dropped_lines,
+            "parse_errors": self.parse_errors,
+            "type_conflicts": self.type_conflicts,
+            "row_groups": self.row_groups,
+            "rows_written": self.rows_written,
+            "open_files": sum(table.writer is not None for table in list(self.tables.values())),
+            "files_closed": self.files_closed,
+            "bytes_written": self.bytes_written,
+            "write_errors": self.write_errors,
+            "orphaned_files": self.orphaned_files
+        }
+
+
+def file_writer(path: str) -> Optional[Tuple[str, int]]:
+    """Run token and pid of the process that wrote an archive file, from its name."""
+    # <measurement>-<run>-<pid>-<date>-<time>-<seq>.parquet[.partial]
+    name = os.path.basename(path)
+    name = name[:name.rindex(FILE_SUFFIX)] if FILE_SUFFIX in name else name
+    try:
+        _, run_id, pid, _, _, _ = name.rsplit("-", 5)
+        return run_id, int(pid)
+    except ValueError:
+        return None
+
+
+def process_running(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_measurement(directory: str, measurement: str) -> pa.Table:
+    """Load every complete archive file of one measurement (memory-mapped) into one table."""
+    paths = sorted(glob.glob(os.path.join(directory, glob.escape(measurement), f"*{FILE_SUFFIX}")))
+    tables = [pq.read_table(path, memory_map=True) for path in paths]
+    if not tables:
+        return pa.table({})
+    return pa.concat_tables(tables, promote_options="default")
@@ -0,0 +1,171 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+
+from exporters.helper_functions import log_both
+from exporters.influxTransport import is_retryable
+from exporters.lineProtocol import line_count
+
+"""
+# -- Write Retries --
+
+Retries failed InfluxDB writes from a background thread, so neither the parsers nor the writer
+thread ever sleep on a backoff:
+
+1. `schedule(chunks, error)` queues a failed batch. The next attempt is due after
+   `base_delay * 2 ** attempt` seconds (capped at `max_delay`) with full jitter, or, for 429 and
+   503 answers, after the server's `Retry-After` (seconds or an HTTP date). A `Retry-After` also
+   pauses the sink: until it passes, `paused()` is true and callers queue new batches here
+   instead of sending them.
+2. A batch that still fails after `max_attempts` attempts is given up and passed to `give_up`
+   (e.g. the disk spool); so is a batch that would take the queued bytes over
+   `max_pending_bytes`. Batches InfluxDB rejects as invalid (4xx other than 429) are dropped.
+"""
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by a 429/503 response's Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) not in (429, 503):
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class retryScheduler:
+    def __init__(self, write: Callable[[List[bytes]], None], give_up: Optional[Callable[[List[bytes]], bool]] = None,
+                 max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 max_pending_bytes: int = 64 * 1024 ** 2):
+        self.write = write
+        self.give_up = give_up
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_pending_bytes = max_pending_bytes
+
+        # (due time, sequence, attempts so far, chunks, bytes)
+        self.pending = []
+        self.sequence = itertools.count()
+        self.pending_bytes = 0
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.stopping = False
+
+        # Counters
+        self.scheduled_batches = 0
+        self.retries = 0
+        self.retried_points = 0
+        self.give_ups = 0
+        self.given_up_points = 0
+        self.overflows = 0
+
+        self.thread = threading.Thread(target=self.run, name="influx-retry", daemon=True)
+        self.thread.start()
+
+    def paused(self) -> bool:
+        """True while a Retry-After from InfluxDB is in effect."""
+        return time.monotonic() < self.paused_until
+
+    def delay(self, attempts: int, error: Optional[Exception]) -> float:
+        requested = retry_after_seconds(error) if error is not None else None
+        if requested is not None:
+            self.paused_until = max(self.paused_until, time.monotonic() + requested)
+            return requested
+        if self.paused():
+            return self.paused_until - time.monotonic()
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+
+    def schedule(self, chunks: List[bytes], error: Optional[Exception] = None, attempts: int = 1):
+        """Queue a batch that failed `attempts` times (0: held back while paused) for another try."""
+        if error is not None and not is_retryable(error):
+            self.abandon(chunks, f"rejected by InfluxDB: {error}", hand_on=False)
+            return
+
+        size = sum(len(chunk) for chunk in chunks)
+        with self.lock:
+            if self.pending_bytes + size > self.max_pending_bytes:
+                self.overflows += 1
+                overflow = True
+            else:
+                overflow = False
+                due = time.monotonic() + self.delay(attempts, error)
+                heapq.heappush(self.pending, (due, next(self.sequence), attempts, chunks, size))
+                self.pending_bytes += size
+                if attempts <= 1:
+                    self.scheduled_batches += 1
+                self.wakeup.notify()
+        if overflow:
+            self.abandon(chunks, f"retry queue over {self.max_pending_bytes} bytes")
+
+    def abandon(self, chunks: List[bytes], reason: str, hand_on: bool = True):
+        points = sum(line_count(chunk) for chunk in chunks)
+        with self.lock:
+            self.give_ups += 1
+            self.given_up_points += points
+        if hand_on and self.give_up is not None and self.give_up(chunks):
+            log_both(f"Gave up retrying {points} points ({reason}), handed them on", "warning")
+        else:
+            log_both(f"Gave up retrying {points} points ({reason}), dropping them", "error")
+
+    def run(self):
+        while True:
+            with self.lock:
+                while not self.stopping and (not self.pending or self.pending[0][0] > time.monotonic()):
+                    self.wakeup.wait(self.pending[0][0] - time.monotonic() if self.pending else None)
+                if self.stopping:
+                    return
+                _, _, attempts, chunks, size = heapq.heappop(self.pending)
+                self.pending_bytes -= size
+
+            self.retries += 1
+            try:
+                self.write(chunks)
+            except Exception as e:
+                if not is_retryable(e):
+                    self.abandon(chunks, f"rejected by InfluxDB: {e}", hand_on=False)
+                elif attempts + 1 >= self.max_attempts:
+                    self.abandon(chunks, f"{attempts + 1} attempts, last error: {e}")
+                else:
+                    self.schedule(chunks, e, attempts + 1)
+                continue
+            self.retried_points += sum(line_count(chunk) for chunk in chunks)
+
+    def close(self, timeout: float = 5.0):
+        """Stop retrying; batches still queued are handed to `give_up`."""
+        with self.lock:
+            self.stopping = True
+            self.wakeup.notify()
+            remaining = [entry[3] for entry in self.pending]
+            self.pending = []
+            self.pending_bytes = 0
+        self.thread.join(timeout)
+        for chunks in remaining:
+            self.abandon(chunks, "shutting down")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return retry statistics."""
+        with self.lock:
+            return {
+                "pending_batches": len(self.pending),
+                "pending_bytes": self.pending_bytes,
+                "scheduled_batches": self.scheduled_batches,
+                "retries": self.retries,
+                "retried_points": self.retried_points,
+                "give_ups": self.give_ups,
+                "given_up_points": self.given_up_points,
+                "overflows": self.overflows
+            }
@@ -1,34 +1,27 @@
+import time
 from collections import defaultdict
-from datetime import datetime
 from typing import Dict, Any, List, Optional
 from influxdb_client import Point
 
 from exporters.helper_functions import log_both, safe_numeric, timestamp_to_influx_time
+from exporters.messageSchema import drbRecord, pullLatencyBinRecord, rlcRxRecord, rlcTxRecord
 
 
 class rlcMetricsParser:
-    def __init__(self, main_exporter):
+    def __init__(self, main_exporter, drb_timeout_seconds: int = 150):
         # make an exporter
         self.exporter = main_exporter
         # Counters and tracking
         self.message_count = 0
         self.parse_error_count = 0
         self.active_drbs = set()  # Track active DRBs by composite key (du_id, ue_id, drb_id)
+        self.drb_keys = {}  # (du_id, ue_id, drb_id) -> composite key, formatted once per DRB
+        self.drb_last_seen = {}  # Track last seen timestamps for each DRB {drb_key: time.monotonic()}
+        self.drb_timeout_seconds = drb_timeout_seconds
         self.rlc_performance_history = defaultdict(lambda: defaultdict(list))  # Track RLC performance by DRB
         self.max_history_length = 50  # Keep last 50 readings for trend analysis
 
-        # Expected field sets for validation
-        self.EXPECTED_DRB_FIELDS = {'du_id', 'ue_id', 'drb_id', 'tx', 'rx'}
-        self.EXPECTED_TX_FIELDS = {
-            'num_sdus', 'num_sdu_bytes', 'num_dropped_sdus', 'num_discarded_sdus',
-            'num_discard_failures', 'num_pdus', 'num_pdu_bytes', 'sum_sdu_latency_us',
-            'sum_pdu_latency_ns', 'max_pdu_latency_ns', 'pull_latency_histogram'
-        }
-        self.EXPECTED_RX_FIELDS = {
-            'num_sdus', 'num_sdu_bytes', 'num_pdus', 'num_pdu_bytes',
-            'num_lost_pdus', 'num_malformed_pdus'
-        }
-        self.EXPECTED_PULL_LATENCY_BIN_FIELDS = {'pull_latency_bin_start_usec', 'pull_latency_bin_count'}
+        # Expected field sets for validation (DRB, TX/RX and bin fields are declared by messageSchema records)
         self.EXPECTED_RLC_ENTRY_FIELDS = {'drb'}
         self.EXPECTED_TOP_FIELDS = {'timestamp', 'rlc_metrics'}
 
@@ -44,7 +37,33 @@ class rlcMetricsParser:
 
     def generate_drb_key(self, du_id: int, ue_id: int, drb_id: int) -> str:
         """Generate a composite key for DRB identification."""
-        return f"du{du_id}_ue{ue_id}_drb{drb_id}"
+        ids = (du_id, ue_id, drb_id)
+        drb_key = self.drb_keys.get(ids)
+        if drb_key is None:
+            drb_key = self.drb_keys[ids] = f"du{du_id}_ue{ue_id}_drb{drb_id}"
+        return drb_key
+
+    def check_drb_timeouts(self, current_time: Optional[float] = None) -> int:
+        """Forget DRBs that stopped reporting: tracking, trend history and interned tag sets."""
+        if current_time is None:
+            current_time = time.monotonic()
+
+        timeout_threshold = self.drb_timeout_seconds
+        timed_out_drbs = {drb_key for drb_key, last_seen in self.drb_last_seen.items()
+                          if current_time - last_seen > timeout_threshold}
+        if not timed_out_drbs:
+            return 0
+
+        for drb_key in timed_out_drbs:
+            self.active_drbs.discard(drb_key)
+            del self.drb_last_seen[drb_key]
+            self.rlc_performance_history.pop(drb_key, None)
+            self.exporter.tag_sets.evict(drb_key)
+        self.drb_keys = {ids: drb_key for ids, drb_key in self.drb_keys.items() if drb_key not in timed_out_drbs}
+
+        log_both(f"Expired {len(timed_out_drbs)} DRBs after {self.drb_timeout_seconds}s without data "
+                 f"(Active DRBs: {len(self.active_drbs)})")
+        return len(timed_out_drbs)
 
     def calculate_rlc_statistics(self, drb_key: str, metric_type: str, current_value: float):
         """Calculate statistics for RLC performance trends."""
@@ -89,9 +108,10 @@ class rlcMetricsParser:
             return None
 
     def update_pull_latency_histogram(self, histogram_data: List[Dict[str, Any]], drb_key: str,
-                                      timestamp_dt: Optional[datetime] = None):
+                                      timestamp_ns: Optional[int] = None):
         """Update pull latency histogram metrics."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
             total_pulls = 0
@@ -102,24 +122,22 @@ class rlcMetricsParser:
             for bin_entry in histogram_data:
                 bin_data = bin_entry.get('pull_latency_bin', {})
 
+                latency_bin = pullLatencyBinRecord.decode(bin_data)
+
                 # Validate bin structure
-                unexpected_bin_fields = set(bin_data.keys()) - self.EXPECTED_PULL_LATENCY_BIN_FIELDS
+                unexpected_bin_fields = latency_bin.unknown_fields
                 if unexpected_bin_fields:
                     log_both(f"Unexpected pull latency bin fields for {drb_key}: {unexpected_bin_fields}", "warning")
 
-                bin_start = safe_numeric(bin_data.get('pull_latency_bin_start_usec'), 'pull_latency_bin_start_usec')
-                bin_count = safe_numeric(bin_data.get('pull_latency_bin_count'), 'pull_latency_bin_count')
+                bin_start = latency_bin.pull_latency_bin_start_usec
+                bin_count = latency_bin.pull_latency_bin_count
 
                 if bin_start is not None and bin_count is not None:
                     # Write individual bin data
-                    point = Point("rlc_pull_latency_histogram") \
-                        .field("bin_count", bin_count) \
-                        .tag("drb_key", drb_key) \
-                        .tag("bin_start_usec", str(int(bin_start))) \
-                        .tag("component", "rlc")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
+                    lines.add("rlc_pull_latency_histogram",
+                              tag_sets.tag_set(drb_key, drb_key=drb_key, bin_start_usec=str(int(bin_start)),
+                                               component="rlc"),
+                              "bin_count", bin_count, timestamp_ns)
 
                     # Calculate aggregate statistics
                     total_pulls += bin_count
@@ -134,42 +152,34 @@ class rlcMetricsParser:
                 weighted_avg_latency = weighted_latency_sum / total_pulls
 
                 # Write aggregate metrics
-                agg_point = Point("rlc_pull_latency_stats") \
-                    .field("total_pulls", total_pulls) \
-                    .field("weighted_avg_latency_usec", weighted_avg_latency) \
-                    .field("max_bin_count", max_bin_count) \
-                    .field("max_bin_start_usec", max_bin_start) \
-                    .tag("drb_key", drb_key) \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    agg_point = agg_point.time(timestamp_dt)
-                influx_points.append(agg_point)
+                stats_tags = tag_sets.tag_set(drb_key, drb_key=drb_key, component="rlc")
+                lines.add_fields("rlc_pull_latency_stats", stats_tags, {
+                    "total_pulls": total_pulls,
+                    "weighted_avg_latency_usec": weighted_avg_latency,
+                    "max_bin_count": max_bin_count,
+                    "max_bin_start_usec": max_bin_start
+                }, timestamp_ns)
 
                 # Track trends for weighted average latency
                 stats = self.calculate_rlc_statistics(drb_key, "pull_latency_weighted_avg", weighted_avg_latency)
                 if stats:
                     for stat_name, stat_value in stats.items():
                         if stat_value is not None:
-                            stat_point = Point("rlc_pull_latency_trends") \
-                                .field(f"weighted_avg_latency_{stat_name}", stat_value) \
-                                .tag("drb_key", drb_key) \
-                                .tag("statistic", stat_name) \
-                                .tag("component", "rlc")
-                            if timestamp_dt:
-                                stat_point = stat_point.time(timestamp_dt)
-                            influx_points.append(stat_point)
+                            lines.add("rlc_pull_latency_trends",
+                                      tag_sets.tag_set(drb_key, drb_key=drb_key, statistic=stat_name, component="rlc"),
+                                      f"weighted_avg_latency_{stat_name}", stat_value, timestamp_ns)
 
             # Write all histogram metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating pull latency histogram for {drb_key}: {e}", "error")
 
     def calculate_rlc_derived_metrics(self, tx_metrics: Dict[str, float], rx_metrics: Dict[str, float],
-                                      drb_key: str, timestamp_dt: Optional[datetime] = None):
+                                      drb_key: str, timestamp_ns: Optional[int] = None):
         """Calculate derived metrics from TX and RX RLC data."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
             # Calculate SDU drop rate
@@ -180,14 +190,9 @@ class rlcMetricsParser:
 
             if tx_sdus > 0:
                 sdu_drop_rate = (total_failed_sdus / tx_sdus) * 100
-                point = Point("rlc_derived_metrics") \
-                    .field("sdu_drop_rate_percent", sdu_drop_rate) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "drop_rate") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="drop_rate", component="rlc"),
+                          "sdu_drop_rate_percent", sdu_drop_rate, timestamp_ns)
 
             # Calculate PDU loss rate
             rx_pdus = rx_metrics.get('num_pdus', 0)
@@ -196,27 +201,17 @@ class rlcMetricsParser:
 
             if total_expected_pdus > 0:
                 pdu_loss_rate = (lost_pdus / total_expected_pdus) * 100
-                point = Point("rlc_derived_metrics") \
-                    .field("pdu_loss_rate_percent", pdu_loss_rate) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "loss_rate") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="loss_rate", component="rlc"),
+                          "pdu_loss_rate_percent", pdu_loss_rate, timestamp_ns)
 
             # Calculate average SDU latency
             sum_sdu_latency = tx_metrics.get('sum_sdu_latency_us', 0)
             if tx_sdus > 0 and sum_sdu_latency > 0:
                 avg_sdu_latency = sum_sdu_latency / tx_sdus
-                point = Point("rlc_derived_metrics") \
-                    .field("avg_sdu_latency_us", avg_sdu_latency) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "latency") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="latency", component="rlc"),
+                          "avg_sdu_latency_us", avg_sdu_latency, timestamp_ns)
 
             # Calculate SDU and PDU size averages
             tx_sdu_bytes = tx_metrics.get('num_sdu_bytes', 0)
@@ -228,76 +223,51 @@ class rlcMetricsParser:
 
             if tx_sdus > 0:
                 avg_tx_sdu_size = tx_sdu_bytes / tx_sdus
-                point = Point("rlc_derived_metrics") \
-                    .field("avg_tx_sdu_size_bytes", avg_tx_sdu_size) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "size") \
-                    .tag("direction", "tx") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="size", direction="tx",
+                                           component="rlc"),
+                          "avg_tx_sdu_size_bytes", avg_tx_sdu_size, timestamp_ns)
 
             if tx_pdus > 0:
                 avg_tx_pdu_size = tx_pdu_bytes / tx_pdus
-                point = Point("rlc_derived_metrics") \
-                    .field("avg_tx_pdu_size_bytes", avg_tx_pdu_size) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "size") \
-                    .tag("direction", "tx") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="size", direction="tx",
+                                           component="rlc"),
+                          "avg_tx_pdu_size_bytes", avg_tx_pdu_size, timestamp_ns)
 
             if rx_sdus > 0:
                 avg_rx_sdu_size = rx_sdu_bytes / rx_sdus
-                point = Point("rlc_derived_metrics") \
-                    .field("avg_rx_sdu_size_bytes", avg_rx_sdu_size) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "size") \
-                    .tag("direction", "rx") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="size", direction="rx",
+                                           component="rlc"),
+                          "avg_rx_sdu_size_bytes", avg_rx_sdu_size, timestamp_ns)
 
             if rx_pdus > 0:
                 avg_rx_pdu_size = rx_pdu_bytes / rx_pdus
-                point = Point("rlc_derived_metrics") \
-                    .field("avg_rx_pdu_size_bytes", avg_rx_pdu_size) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "size") \
-                    .tag("direction", "rx") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="size", direction="rx",
+                                           component="rlc"),
+                          "avg_rx_pdu_size_bytes", avg_rx_pdu_size, timestamp_ns)
 
             # Calculate efficiency metrics
             malformed_pdus = rx_metrics.get('num_malformed_pdus', 0)
             if rx_pdus > 0:
                 pdu_integrity_rate = ((rx_pdus - malformed_pdus) / rx_pdus) * 100
-                point = Point("rlc_derived_metrics") \
-                    .field("pdu_integrity_rate_percent", pdu_integrity_rate) \
-                    .tag("drb_key", drb_key) \
-                    .tag("metric_type", "integrity") \
-                    .tag("component", "rlc")
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-                influx_points.append(point)
+                lines.add("rlc_derived_metrics",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, metric_type="integrity", component="rlc"),
+                          "pdu_integrity_rate_percent", pdu_integrity_rate, timestamp_ns)
 
             # Write derived metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error calculating RLC derived metrics for {drb_key}: {e}", "error")
 
     def check_rlc_performance_thresholds(self, drb_key: str, tx_metrics: Dict[str, float],
-                                         rx_metrics: Dict[str, float], timestamp_dt: Optional[datetime] = None):
+                                         rx_metrics: Dict[str, float], timestamp_ns: Optional[int] = None):
         """Check RLC performance against thresholds and generate alerts."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
             alerts = []
@@ -351,97 +321,66 @@ class rlcMetricsParser:
                 log_both(alert_message, log_level)
 
                 # Write alert to InfluxDB
-                point = Point("rlc_alerts") \
-                    .field("alert_level_numeric", 2 if alert_level == "critical" else 1) \
-                    .tag("drb_key", drb_key) \
-                    .tag("alert_level", alert_level) \
-                    .tag("alert_message", alert_message) \
-                    .tag("component", "rlc")
-
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-
-                influx_points.append(point)
+                lines.add("rlc_alerts",
+                          lines.tag_set(drb_key=drb_key, alert_level=alert_level, alert_message=alert_message,
+                                        component="rlc"),
+                          "alert_level_numeric", 2 if alert_level == "critical" else 1, timestamp_ns)
 
             # Write normal status if no alerts
             if not alerts:
-                point = Point("rlc_alerts") \
-                    .field("alert_level_numeric", 0) \
-                    .tag("drb_key", drb_key) \
-                    .tag("alert_level", "normal") \
-                    .tag("component", "rlc")
-
-                if timestamp_dt:
-                    point = point.time(timestamp_dt)
-
-                influx_points.append(point)
+                lines.add("rlc_alerts",
+                          tag_sets.tag_set(drb_key, drb_key=drb_key, alert_level="normal", component="rlc"),
+                          "alert_level_numeric", 0, timestamp_ns)
 
             # Write alert metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error checking RLC performance thresholds for {drb_key}: {e}", "error")
 
     def update_rlc_direction_metrics(self, direction_data: Dict[str, Any], direction: str,
-                                     drb_key: str, timestamp_dt: Optional[datetime] = None):
+                                     drb_key: str, timestamp_ns: Optional[int] = None):
         """Update RLC metrics for a specific direction (TX or RX)."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
         current_metrics = {}
 
         try:
-            expected_fields = self.EXPECTED_TX_FIELDS if direction == 'tx' else self.EXPECTED_RX_FIELDS
-
-            # Process all RLC direction metrics except histogram
-            for field in expected_fields:
-                if field == 'pull_latency_histogram':  # Handle histogram separately
-                    continue
-
-                value = safe_numeric(direction_data.get(field), field)
-                if value is not None:
-                    current_metrics[field] = value
-
-                    # Write current value
-                    point = Point("rlc_metrics") \
-                        .field(field, value) \
-                        .tag("direction", direction) \
-                        .tag("drb_key", drb_key) \
-                        .tag("component", "rlc")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
-
-                    # Calculate and write statistics for key metrics
-                    if field in ['num_sdus', 'num_sdu_bytes', 'sum_sdu_latency_us', 'max_pdu_latency_ns']:
-                        stats = self.calculate_rlc_statistics(drb_key, f"{direction}_{field}", value)
-                        if stats:
-                            for stat_name, stat_value in stats.items():
-                                if stat_value is not None:
-                                    stat_point = Point("rlc_statistics") \
-                                        .field(f"{field}_{stat_name}", stat_value) \
-                                        .tag("direction", direction) \
-                                        .tag("drb_key", drb_key) \
-                                        .tag("metric_type", field) \
-                                        .tag("statistic", stat_name) \
-                                        .tag("component", "rlc")
-                                    if timestamp_dt:
-                                        stat_point = stat_point.time(timestamp_dt)
-                                    influx_points.append(stat_point)
+            record_type = rlcTxRecord if direction == 'tx' else rlcRxRecord
+            direction_record = record_type.decode(direction_data)
+            metric_tags = tag_sets.tag_set(drb_key, direction=direction, drb_key=drb_key, component="rlc")
+
+            # Process all RLC direction metrics (the TX histogram is handled separately)
+            for field, value in direction_record.numeric_items():
+                current_metrics[field] = value
+
+                # Write current value
+                lines.add("rlc_metrics", metric_tags, field, value, timestamp_ns)
+
+                # Calculate and write statistics for key metrics
+                if field in ['num_sdus', 'num_sdu_bytes', 'sum_sdu_latency_us', 'max_pdu_latency_ns']:
+                    stats = self.calculate_rlc_statistics(drb_key, f"{direction}_{field}", value)
+                    if stats:
+                        for stat_name, stat_value in stats.items():
+                            if stat_value is not None:
+                                lines.add("rlc_statistics",
+                                          tag_sets.tag_set(drb_key, direction=direction, drb_key=drb_key,
+                                                           metric_type=field, statistic=stat_name, component="rlc"),
+                                          f"{field}_{stat_name}", stat_value, timestamp_ns)
 
             # Handle pull latency histogram for TX direction
             if direction == 'tx':
-                histogram_data = direction_data.get('pull_latency_histogram', [])
+                histogram_data = direction_record.pull_latency_histogram
                 if histogram_data:
-                    self.update_pull_latency_histogram(histogram_data, drb_key, timestamp_dt)
+                    self.update_pull_latency_histogram(histogram_data, drb_key, timestamp_ns)
 
             # Check for unexpected fields
-            unexpected_fields = set(direction_data.keys()) - expected_fields
+            unexpected_fields = direction_record.unknown_fields
             if unexpected_fields:
                 log_both(f"Unexpected RLC {direction} fields for {drb_key}: {unexpected_fields}", "warning")
 
             # Write RLC direction metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
             return current_metrics
 
@@ -449,13 +388,17 @@ class rlcMetricsParser:
             log_both(f"Error updating RLC {direction} metrics for {drb_key}: {e}", "error")
             return {}
 
-    def update_drb_metrics(self, drb_data: Dict[str, Any], timestamp_dt: Optional[datetime] = None):
-        """Update DRB (Data Radio Bearer) metrics."""
+    def update_drb_metrics(self, drb_data: Dict[str, Any], timestamp_ns: Optional[int] = None,
+                           drb: Optional[drbRecord] = None):
+        """Update DRB (Data Radio Bearer) metrics. `drb` is the already decoded record, if available."""
         try:
+            if drb is None:
+                drb = drbRecord.decode(drb_data)
+
             # Extract DRB identifiers
-            du_id = safe_numeric(drb_data.get('du_id'), 'du_id')
-            ue_id = safe_numeric(drb_data.get('ue_id'), 'ue_id')
-            drb_id = safe_numeric(drb_data.get('drb_id'), 'drb_id')
+            du_id = drb.du_id
+            ue_id = drb.ue_id
+            drb_id = drb.drb_id
 
             if du_id is None or ue_id is None or drb_id is None:
                 log_both("DRB data missing required identifiers (du_id, ue_id, drb_id)", "warning")
@@ -467,44 +410,41 @@ class rlcMetricsParser:
             if drb_key not in self.active_drbs:
                 self.active_drbs.add(drb_key)
                 log_both(f"New DRB discovered: {drb_key}")
+            self.drb_last_seen[drb_key] = time.monotonic()
 
             # Check for unexpected DRB fields
-            unexpected_fields = set(drb_data.keys()) - self.EXPECTED_DRB_FIELDS
+            unexpected_fields = drb.unknown_fields
             if unexpected_fields:
                 log_both(f"Unexpected DRB fields for {drb_key}: {unexpected_fields}", "warning")
 
             # Write DRB identifier metrics
-            id_point = Point("rlc_drb_info") \
-                .field("du_id", du_id) \
-                .field("ue_id", ue_id) \
-                .field("drb_id", drb_id) \
-                .tag("drb_key", drb_key) \
-                .tag("component", "rlc")
-            if timestamp_dt:
-                id_point = id_point.time(timestamp_dt)
-            self.exporter.write_to_influx([id_point])
+            lines = self.exporter.lines
+            tag_sets = self.exporter.tag_sets
+            lines.add_fields("rlc_drb_info", tag_sets.tag_set(drb_key, drb_key=drb_key, component="rlc"),
+                             {"du_id": du_id, "ue_id": ue_id, "drb_id": drb_id}, timestamp_ns)
+            self.exporter.commit()
 
             tx_metrics = {}
             rx_metrics = {}
 
             # Process TX metrics
-            tx_data = drb_data.get('tx', {})
+            tx_data = drb.tx
             if tx_data:
-                tx_metrics = self.update_rlc_direction_metrics(tx_data, 'tx', drb_key, timestamp_dt)
+                tx_metrics = self.update_rlc_direction_metrics(tx_data, 'tx', drb_key, timestamp_ns)
             else:
                 log_both(f"DRB {drb_key} missing TX data", "warning")
 
             # Process RX metrics
-            rx_data = drb_data.get('rx', {})
+            rx_data = drb.rx
             if rx_data:
-                rx_metrics = self.update_rlc_direction_metrics(rx_data, 'rx', drb_key, timestamp_dt)
+                rx_metrics = self.update_rlc_direction_metrics(rx_data, 'rx', drb_key, timestamp_ns)
             else:
                 log_both(f"DRB {drb_key} missing RX data", "warning")
 
             # Calculate derived metrics and check thresholds if we have both TX and RX data
             if tx_metrics and rx_metrics:
-                self.calculate_rlc_derived_metrics(tx_metrics, rx_metrics, drb_key, timestamp_dt)
-                self.check_rlc_performance_thresholds(drb_key, tx_metrics, rx_metrics, timestamp_dt)
+                self.calculate_rlc_derived_metrics(tx_metrics, rx_metrics, drb_key, timestamp_ns)
+                self.check_rlc_performance_thresholds(drb_key, tx_metrics, rx_metrics, timestamp_ns)
 
             # log_both(f"RLC metrics updated for {drb_key} - TX SDUs: {tx_metrics.get('num_sdus', 'N/A')}, "
             #          f"RX SDUs: {rx_metrics.get('num_sdus', 'N/A')}")
@@ -512,7 +452,7 @@ class rlcMetricsParser:
         except Exception as e:
             log_both(f"Error updating DRB metrics: {e}", "error")
 
-    def update_rlc_metrics_list(self, rlc_metrics_list: List[Dict[str, Any]], timestamp_dt: Optional[datetime] = None):
+    def update_rlc_metrics_list(self, rlc_metrics_list: List[Dict[str, Any]], timestamp_ns: Optional[int] = None):
         """Update metrics for all RLC entries."""
         try:
             # Track which DRBs we received data for in this update
@@ -530,16 +470,14 @@ class rlcMetricsParser:
                     continue
 
                 # Extract DRB key for tracking
-                du_id = safe_numeric(drb_data.get('du_id'), 'du_id')
-                ue_id = safe_numeric(drb_data.get('ue_id'), 'ue_id')
-                drb_id = safe_numeric(drb_data.get('drb_id'), 'drb_id')
+                drb = drbRecord.decode(drb_data)
 
-                if du_id is not None and ue_id is not None and drb_id is not None:
-                    drb_key = self.generate_drb_key(int(du_id), int(ue_id), int(drb_id))
+                if drb.du_id is not None and drb.ue_id is not None and drb.drb_id is not None:
+                    drb_key = self.generate_drb_key(int(drb.du_id), int(drb.ue_id), int(drb.drb_id))
                     received_drbs.add(drb_key)
 
                 # Update DRB metrics
-                self.update_drb_metrics(drb_data, timestamp_dt)
+                self.update_drb_metrics(drb_data, timestamp_ns, drb)
 
             # Log missing data DRBs
             missing_data_drbs = self.active_drbs - received_drbs
@@ -561,12 +499,12 @@ class rlcMetricsParser:
 
         try:
             timestamp = entry.get("timestamp")
-            timestamp_dt = timestamp_to_influx_time(timestamp)
+            timestamp_ns = timestamp_to_influx_time(timestamp)
 
             # STEP 1: Update RLC metrics
             rlc_metrics_list = entry.get("rlc_metrics", [])
             if isinstance(rlc_metrics_list, list) and rlc_metrics_list:
-                self.update_rlc_metrics_list(rlc_metrics_list, timestamp_dt)
+                self.update_rlc_metrics_list(rlc_metrics_list, timestamp_ns)
             elif rlc_metrics_list:
                 log_both("RLC metrics data is not a list or is empty", "warning")
             else:
@@ -610,8 +548,8 @@ class rlcMetricsParser:
             )
 
             # Add timestamp to system points
-            if timestamp_dt:
-                system_points = [p.time(timestamp_dt) for p in system_points]
+            if timestamp_ns:
+                system_points = [p.time(timestamp_ns) for p in system_points]
 
             self.exporter.write_to_influx(system_points)
 
@@ -1,9 +1,10 @@
 from collections import defaultdict
-from datetime import datetime
 from typing import Dict, Any, List, Optional
 from influxdb_client import Point
 
 from exporters.helper_functions import log_both, safe_numeric, timestamp_to_influx_time
+from exporters.messageSchema import ethernetRecord, messageProcessingRecord, receivedPacketsRecord, \
+    transmitterStatsRecord
 
 
 class ruMetricsParser:
@@ -24,186 +25,128 @@ class ruMetricsParser:
         self.EXPECTED_UL_FIELDS = {'received_packets', 'ethernet_receiver', 'message_decoder'}
         self.EXPECTED_DL_FIELDS = {'ethernet_transmitter', 'message_encoder', 'transmitter_stats'}
 
-        # UL component fields
-        self.EXPECTED_RECEIVED_PACKETS_FIELDS = {'total', 'early', 'on_time', 'late'}
-        self.EXPECTED_ETHERNET_RECEIVER_FIELDS = {
-            'average_throughput_Mbps', 'average_latency_us', 'max_latency_us', 'cpu_usage_percent'
-        }
+        # Component fields (leaf metric fields are declared by messageSchema records)
         self.EXPECTED_MESSAGE_DECODER_FIELDS = {'prach', 'data'}
-        self.EXPECTED_PRACH_FIELDS = {'average_latency_us', 'max_latency_us', 'cpu_usage_percent'}
-        self.EXPECTED_DECODER_DATA_FIELDS = {'average_latency_us', 'max_latency_us', 'cpu_usage_percent'}
-
-        # DL component fields
-        self.EXPECTED_ETHERNET_TRANSMITTER_FIELDS = {
-            'average_throughput_Mbps', 'average_latency_us', 'max_latency_us', 'cpu_usage_percent'
-        }
         self.EXPECTED_MESSAGE_ENCODER_FIELDS = {'dl_cp', 'ul_cp', 'dl_up'}
-        self.EXPECTED_DL_CP_FIELDS = {'average_latency_us', 'max_latency_us', 'cpu_usage_percent'}
-        self.EXPECTED_UL_CP_FIELDS = {'average_latency_us', 'max_latency_us', 'cpu_usage_percent'}
-        self.EXPECTED_DL_UP_FIELDS = {'average_latency_us', 'max_latency_us', 'cpu_usage_percent'}
-        self.EXPECTED_TRANSMITTER_STATS_FIELDS = {'late_dl_grids', 'late_ul_requests'}
 
         self.EXPECTED_TOP_FIELDS = {'timestamp', 'ru'}
 
     def update_ul_received_packets_metrics(self, packets_data: Dict[str, Any], pci_str: str,
-                                           timestamp_dt: Optional[datetime] = None):
+                                           timestamp_ns: Optional[int] = None):
         """Update UL received packets metrics."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
+            packets = receivedPacketsRecord.decode(packets_data)
+
             # Process all packet statistics
-            for field in self.EXPECTED_RECEIVED_PACKETS_FIELDS:
-                value = safe_numeric(packets_data.get(field), field)
-                if value is not None:
-                    point = Point("ru_packet_stats") \
-                        .field(f"received_packets_{field}", value) \
-                        .tag("pci", pci_str) \
-                        .tag("direction", "ul") \
-                        .tag("component", "ru")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
+            packet_tags = tag_sets.tag_set(("ru", pci_str), pci=pci_str, direction="ul", component="ru")
+            for field, value in packets.numeric_items():
+                lines.add("ru_packet_stats", packet_tags, f"received_packets_{field}", value, timestamp_ns)
 
             # Calculate packet timing percentages if total > 0
-            total_packets = safe_numeric(packets_data.get('total'), 'total')
+            total_packets = packets.total
             if total_packets and total_packets > 0:
                 for timing_type in ['early', 'on_time', 'late']:
-                    count = safe_numeric(packets_data.get(timing_type), timing_type)
+                    count = getattr(packets, timing_type)
                     if count is not None:
                         percentage = (count / total_packets) * 100
-                        point = Point("ru_packet_stats") \
-                            .field(f"received_packets_{timing_type}_percent", percentage) \
-                            .tag("pci", pci_str) \
-                            .tag("direction", "ul") \
-                            .tag("component", "ru")
-                        if timestamp_dt:
-                            point = point.time(timestamp_dt)
-                        influx_points.append(point)
+                        lines.add("ru_packet_stats", packet_tags, f"received_packets_{timing_type}_percent",
+                                  percentage, timestamp_ns)
 
             # Check for unexpected fields
-            unexpected_fields = set(packets_data.keys()) - self.EXPECTED_RECEIVED_PACKETS_FIELDS
+            unexpected_fields = packets.unknown_fields
             if unexpected_fields:
                 log_both(f"Unexpected received_packets fields for PCI {pci_str}: {unexpected_fields}", "warning")
 
             # Write packet metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating received packets metrics for PCI {pci_str}: {e}", "error")
 
     def update_ethernet_component_metrics(self, component_data: Dict[str, Any], component_name: str,
-                                          pci_str: str, direction: str, timestamp_dt: Optional[datetime] = None):
+                                          pci_str: str, direction: str, timestamp_ns: Optional[int] = None):
         """Update ethernet receiver/transmitter metrics."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
-            expected_fields = (self.EXPECTED_ETHERNET_RECEIVER_FIELDS if component_name == 'ethernet_receiver'
-                               else self.EXPECTED_ETHERNET_TRANSMITTER_FIELDS)
-
-            # Process all ethernet component metrics
-            for field in expected_fields:
-                value = safe_numeric(component_data.get(field), field)
-                if value is not None:
-                    point = Point("ru_ethernet_metrics") \
-                        .field(field, value) \
-                        .tag("pci", pci_str) \
-                        .tag("direction", direction) \
-                        .tag("component", component_name) \
-                        .tag("component", "ru")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
+            # ethernet_receiver and ethernet_transmitter report the same fields
+            component = ethernetRecord.decode(component_data)
+
+            # Process all ethernet component metrics (the receiver/transmitter name is not a tag: the
+            # component tag is always "ru")
+            ethernet_tags = tag_sets.tag_set(("ru", pci_str), pci=pci_str, direction=direction, component="ru")
+            for field, value in component.numeric_items():
+                lines.add("ru_ethernet_metrics", ethernet_tags, field, value, timestamp_ns)
 
             # Check for unexpected fields
-            unexpected_fields = set(component_data.keys()) - expected_fields
+            unexpected_fields = component.unknown_fields
             if unexpected_fields:
                 log_both(f"Unexpected {component_name} fields for PCI {pci_str}: {unexpected_fields}", "warning")
 
             # Write ethernet metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating {component_name} metrics for PCI {pci_str}: {e}", "error")
 
     def update_message_processing_metrics(self, processing_data: Dict[str, Any], processing_type: str,
                                           component_name: str, pci_str: str, direction: str,
-                                          timestamp_dt: Optional[datetime] = None):
+                                          timestamp_ns: Optional[int] = None):
         """Update message decoder/encoder sub-component metrics."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
-            # Get expected fields based on processing type
-            expected_fields_map = {
-                'prach': self.EXPECTED_PRACH_FIELDS,
-                'data': self.EXPECTED_DECODER_DATA_FIELDS,
-                'dl_cp': self.EXPECTED_DL_CP_FIELDS,
-                'ul_cp': self.EXPECTED_UL_CP_FIELDS,
-                'dl_up': self.EXPECTED_DL_UP_FIELDS
-            }
-
-            expected_fields = expected_fields_map.get(processing_type, set())
+            # prach, data, dl_cp, ul_cp and dl_up all report the same fields
+            processing = messageProcessingRecord.decode(processing_data)
 
             # Process all processing metrics
-            for field in expected_fields:
-                value = safe_numeric(processing_data.get(field), field)
-                if value is not None:
-                    point = Point("ru_message_processing") \
-                        .field(field, value) \
-                        .tag("pci", pci_str) \
-                        .tag("direction", direction) \
-                        .tag("component", component_name) \
-                        .tag("processing_type", processing_type) \
-                        .tag("component", "ru")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
+            processing_tags = tag_sets.tag_set(("ru", pci_str), pci=pci_str, direction=direction,
+                                               processing_type=processing_type, component="ru")
+            for field, value in processing.numeric_items():
+                lines.add("ru_message_processing", processing_tags, field, value, timestamp_ns)
 
             # Check for unexpected fields
-            unexpected_fields = set(processing_data.keys()) - expected_fields
+            unexpected_fields = processing.unknown_fields
             if unexpected_fields:
                 log_both(f"Unexpected {processing_type} fields for PCI {pci_str}: {unexpected_fields}", "warning")
 
             # Write processing metrics to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating {processing_type} metrics for PCI {pci_str}: {e}", "error")
 
     def update_transmitter_stats_metrics(self, stats_data: Dict[str, Any], pci_str: str,
-                                         timestamp_dt: Optional[datetime] = None):
+                                         timestamp_ns: Optional[int] = None):
         """Update DL transmitter statistics metrics."""
-        influx_points = []
+        lines = self.exporter.lines
+        tag_sets = self.exporter.tag_sets
 
         try:
+            transmitter_stats = transmitterStatsRecord.decode(stats_data)
+
             # Process all transmitter statistics
-            for field in self.EXPECTED_TRANSMITTER_STATS_FIELDS:
-                value = safe_numeric(stats_data.get(field), field)
-                if value is not None:
-                    point = Point("ru_transmitter_stats") \
-                        .field(field, value) \
-                        .tag("pci", pci_str) \
-                        .tag("direction", "dl") \
-                        .tag("component", "ru")
-                    if timestamp_dt:
-                        point = point.time(timestamp_dt)
-                    influx_points.append(point)
+            transmitter_tags = tag_sets.tag_set(("ru", pci_str), pci=pci_str, direction="dl", component="ru")
+            for field, value in transmitter_stats.numeric_items():
+                lines.add("ru_transmitter_stats", transmitter_tags, field, value, timestamp_ns)
 
             # Check for unexpected fields
-            unexpected_fields = set(stats_data.keys()) - self.EXPECTED_TRANSMITTER_STATS_FIELDS
+            unexpected_fields = transmitter_stats.unknown_fields
             if unexpected_fields:
                 log_both(f"Unexpected transmitter_stats fields for PCI {pci_str}: {unexpected_fields}", "warning")
 
             # Write transmitter stats to InfluxDB
-            if influx_points:
-                self.exporter.write_to_influx(influx_points)
+            self.exporter.commit()
 
         except Exception as e:
             log_both(f"Error updating transmitter stats metrics for PCI {pci_str}: {e}", "error")
 
-    def update_ul_metrics(self, ul_data: Dict[str, Any], pci_str: str, timestamp_dt: Optional[datetime] = None):
+    def update_ul_metrics(self, ul_data: Dict[str, Any], pci_str: str, timestamp_ns: Optional[int] = None):
         """Update UL direction metrics."""
         try:
             # Check for unexpected UL fields
@@ -214,13 +157,13 @@ class ruMetricsParser:
             # Process received packets
             received_packets = ul_data.get('received_packets', {})
             if received_packets:
-                self.update_ul_received_packets_metrics(received_packets, pci_str, timestamp_dt)
+                self.update_ul_received_packets_metrics(received_packets, pci_str, timestamp_ns)
 
             # Process ethernet receiver
             ethernet_receiver = ul_data.get('ethernet_receiver', {})
             if ethernet_receiver:
                 self.update_ethernet_component_metrics(ethernet_receiver, 'ethernet_receiver',
-                                                       pci_str, 'ul', timestamp_dt)
+                                                       pci_str, 'ul', timestamp_ns)
 
             # Process message decoder
             message_decoder = ul_data.get('message_decoder', {})
@@ -235,18 +178,18 @@ class ruMetricsParser:
                 prach_data = message_decoder.get('prach', {})
                 if prach_data:
                     self.update_message_processing_metrics(prach_data, 'prach', 'message_decoder',
-                                                           pci_str, 'ul', timestamp_dt)
+                                                           pci_str, 'ul', timestamp_ns)
 
                 # Process data decoder
                 data_decoder = message_decoder.get('data', {})
                 if data_decoder:
                     self.update_message_processing_metrics(data_decoder, 'data', 'message_decoder',
-                                                           pci_str, 'ul', timestamp_dt)
+                                                           pci_str, 'ul', timestamp_ns)
 
         except Exception as e:
             log_both(f"Error updating UL metrics for PCI {pci_str}: {e}", "error")
 
-    def update_dl_metrics(self, dl_data: Dict[str, Any], pci_str: str, timestamp_dt: Optional[datetime] = None):
+    def update_dl_metrics(self, dl_data: Dict[str, Any], pci_str: str, timestamp_ns: Optional[int] = None):
         """Update DL direction metrics."""
         try:
             # Check for unexpected DL fields
@@ -258,7 +201,7 @@ class ruMetricsParser:
             ethernet_transmitter = dl_data.get('ethernet_transmitter', {})
             if ethernet_transmitter:
                 self.update_ethernet_component_metrics(ethernet_transmitter, 'ethernet_transmitter',
-                                                       pci_str, 'dl', timestamp_dt)
+                                                       pci_str, 'dl', timestamp_ns)
 
             # Process message encoder
             message_encoder = dl_data.get('message_encoder', {})
@@ -273,29 +216,29 @@ class ruMetricsParser:
                 dl_cp_data = message_encoder.get('dl_cp', {})
                 if dl_cp_data:
                     self.update_message_processing_metrics(dl_cp_data, 'dl_cp', 'message_encoder',
-                                                           pci_str, 'dl', timestamp_dt)
+                                                           pci_str, 'dl', timestamp_ns)
 
                 # Process UL control plane
                 ul_cp_data = message_encoder.get('ul_cp', {})
                 if ul_cp_data:
                     self.update_message_processing_metrics(ul_cp_data, 'ul_cp', 'message_encoder',
-                                                           pci_str, 'dl', timestamp_dt)
+                                                           pci_str, 'dl', timestamp_ns)
 
                 # Process DL user plane
                 dl_up_data = message_encoder.get('dl_up', {})
                 if dl_up_data:
                     self.update_message_processing_metrics(dl_up_data, 'dl_up', 'message_encoder',
-                                                           pci_str, 'dl', timestamp_dt)
+                                                           pci_str, 'dl', timestamp_ns)
 
             # Process transmitter statistics
             transmitter_stats = dl_data.get('transmitter_stats', {})
             if transmitter_stats:
-                self.update_transmitter_stats_metrics(transmitter_stats, pci_str, timestamp_dt)
+                self.update_transmitter_stats_metrics(transmitter_stats, pci_str, timestamp_ns)
 
         except Exception as e:
             log_both(f"Error updating DL metrics for PCI {pci_str}: {e}", "error")
 
-    def update_ru_cell_metrics(self, cell_data: Dict[str, Any], timestamp_dt: Optional[datetime] = None):
+    def update_ru_cell_metrics(self, cell_data: Dict[str, Any], timestamp_ns: Optional[int] = None):
         """Update RU cell-level metrics."""
         try:
             pci = cell_data.get('pci')
@@ -318,17 +261,17 @@ class ruMetricsParser:
             # Process UL metrics
             ul_data = cell_data.get('ul', {})
             if ul_data:
-                self.update_ul_metrics(ul_data, pci_str, timestamp_dt)
+                self.update_ul_metrics(ul_data, pci_str, timestamp_ns)
 
             # Process DL metrics
             dl_data = cell_data.get('dl', {})
             if dl_data:
-                self.update_dl_metrics(dl_data, pci_str, timestamp_dt)
+                self.update_dl_metrics(dl_data, pci_str, timestamp_ns)
 
         except Exception as e:
             log_both(f"Error updating RU cell metrics: {e}", "error")
 
-    def update_ofh_metrics(self, ofh_list: List[Dict[str, Any]], timestamp_dt: Optional[datetime] = None):
+    def update_ofh_metrics(self, ofh_list: List[Dict[str, Any]], timestamp_ns: Optional[int] = None):
         """Update OFH (Open Fronthaul) metrics for all cells."""
         try:
             # Track which PCIs we received data for in this update
@@ -350,7 +293,7 @@ class ruMetricsParser:
                     received_pcis.add(str(pci))
 
                 # Update RU cell metrics
-                self.update_ru_cell_metrics(cell_data, timestamp_dt)
+                self.update_ru_cell_metrics(cell_data, timestamp_ns)
 
             # Log missing data cells
             missing_data_pcis = self.active_cells - received_pcis
@@ -365,7 +308,7 @@ class ruMetricsParser:
         except Exception as e:
             log_both(f"Error updating OFH metrics: {e}", "error")
 
-    def update_ru_metrics(self, ru_data: Dict[str, Any], timestamp_dt: Optional[datetime] = None):
+    def update_ru_metrics(self, ru_data: Dict[str, Any], timestamp_ns: Optional[int] = None):
         """Update RU-level metrics."""
         influx_points = []
 
@@ -377,8 +320,8 @@ class ruMetricsParser:
 
             # Write RU status metrics
             point = Point("ru_metrics").field("active_cells_count", len(self.active_cells)).tag("component", "ru")
-            if timestamp_dt:
-                point = point.time(timestamp_dt)
+            if timestamp_ns:
+                point = point.time(timestamp_ns)
             influx_points.append(point)
 
             # Write RU metrics to InfluxDB
@@ -388,7 +331,7 @@ class ruMetricsParser:
             # Process OFH data
             ofh_list = ru_data.get('ofh', [])
             if isinstance(ofh_list, list) and ofh_list:
-                self.update_ofh_metrics(ofh_list, timestamp_dt)
+                self.update_ofh_metrics(ofh_list, timestamp_ns)
             elif ofh_list:
                 log_both("RU OFH data is not a list or is empty", "warning")
             else:
@@ -406,12 +349,12 @@ class ruMetricsParser:
 
         try:
             timestamp = entry.get("timestamp")
-            timestamp_dt = timestamp_to_influx_time(timestamp)
+            timestamp_ns = timestamp_to_influx_time(timestamp)
 
             # STEP 1: Update RU metrics
             ru_data = entry.get("ru", {})
             if ru_data:
-                self.update_ru_metrics(ru_data, timestamp_dt)
+                self.update_ru_metrics(ru_data, timestamp_ns)
             else:
                 log_both("Message missing RU data", "warning")
 
@@ -435,8 +378,8 @@ class ruMetricsParser:
             )
 
             # Add timestamp to system points
-            if timestamp_dt:
-                system_points = [p.time(timestamp_dt) for p in system_points]
+            if timestamp_ns:
+                system_points = [p.time(timestamp_ns) for p in system_points]
 
             self.exporter.write_to_influx(system_points)
 
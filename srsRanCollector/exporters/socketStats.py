@@ -0,0 +1,60 @@
+import os
+import socket
+from typing import Dict, Optional
+
+from exporters.helper_functions import log_both
+
+# /proc/net/udp columns: sl local rem st tx_queue:rx_queue tr:tm retrnsmt uid timeout inode ref pointer drops
+QUEUE_COLUMN = 4
+INODE_COLUMN = 9
+DROPS_COLUMN = 12
+
+
+def set_receive_buffer(server_socket: socket.socket, size: int) -> int:
+    """
+    Request a `size` byte SO_RCVBUF and return what the kernel actually granted.
+
+    Linux caps SO_RCVBUF at net.core.rmem_max (and reports twice the requested value for its own
+    bookkeeping), so SO_RCVBUFFORCE is tried when the plain request falls short. That needs
+    CAP_NET_ADMIN; without it the capped size is kept and a warning is logged.
+    """
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    granted = server_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+    if granted < size and hasattr(socket, "SO_RCVBUFFORCE"):
+        try:
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUFFORCE, size)
+            granted = server_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        except PermissionError:
+            log_both(f"SO_RCVBUF of {size} bytes capped at {granted} by net.core.rmem_max "
+                     f"(raise the sysctl or grant CAP_NET_ADMIN)", "warning")
+
+    return granted
+
+
+def read_udp_socket_stats(server_socket: socket.socket) -> Optional[Dict[str, int]]:
+    """
+    Return the receive queue length and kernel drop counter of `server_socket`.
+
+    The values come from the socket's row in /proc/net/udp (or udp6), found by inode. `drops`
+    counts datagrams the kernel discarded for this socket, mostly because the receive buffer was
+    full. Returns None when the row cannot be read (e.g. no procfs).
+    """
+    inode = str(os.fstat(server_socket.fileno()).st_ino)
+
+    for path in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(path) as table:
+                next(table)
+                for line in table:
+                    columns = line.split()
+                    if len(columns) > DROPS_COLUMN and columns[INODE_COLUMN] == inode:
+                        rx_queue = columns[QUEUE_COLUMN].split(':')[1]
+                        return {
+                            "socket_rx_queue_bytes": int(rx_queue, 16),
+                            "kernel_drops": int(columns[DROPS_COLUMN])
+                        }
+        except (OSError, ValueError, StopIteration):
+            continue
+
+    return None
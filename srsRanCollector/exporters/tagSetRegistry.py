@@ -0,0 +1,71 @@
+from typing import Any, Callable, Dict, Hashable, List
+
+from exporters.lineProtocol import lineBuffer
+
+"""
+# -- Interned Tag Sets --
+
+Parsers write the same tag combinations (`component`, `pci`, `rnti`, `imeisv`, `drb_key`,
+`direction`, ...) for every field of every message. `tagSetRegistry.tag_set(owner, **tags)`
+serializes a combination once, through `lineBuffer.tag_set()`, and afterwards returns the same
+pre-escaped, sorted fragment object from a dictionary lookup.
+
+Entries are grouped by an owner: the UE (`("ue", rnti)`), DRB (`drb_key`), cell or component
+whose tags they carry. When a UE or DRB goes away its parser calls `evict(owner)`, so the cache
+follows the live set of entities instead of growing with every RNTI ever seen. Tag sets whose
+values are unbounded (alert messages, for example) should not be interned.
+
+Consumers that keep per-series state (the latest-value store) register in `on_evict` and are
+handed the evicted fragments, so their series go away with the UE or DRB too.
+"""
+
+
+class tagSetRegistry:
+    def __init__(self, lines: lineBuffer):
+        self.lines = lines
+        self.owners: Dict[Hashable, Dict[tuple, str]] = {}
+        # Called with the fragments of an evicted owner
+        self.on_evict: List[Callable[[List[str]], None]] = []
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def tag_set(self, owner: Hashable, **tags) -> str:
+        """Return the interned fragment for these tags, serializing it on first use."""
+        key = tuple(tags.items())
+        owned = self.owners.get(owner)
+        if owned is None:
+            owned = self.owners[owner] = {}
+        else:
+            fragment = owned.get(key)
+            if fragment is not None:
+                self.hits += 1
+                return fragment
+
+        self.misses += 1
+        fragment = owned[key] = self.lines.tag_set(**tags)
+        return fragment
+
+    def evict(self, owner: Hashable) -> int:
+        """Drop every tag set of an owner (UE released, DRB gone); returns how many were dropped."""
+        owned = self.owners.pop(owner, None)
+        if not owned:
+            return 0
+        self.evictions += len(owned)
+        if self.on_evict:
+            fragments = list(owned.values())
+            for listener in self.on_evict:
+                listener(fragments)
+        return len(owned)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return registry statistics."""
+        return {
+            "owners": len(self.owners),
+            "entries": sum(len(owned) for owned in self.owners.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,85 @@
+import select
+import socket
+from typing import List, Optional
+
+from exporters.helper_functions import log_both
+
+# Linux reports the real datagram length with MSG_TRUNC even when the buffer is smaller
+MSG_TRUNC = getattr(socket, "MSG_TRUNC", 0)
+
+
+class udpReceiver:
+    """
+    Batched UDP receiver backed by a ring of preallocated buffers.
+
+    Every wakeup waits for the socket to become readable, then drains up to
+    `batch_size` datagrams with non-blocking `recv_into` calls. Each datagram
+    is returned as a memoryview into the ring, so no per-datagram buffer is
+    allocated. A view stays valid until the ring wraps around to its slot,
+    which never happens within a single batch. The sender of each datagram
+    is left in `addresses`, in batch order.
+    """
+
+    def __init__(self, server_socket: socket.socket, buffer_size: int = 65535, ring_size: int = 64,
+                 batch_size: int = 64):
+        self.server_socket = server_socket
+        self.server_socket.setblocking(False)
+
+        # Ring of datagram-sized buffers (65535 covers the largest possible UDP payload)
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.ring_size = max(ring_size, batch_size)
+        self.ring = [memoryview(bytearray(buffer_size)) for _ in range(self.ring_size)]
+        self.position = 0
+        self.addresses = []
+
+        self.poller = select.poll()
+        self.poller.register(self.server_socket, select.POLLIN)
+
+        # Counters
+        self.wakeup_count = 0
+        self.datagram_count = 0
+        self.byte_count = 0
+        self.truncated_count = 0
+
+    def receive_batch(self, timeout: Optional[float] = None) -> List[memoryview]:
+        """Wait for data and return every datagram that can be read without blocking."""
+        if not self.poller.poll(None if timeout is None else timeout * 1000):
+            return []
+
+        self.wakeup_count += 1
+        batch = []
+        self.addresses.clear()
+
+        for _ in range(self.batch_size):
+            buffer = self.ring[self.position]
+            try:
+                nbytes, address = self.server_socket.recvfrom_into(buffer, self.buffer_size, MSG_TRUNC)
+            except (BlockingIOError, InterruptedError):
+                break
+
+            self.position = (self.position + 1) % self.ring_size
+            self.datagram_count += 1
+            self.byte_count += nbytes
+
+            if nbytes > self.buffer_size:
+                self.truncated_count += 1
+                log_both(f"Dropping truncated datagram ({nbytes} bytes, buffer is {self.buffer_size})", "warning")
+                continue
+
+            batch.append(buffer[:nbytes])
+            self.addresses.append(address)
+
+        return batch
+
+    def get_stats(self):
+        """Return receiver statistics."""
+        return {
+            "wakeup_count": self.wakeup_count,
+            "datagram_count": self.datagram_count,
+            "byte_count": self.byte_count,
+            "truncated_count": self.truncated_count,
+            "buffer_size": self.buffer_size,
+            "ring_size": self.ring_size,
+            "batch_size": self.batch_size
+        }
@@ -0,0 +1,334 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from exporters.helper_functions import log_both
+from exporters.influxTransport import is_retryable
+from exporters.lineProtocol import line_count
+
+"""
+# -- Write-Ahead Spool for InfluxDB Outages --
+
+When a write to InfluxDB fails, the batch is appended to the spool instead of being dropped, and
+the sink is marked down: later batches go straight to disk, so neither the writer thread nor a
+synchronous caller waits out another timeout. A background thread replays the spool, oldest
+first, through the same transport; its first successful write marks the sink up again, after
+which it drains the rest at `replay_rate` points per second alongside the live writes. Batches
+InfluxDB rejects as invalid (4xx other than 429) are dropped rather than retried.
+
+1. Segment layout (like the capture files of `captureFile.py`):
+   - 8 byte file header: `SRSSPL` + 2 byte format version.
+   - One record per batch: a 16 byte little-endian header (body length, point count, CRC-32 of
+     the body, 4 pad bytes), then the newline-separated line protocol, zero-padded to a multiple
+     of 8 bytes.
+   - Segments are created at `segment_bytes` and written through `mmap`. A record's body is
+     copied in before its header, so a zero length marks the end of the written part and a
+     record cut short by a crash is never read. Full segments are truncated to their used size.
+
+2. Disk budget and replay:
+   - Segments (`spool-<YYYYmmdd-HHMMSS>-<seq>.spl`) left by a previous run are replayed at
+     startup; `<seq>` continues from the highest one found and a segment is never opened over
+     an existing file. `.spl` files without the header or without any record are left alone
+     (and logged), never replayed or deleted. Once the segments exceed `max_bytes`, the oldest
+     is deleted and its points are counted as evicted.
+   - A segment is deleted once every record in it is written. A restart part-way through a
+     segment replays that segment from its start; InfluxDB overwrites identical points, so the
+     repeat is harmless.
+"""
+
+MAGIC = b"SRSSPL\x00\x01"
+RECORD_HEADER = struct.Struct("<III4x")
+ALIGNMENT = 8
+SEGMENT_SUFFIX = ".spl"
+
+
+class writeSpool:
+    def __init__(self, directory: str, write: Callable[[List[bytes]], None], segment_bytes: int = 16 * 1024 ** 2,
+                 max_bytes: int = 1024 ** 3, replay_rate: float = 50000, retry_interval: float = 5.0):
+        self.directory = directory
+        self.write = write
+        self.segment_bytes = max(segment_bytes, 64 * 1024)
+        self.max_bytes = max(max_bytes, self.segment_bytes)
+        self.replay_rate = replay_rate
+        self.retry_interval = retry_interval
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.stop_event = threading.Event()
+        self.sink_down = False
+
+        # Sealed segments, oldest first: [path, size on disk, points]
+        self.segments = deque()
+        self.sequence = 0
+        # Segment being appended to
+        self.active_path: Optional[str] = None
+        self.active_file = None
+        self.active_map: Optional[mmap.mmap] = None
+        self.active_offset = 0
+        self.active_points = 0
+        # Segment being replayed (cleared if it is evicted meanwhile)
+        self.replay_path: Optional[str] = None
+
+        # Counters
+        self.spooled_batches = 0
+        self.spooled_points = 0
+        self.replayed_points = 0
+        self.evicted_points = 0
+        self.rejected_points = 0
+        self.corrupt_records = 0
+        self.replay_failures = 0
+
+        self.load_segments()
+        self.thread = threading.Thread(target=self.run, name="influx-spool-replay", daemon=True)
+        self.thread.start()
+
+    def load_segments(self):
+        """Queue the segments a previous run left behind."""
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(SEGMENT_SUFFIX):
+                self.sequence = max(self.sequence, segment_sequence(name))
+                path = os.path.join(self.directory, name)
+                records = read_records(path, verify=False)
+                if not records:
+                    # Foreign, empty or never written: not ours to replay or delete
+                    log_both(f"{path} is not a spool segment or holds no records, leaving it in place", "warning")
+                    continue
+                points = sum(points for points, _ in records)
+                self.segments.append([path, os.path.getsize(path), points])
+        if self.segments:
+            log_both(f"Replaying {len(self.segments)} spool segments ({self.pending_points()} points) "
+                     f"from {self.directory}")
+        self.enforce_budget()
+
+    def pending_points(self) -> int:
+        return sum(segment[2] for segment in self.segments) + self.active_points
+
+    def disk_bytes(self) -> int:
+        return sum(segment[1] for segment in self.segments) + (len(self.active_map) if self.active_map else 0)
+
+    def append(self, chunks: List[bytes], sink_failed: bool = False) -> bool:
+        """
+        Spool a batch of line-protocol chunks; returns False if it could not be stored.
+
+        `sink_failed` marks the sink down: everything is spooled until a replayed write succeeds.
+        """
+        body = b"\n".join(chunks)
+        points = sum(line_count(chunk) for chunk in chunks)
+        size = RECORD_HEADER.size + len(body) + (-len(body) % ALIGNMENT)
+
+        with self.lock:
+            try:
+                if self.active_map is None or self.active_offset + size > len(self.active_map):
+                    self.seal()
+                    self.open_segment(max(self.segment_bytes, len(MAGIC) + size))
+
+                start = self.active_offset + RECORD_HEADER.size
+                self.active_map[start:start + len(body)] = body
+                # The header goes in last: until then the record reads as the end of the segment
+                RECORD_HEADER.pack_into(self.active_map, self.active_offset, len(body), points, zlib.crc32(body))
+            except (OSError, ValueError) as e:
+                log_both(f"Could not spool {points} points: {e}", "error")
+                return False
+
+            self.active_offset += size
+            self.active_points += points
+            self.spooled_batches += 1
+            self.spooled_points += points
+            if sink_failed and not self.sink_down:
+                self.sink_down = True
+                log_both(f"InfluxDB unavailable, spooling writes to {self.directory}", "warning")
+            self.enforce_budget()
+            self.wakeup.notify()
+        return True
+
+    def open_segment(self, size: int):
+        while True:
+            self.sequence += 1
+            name = f"spool-{time.strftime('%Y%m%d-%H%M%S')}-{self.sequence:06d}{SEGMENT_SUFFIX}"
+            self.active_path = os.path.join(self.directory, name)
+            try:
+                # Exclusive: never truncate a segment that is still waiting to be replayed
+                self.active_file = open(self.active_path, "x+b")
+                break
+            except FileExistsError:
+                continue
+        self.active_file.truncate(size)
+        self.active_map = mmap.mmap(self.active_file.fileno(), size)
+        self.active_map[:len(MAGIC)] = MAGIC
+        self.active_offset = len(MAGIC)
+        self.active_points = 0
+
+    def seal(self):
+        """Close the active segment, trimmed to its used size, and queue it for replay (lock held)."""
+        if self.active_map is None:
+            return
+        self.active_map.flush()
+        self.active_map.close()
+        self.active_file.truncate(self.active_offset)
+        self.active_file.close()
+        self.segments.append([self.active_path, self.active_offset, self.active_points])
+        self.active_path = self.active_file = self.active_map = None
+        self.active_points = 0
+
+    def enforce_budget(self):
+        """Delete the oldest sealed segments while the spool is over `max_bytes`."""
+        while self.segments and self.disk_bytes() > self.max_bytes:
+            path, _, points = self.segments.popleft()
+            if path == self.replay_path:
+                self.replay_path = None
+            self.remove(path)
+            self.evicted_points += points
+            log_both(f"Spool over {self.max_bytes} bytes, dropped oldest segment {path} ({points} points)",
+                     "warning")
+
+    @staticmethod
+    def remove(path: str):
+        try:
+            os.remove(path)
+        except OSError as e:
+            log_both(f"Could not remove spool segment {path}: {e}", "warning")
+
+    def next_segment(self) -> Optional[str]:
+        """Wait for a segment to replay; an active segment with records is sealed for it."""
+        with self.lock:
+            while not self.stop_event.is_set():
+                if not self.segments and self.active_points:
+                    self.seal()
+                if self.segments:
+                    self.replay_path = self.segments[0][0]
+                    return self.replay_path
+                # Nothing left to probe the sink with (e.g. a failed write could not be stored)
+                self.sink_down = False
+                self.wakeup.wait()
+        return None
+
+    def run(self):
+        next_write = time.monotonic()
+        while True:
+            path = self.next_segment()
+            if path is None:
+                return
+
+            for points, body in read_records(path):
+                if body is None:
+                    self.corrupt_records += 1
+                    log_both(f"Skipping the rest of spool segment {path}: record checksum mismatch", "error")
+                    break
+
+                # Keep retrying this record until it is written, the spool stops or it is evicted
+                while self.replay_path == path and not self.stop_event.is_set():
+                    delay = next_write - time.monotonic()
+                    if delay > 0:
+                        # Pacing or retry wait; the segment may be evicted meanwhile
+                        self.stop_event.wait(delay)
+                        continue
+                    try:
+                        self.write([body])
+                    except Exception as e:
+                        if not is_retryable(e):
+                            self.rejected_points += points
+                            log_both(f"InfluxDB rejected {points} spooled points, dropping them: {e}", "error")
+                            self.finish_record(path, points)
+                            break
+                        self.replay_failures += 1
+                        log_both(f"Spool replay failed ({e}), retrying in {self.retry_interval}s", "warning")
+                        next_write = time.monotonic() + self.retry_interval
+                        continue
+
+                    if self.sink_down:
+                        self.sink_down = False
+                        log_both(f"InfluxDB reachable again, replaying {self.pending_points()} spooled points")
+                    next_write = max(next_write, time.monotonic()) + points / self.replay_rate
+                    self.replayed_points += points
+                    self.finish_record(path, points)
+                    break
+
+                if self.replay_path != path or self.stop_event.is_set():
+                    break
+
+            with self.lock:
+                if self.stop_event.is_set():
+                    return
+                if self.replay_path == path:
+                    self.segments.popleft()
+                    self.remove(path)
+                self.replay_path = None
+
+    def finish_record(self, path: str, points: int):
+        with self.lock:
+            if self.replay_path == path:
+                self.segments[0][2] -= points
+
+    def close(self, timeout: float = 5.0):
+        """Stop replaying and keep whatever is left on disk for the next start."""
+        with self.lock:
+            self.stop_event.set()
+            self.wakeup.notify()
+        self.thread.join(timeout)
+        with self.lock:
+            self.seal()
+            if self.segments:
+                log_both(f"Spool closed with {self.pending_points()} points in {len(self.segments)} segments "
+                         f"under {self.directory}", "warning")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return spool statistics."""
+        with self.lock:
+            return {
+                "sink_down": int(self.sink_down),
+                "segments": len(self.segments) + (self.active_map is not None),
+                "disk_bytes": self.disk_bytes(),
+                "pending_points": self.pending_points(),
+                "spooled_batches": self.spooled_batches,
+                "spooled_points": self.spooled_points,
+                "replayed_points": self.replayed_points,
+                "evicted_points": self.evicted_points,
+                "rejected_points": self.rejected_points,
+                "corrupt_records": self.corrupt_records,
+                "replay_failures": self.replay_failures
+            }
+
+
+def segment_sequence(name: str) -> int:
+    """The `<seq>` of a segment name (0 if it does not follow the naming scheme)."""
+    try:
+        return int(name[:-len(SEGMENT_SUFFIX)].rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def read_records(path: str, verify: bool = True) -> List[Tuple[int, Optional[bytes]]]:
+    """
+    Return (points, body) for the written records of one segment, in order.
+
+    A record whose checksum does not match ends the list with a None body (when `verify`).
+    """
+    records = []
+    with open(path, "rb") as segment_file:
+        if os.fstat(segment_file.fileno()).st_size <= len(MAGIC):
+            return records
+        with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(MAGIC)] != MAGIC:
+                return records
+
+            offset = len(MAGIC)
+            size = len(mapped)
+            while offset + RECORD_HEADER.size <= size:
+                length, points, checksum = RECORD_HEADER.unpack_from(mapped, offset)
+                start = offset + RECORD_HEADER.size
+                if length == 0 or start + length > size:
+                    break
+                body = mapped[start:start + length]
+                if verify and zlib.crc32(body) != checksum:
+                    records.append((points, None))
+                    break
+                records.append((points, body))
+                offset = start + length + (-length % ALIGNMENT)
+    return records
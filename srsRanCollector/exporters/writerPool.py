@@ -0,0 +1,125 @@
+import re
+import threading
+import time
+from typing import Callable, Dict, List
+
+from exporters.batchingWriter import batchingWriter
+from exporters.helper_functions import log_both
+
+"""
+# -- Parallel Writer Pool --
+
+Runs `workers` `batchingWriter`s side by side, each with its own buffer and writer thread (and so
+its own keep-alive connection from the transport's pool), and gives every measurement to exactly
+one of them: `ue_metrics`, `rlc_metrics`, `du_component_metrics`, ... are written in parallel
+while all points of a series still go through one buffer, in order.
+
+1. Routing:
+   - A record is routed by the measurement of its first line; records therefore must hold a
+     single measurement (`lineBuffer` in partitioned mode produces one record per measurement).
+     `Point`s are serialized here to read it, and handed on as line protocol, which the
+     workers pass through without serializing again.
+   - Measurements are assigned round-robin the first time they are seen and keep their worker
+     for the life of the process.
+
+2. Each worker's buffer is bounded by `max_pending` points (its queue depth). `get_stats()`
+   reports the pool totals under the `batchingWriter` keys, plus per worker its queue depth,
+   points written and dropped, write throughput and measurement count. Reading the stats does
+   not change them, so the debug endpoint, self-metrics and the stats log see the same figures.
+"""
+
+# Measurement at the start of a line: everything up to the first unescaped ',' or ' '
+MEASUREMENT = re.compile(rb'(?:[^,\\ ]|\\.)*')
+
+
+def record_measurement(record: object) -> str:
+    """Measurement of a serialized record's first line ("" for a record that is not serialized)."""
+    if isinstance(record, bytes):
+        return MEASUREMENT.match(record).group().decode()
+    return ""
+
+
+class writerPool:
+    def __init__(self, serialize: Callable[[object], bytes], write_lines: Callable[[List[bytes]], bool],
+                 workers: int = 4, **writer_options):
+        self.serialize = serialize
+        self.workers = [batchingWriter(serialize, write_lines, name=f"influx-writer-{index}", **writer_options)
+                        for index in range(max(1, workers))]
+
+        # measurement -> worker index
+        self.assignments: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def route(self, record: object) -> int:
+        measurement = record_measurement(record)
+        index = self.assignments.get(measurement)
+        if index is None:
+            with self.lock:
+                index = self.assignments.get(measurement)
+                if index is None:
+                    index = self.assignments[measurement] = len(self.assignments) % len(self.workers)
+                    log_both(f"Writer pool: measurement {measurement} assigned to worker {index}", "debug")
+        return index
+
+    def serialized(self, record: object) -> object:
+        """The record as line protocol, which names its measurement."""
+        if isinstance(record, bytes):
+            return record
+        try:
+            return self.serialize(record)
+        except Exception:
+            # Handed on as is: the worker drops and reports it like any record that fails to serialize
+            return record
+
+    def submit(self, points: List[object]):
+        """Hand each record to its measurement's worker (never blocks on the network)."""
+        if len(points) == 1:
+            record = self.serialized(points[0])
+            self.workers[self.route(record)].submit([record])
+            return
+        groups: Dict[int, List[object]] = {}
+        for record in points:
+            record = self.serialized(record)
+            groups.setdefault(self.route(record), []).append(record)
+        for index, records in groups.items():
+            self.workers[index].submit(records)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Write everything buffered so far in every worker."""
+        deadline = time.monotonic() + timeout
+        flushed = True
+        for worker in self.workers:
+            flushed = worker.flush(max(0.0, deadline - time.monotonic())) and flushed
+        return flushed
+
+    def close(self, timeout: float = 30.0):
+        """Flush and stop every worker; they drain in parallel."""
+        for worker in self.workers:
+            with worker.lock:
+                worker.stopping = True
+                worker.wakeup.notify()
+        for worker in self.workers:
+            worker.close(timeout)
+
+    def backlog(self) -> float:
+        """Fill of the fullest worker's buffer (0 to 1)."""
+        return max(worker.backlog() for worker in self.workers)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return pool totals and per-worker queue depth and throughput."""
+        stats = {"workers": len(self.workers)}
+        counts = {}
+        for index in self.assignments.values():
+            counts[index] = counts.get(index, 0) + 1
+
+        for index, worker in enumerate(self.workers):
+            worker_stats = worker.get_stats()
+            for key, value in worker_stats.items():
+                stats[key] = stats.get(key, 0) + value
+
+            stats[f"worker{index}_pending_points"] = worker_stats["pending_points"]
+            stats[f"worker{index}_written_points"] = worker_stats["written_points"]
+            stats[f"worker{index}_dropped_points"] = worker_stats["dropped_points"]
+            stats[f"worker{index}_points_per_second"] = worker_stats["points_per_second"]
+            stats[f"worker{index}_measurements"] = counts.get(index, 0)
+        return stats
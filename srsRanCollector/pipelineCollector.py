@@ -0,0 +1,199 @@
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List
+
+from influxdb_client import Point
+
+from collector import collector
+from exporters.boundedQueue import boundedQueue
+from exporters.helper_functions import log_both
+from exporters.udpReceiver import udpReceiver
+
+"""
+# -- Pipelined Collector Runtime --
+
+Runs the same parsers as `collector`, split into three stages so that a slow stage no longer
+stalls the others:
+
+1. Receiver thread:
+   - Only pulls datagrams off the socket (plain `recv()` or the `RECV_MODE=ring` buffer ring),
+     sniffs its message type from the raw bytes (see `messageRouter`), drops disabled types and
+     puts the rest on the receive queue.
+
+2. Parse stage (main thread):
+   - Drains the receive queue and runs `process_datagram()` -> `categorise_and_parse()`.
+   - The exporter's hand-off is pointed at the export queue, so parsers return as soon as their
+     points are queued instead of waiting on an InfluxDB round trip.
+   - Housekeeping from `get_periodic_tasks()` also runs here, between batches, because the
+     parsers are not thread-safe.
+
+3. Export thread:
+   - Drains the export queue and writes the queued points to InfluxDB in combined requests.
+   - In this runtime the `write` latency stage only covers queueing the points; the InfluxDB
+     round trip is timed separately as the `export` stage.
+
+Both queues are bounded. When one is full its policy (`drop_oldest`, `drop_newest` or `block`)
+decides what happens, and every drop is counted against its message type. The counts are written
+as `collector_queue_metrics` points every `PIPELINE_METRICS_INTERVAL` seconds.
+
+With `LOAD_SHEDDING=true` the fill of both queues drives the `loadShedder`, and the receiver
+thread already drops shed message types instead of queueing them.
+"""
+
+
+class pipelineCollector(collector):
+    def __init__(self, reuse_port: bool = False):
+        super().__init__(reuse_port=reuse_port)
+
+        self.receive_queue = boundedQueue("receive", int(os.getenv('PIPELINE_RECEIVE_QUEUE_SIZE', '10000')),
+                                          os.getenv('PIPELINE_RECEIVE_POLICY', 'drop_oldest'))
+        self.export_queue = boundedQueue("export", int(os.getenv('PIPELINE_EXPORT_QUEUE_SIZE', '1000')),
+                                         os.getenv('PIPELINE_EXPORT_POLICY', 'drop_oldest'))
+        self.parse_batch_size = int(os.getenv('PIPELINE_PARSE_BATCH_SIZE', '256'))
+        self.export_batch_size = int(os.getenv('PIPELINE_EXPORT_BATCH_SIZE', '64'))
+        self.metrics_interval = float(os.getenv('PIPELINE_METRICS_INTERVAL', '10'))
+
+        self.stats['export_batches'] = 0
+
+        self.stop_event = threading.Event()
+
+        # Message type of the datagram being parsed, used to attribute export queue drops
+        self.current_message_type = 'collector'
+        self.exporter.handoff = self.enqueue_points
+
+        if self.shedder is not None:
+            self.shedder.add_signal('receive_queue', self.receive_queue.fill)
+            self.shedder.add_signal('export_queue', self.export_queue.fill)
+
+    def enqueue_points(self, points: List[Point]):
+        """Exporter hand-off: queue points for the export thread (runs on the parse stage)."""
+        self.export_queue.put(self.current_message_type, points)
+
+    def enqueue_datagram(self, datagram: bytes, address=None):
+        self.on_receive(datagram, address)
+
+        message_type = self.router.sniff(datagram)
+        if not self.router.is_enabled(message_type):
+            self.router.filtered[message_type] += 1
+            return
+        # Shed types never take a queue slot; the level itself is updated by the parse stage
+        if self.shedder is not None and message_type is not None and self.shedder.shed_message(message_type):
+            return
+
+        self.receive_queue.put(message_type or 'unknown', datagram)
+
+    def receive_loop(self):
+        """Receiver thread: pull datagrams off the socket and queue them for parsing."""
+        if self.recv_mode == 'ring':
+            receiver = udpReceiver(self.server_socket, self.recv_buffer_size, self.recv_ring_size,
+                                   self.recv_batch_size)
+            while not self.stop_event.is_set():
+                try:
+                    for datagram, address in zip(receiver.receive_batch(timeout=1.0), receiver.addresses):
+                        self.enqueue_datagram(bytes(datagram), address)
+                except Exception as e:
+                    log_both(f"Socket error: {e}", "error")
+            return
+
+        # Timeout so the stop flag is checked even when nothing arrives
+        self.server_socket.settimeout(1.0)
+        while not self.stop_event.is_set():
+            try:
+                self.enqueue_datagram(*self.server_socket.recvfrom(self.recv_buffer_size))
+            except socket.timeout:
+                continue
+            except Exception as e:
+                log_both(f"Socket error: {e}", "error")
+
+    def export_loop(self):
+        """Export thread: write queued points to InfluxDB, combining whatever has accumulated."""
+        while not self.stop_event.is_set() or len(self.export_queue):
+            batch = self.export_queue.get_batch(self.export_batch_size, timeout=1.0)
+            if not batch:
+                continue
+
+            points = [point for _, batch_points in batch for point in batch_points]
+            self.stats['export_batches'] += 1
+            start = time.perf_counter_ns()
+            try:
+                self.exporter.write_points(points)
+            except Exception as e:
+                log_both(f"Unexpected error exporting batch: {e}", "error")
+
+            if self.latency is not None:
+                # Batches mix message types, so the export stage is not split by type
+                self.latency.record('export', 'all', time.perf_counter_ns() - start)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return collector, per-parser and per-queue statistics."""
+        stats = super().get_stats()
+        for queue in (self.receive_queue, self.export_queue):
+            queue_stats = queue.get_stats()
+            stats[f'{queue.name}_queue_depth'] = queue_stats['depth']
+            stats[f'{queue.name}_queue_dropped'] = queue_stats['dropped']
+        return stats
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Depth, high watermark and drops of the receive and export queues."""
+        return {queue.name: queue.get_stats() for queue in (self.receive_queue, self.export_queue)}
+
+    def write_queue_metrics(self):
+        """Write queue depth and per-message-type drop counts as collector self-metrics."""
+        timestamp_ns = time.time_ns()
+        points = []
+
+        for queue in (self.receive_queue, self.export_queue):
+            queue_stats = queue.get_stats()
+            for field in ('depth', 'high_watermark', 'put_count', 'dropped'):
+                points.append(Point("collector_queue_metrics").field(field, queue_stats[field])
+                              .tag("queue", queue.name).tag("policy", queue.policy)
+                              .tag("component", "collector").time(timestamp_ns))
+            for message_type, dropped in queue_stats['dropped_by_type'].items():
+                points.append(Point("collector_queue_metrics").field("dropped", dropped)
+                              .tag("queue", queue.name).tag("policy", queue.policy)
+                              .tag("message_type", message_type)
+                              .tag("component", "collector").time(timestamp_ns))
+
+        self.exporter.write_to_influx(points)
+
+    def get_periodic_tasks(self):
+        return super().get_periodic_tasks() + [
+            ("queue_metrics", self.metrics_interval, self.write_queue_metrics),
+        ]
+
+    def run_due_tasks(self, tasks, next_run: Dict[str, float]):
+        # Points written by housekeeping are attributed to the collector itself
+        self.current_message_type = 'collector'
+        super().run_due_tasks(tasks, next_run)
+
+    def run(self):
+        log_both(f"Starting pipelined collection loop (receive queue {self.receive_queue.capacity} "
+                 f"{self.receive_queue.policy}, export queue {self.export_queue.capacity} "
+                 f"{self.export_queue.policy})")
+
+        receiver = threading.Thread(target=self.receive_loop, name="receiver", daemon=True)
+        exporter_thread = threading.Thread(target=self.export_loop, name="exporter", daemon=True)
+        receiver.start()
+        exporter_thread.start()
+
+        tasks = self.get_periodic_tasks()
+        next_run = {name: time.time() + interval for name, interval, _ in tasks}
+
+        try:
+            while True:
+                for message_type, datagram in self.receive_queue.get_batch(self.parse_batch_size, timeout=0.5):
+                    self.current_message_type = message_type
+                    self.process_datagram(datagram, None if message_type == 'unknown' else message_type)
+
+                self.run_due_tasks(tasks, next_run)
+
+        except KeyboardInterrupt:
+            log_both("Shutdown requested")
+        finally:
+            self.stop_event.set()
+            receiver.join(timeout=2)
+            # Let the export thread flush what the parse stage already produced
+            exporter_thread.join(timeout=10)
+            self.shutdown()
@@ -0,0 +1,76 @@
+import argparse
+import socket
+import time
+
+from exporters.captureFile import read_capture
+from exporters.helper_functions import log_both
+
+"""
+# -- Capture Replay --
+
+Resends datagrams recorded by the collector (`CAPTURE_DIR`, see `captureFile`) to a collector.
+
+    python replay.py /captures                       # original pacing
+    python replay.py /captures --speed 10            # ten times faster than recorded
+    python replay.py /captures --speed 0             # as fast as possible
+    python replay.py capture-1-...-000001.cap --host 10.0.0.5 --loop 3
+
+Directories are expanded to their segments and the streams of different writers (sharded
+workers) are merged by receive time. Pacing follows the recorded receive timestamps divided by
+`--speed`; the replay never waits to catch up if it falls behind.
+"""
+
+REPORT_EVERY = 100000
+
+
+def replay(paths, host: str, port: int, speed: float, loops: int = 1):
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect((host, port))
+
+    sent = 0
+    sent_bytes = 0
+    errors = 0
+    started = time.perf_counter()
+
+    for _ in range(loops):
+        first_ns = None
+        loop_start = time.perf_counter()
+
+        for timestamp_ns, _sender, payload in read_capture(paths):
+            if speed > 0:
+                if first_ns is None:
+                    first_ns = timestamp_ns
+                delay = loop_start + (timestamp_ns - first_ns) / 1e9 / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            try:
+                sender.send(payload)
+            except OSError as e:
+                # e.g. ECONNREFUSED from a previous send while nothing listens on the port
+                errors += 1
+                if errors == 1:
+                    log_both(f"Send failed: {e}", "warning")
+                continue
+
+            sent += 1
+            sent_bytes += len(payload)
+            if sent % REPORT_EVERY == 0:
+                log_both(f"Replayed {sent} datagrams")
+
+    elapsed = time.perf_counter() - started
+    log_both(f"Replayed {sent} datagrams ({sent_bytes} bytes) in {elapsed:.2f}s "
+             f"({sent / elapsed if elapsed else 0:.0f} datagrams/s, {errors} send errors)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a datagram capture to the collector")
+    parser.add_argument("paths", nargs="+", help="capture segments or capture directories")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=55555)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="pacing multiplier: 1 = as recorded, 10 = ten times faster, 0 = as fast as possible")
+    parser.add_argument("--loop", type=int, default=1, help="replay the capture this many times")
+    args = parser.parse_args()
+
+    replay(args.paths, args.host, args.port, args.speed, args.loop)
@@ -0,0 +1,247 @@
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from typing import Dict, Any
+
+from collector import create_collector, build_stats_points, stop_on_sigterm
+from exporters.debugEndpoint import debugEndpoint, process_memory
+from exporters.exporter import exporter
+from exporters.helper_functions import log_both
+
+"""
+# -- Sharded Collector Supervisor --
+
+A single collector process is bound by the GIL. With `WORKER_COUNT=N` (N > 1) this supervisor
+runs N worker processes instead. They are forked by a `forkserver`, not by the supervisor itself,
+which already runs exporter and debug-endpoint threads a forked child would inherit half-way. Each worker builds its own collector (runtime chosen by
+`COLLECTOR_MODE`) with its own SO_REUSEPORT socket on port 55555 and its own set of parsers.
+
+1. Sharding:
+   - The kernel hashes each datagram's 4-tuple to one of the sockets, so every sender
+     (gNB / srsRAN instance) always lands on the same worker. UE, IMEISV and DRB state kept
+     by the parsers therefore stays consistent within that worker.
+
+2. Self-metrics:
+   - Workers push `get_stats()` to the supervisor every `WORKER_REPORT_INTERVAL` seconds.
+   - The supervisor combines the latest report of every worker and writes one combined set of
+     `collector_metrics` / `collector_parser_metrics` points through its own exporter.
+   - Counters are summed, and the last report of a worker that exited stays in the total, so
+     combined counters never go backwards across restarts. Current depths and sizes (gauges)
+     are summed over the live workers only; settings and levels every worker reports (socket
+     buffer size, shedding level, ...) take the largest value.
+
+3. Supervision:
+   - Workers that exit are restarted and counted in `worker_restarts`.
+   - With `DEBUG_PORT` set, the supervisor's debug endpoint shows the combined counters and
+     worker n serves its own parsers' internals on `DEBUG_PORT` + 1 + n.
+"""
+
+
+def report_worker_stats(worker, worker_id: int, stats_queue, interval: float):
+    """Worker-side reporter thread: push this worker's counters to the supervisor."""
+    # Keep SIGINT/SIGTERM on the main thread, which may be blocked in recv() and must be interrupted
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT, signal.SIGTERM})
+
+    while True:
+        time.sleep(interval)
+        try:
+            stats_queue.put((worker_id, os.getpid(), worker.get_stats()))
+        except Exception as e:
+            log_both(f"Worker {worker_id} failed to report stats: {e}", "warning")
+
+
+def run_worker(worker_id: int, mode: str, stats_queue, interval: float, run_id: str):
+    """Worker process entry point."""
+    # stop_workers() terminates us with SIGTERM: stop like Ctrl-C so the runtime flushes its batches
+    stop_on_sigterm()
+    # Archive files of this run's workers are told apart from those an earlier run left behind
+    os.environ["COLLECTOR_RUN_ID"] = run_id
+    # Each worker serves its own latest-value store, on the ports after the supervisor's
+    if os.getenv("PROMETHEUS_ENABLED", "false").lower() == "true":
+        os.environ["PROMETHEUS_PORT"] = str(int(os.getenv("PROMETHEUS_PORT", "8000")) + 1 + worker_id)
+    # Likewise each worker's debug endpoint; the supervisor serves the combined view on DEBUG_PORT
+    if int(os.getenv("DEBUG_PORT", "0")) > 0:
+        os.environ["DEBUG_PORT"] = str(int(os.getenv("DEBUG_PORT")) + 1 + worker_id)
+    worker = create_collector(mode, reuse_port=True)
+    # The supervisor publishes the combined self-metrics
+    worker.self_metrics_interval = 0
+    # Latency histograms are not summable across workers, so each worker writes its own
+    if worker.latency is not None:
+        worker.latency.tags['worker'] = str(worker_id)
+    log_both(f"Worker {worker_id} (pid {os.getpid()}) listening with SO_REUSEPORT")
+
+    reporter = threading.Thread(target=report_worker_stats, args=(worker, worker_id, stats_queue, interval),
+                                name="stats-reporter", daemon=True)
+    reporter.start()
+
+    worker.run()
+
+
+# Not combined (the supervisor reports its own uptime; the compression ratio is recomputed)
+SKIPPED_STATS = {'start_time', 'uptime_seconds', 'transport_compression_ratio'}
+# Settings and levels every worker reports: combined as the largest value
+MAX_STATS = {'socket_receive_buffer', 'writer_workers', 'spool_sink_down', 'shed_level', 'shed_pressure'}
+MAX_PREFIXES = ('shed_signal_',)
+# Current depths, sizes and rates: summed over live workers, not kept once a worker exits
+GAUGE_STATS = {'socket_rx_queue_bytes', 'spool_segments', 'spool_disk_bytes', 'archive_buffered_rows',
+               'archive_open_files', 'latest_series', 'latest_values', 'tag_sets_owners', 'tag_sets_entries'}
+GAUGE_MARKERS = ('pending', '_depth', '_per_second', '_measurements')
+
+
+def stat_kind(key: str) -> str:
+    """How a worker stat is combined: 'skip', 'max', 'gauge' or 'counter'."""
+    if key in SKIPPED_STATS:
+        return 'skip'
+    if key in MAX_STATS or key.startswith(MAX_PREFIXES):
+        return 'max'
+    if key in GAUGE_STATS or any(marker in key for marker in GAUGE_MARKERS):
+        return 'gauge'
+    return 'counter'
+
+
+def merge_stats(total: Dict[str, Any], stats: Dict[str, Any], counters_only: bool = False):
+    """Combine one worker's numeric stats into a running total (see module docstring)."""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            merge_stats(total.setdefault(key, {}), value, counters_only)
+            continue
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        kind = stat_kind(key)
+        if kind == 'skip' or (counters_only and kind != 'counter'):
+            continue
+        if kind == 'max':
+            total[key] = max(total.get(key, value), value)
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+class shardedCollector:
+    def __init__(self):
+        log_both("=== STARTING SHARDED METRICS COLLECTOR ===")
+
+        self.worker_count = int(os.getenv('WORKER_COUNT', str(os.cpu_count() or 1)))
+        self.mode = os.getenv('COLLECTOR_MODE', 'blocking')
+        self.report_interval = float(os.getenv('WORKER_REPORT_INTERVAL', '10'))
+
+        # Workers (and restarts) come from a single-threaded fork server, not this multithreaded process
+        self.context = multiprocessing.get_context("forkserver")
+        self.stats_queue = self.context.Queue()
+        self.workers: Dict[int, multiprocessing.Process] = {}
+        self.worker_stats: Dict[int, Dict[str, Any]] = {}
+        # Counters from the last reports of workers that exited, so combined totals stay monotonic
+        self.retired_stats: Dict[str, Any] = {}
+        self.worker_restarts = 0
+        self.start_time = time.time()
+        # Shared with the workers (and this process's own exporter) to name archive files
+        self.run_id = os.urandom(4).hex()
+        os.environ["COLLECTOR_RUN_ID"] = self.run_id
+
+        # Setup cell_collector_id
+        self.cell_id = os.getenv('CELL_ID', 'unknown')
+
+        # exporter for the combined self-metrics (workers have their own)
+        self.exporter = exporter(self.cell_id, self.cell_id)
+
+        # Combined counters and the supervisor's own memory; workers serve theirs on the ports after it
+        debug_port = int(os.getenv('DEBUG_PORT', '0'))
+        self.debug = debugEndpoint(self.get_debug_snapshot, debug_port) if debug_port > 0 else None
+
+    def start_worker(self, worker_id: int):
+        process = self.context.Process(target=run_worker, name=f"collector-worker-{worker_id}",
+                                       args=(worker_id, self.mode, self.stats_queue, self.report_interval,
+                                             self.run_id))
+        process.start()
+        self.workers[worker_id] = process
+        log_both(f"Started worker {worker_id} (pid {process.pid})")
+
+    def check_workers(self):
+        """Restart any worker process that has exited."""
+        for worker_id, process in list(self.workers.items()):
+            if not process.is_alive():
+                log_both(f"Worker {worker_id} (pid {process.pid}) exited with code {process.exitcode}, restarting",
+                         "warning")
+                self.worker_restarts += 1
+                last_report = self.worker_stats.pop(worker_id, None)
+                if last_report is not None:
+                    merge_stats(self.retired_stats, last_report, counters_only=True)
+                self.start_worker(worker_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Combine the latest report from every worker (and exited workers' counters) into one set."""
+        total: Dict[str, Any] = {}
+        merge_stats(total, self.retired_stats)
+        for stats in list(self.worker_stats.values()):
+            merge_stats(total, stats)
+        if total.get('transport_bytes_sent'):
+            total['transport_compression_ratio'] = round(total['transport_bytes_uncompressed'] /
+                                                         total['transport_bytes_sent'], 2)
+
+        total['uptime_seconds'] = time.time() - self.start_time
+        total['workers_alive'] = sum(1 for process in self.workers.values() if process.is_alive())
+        total['workers_reporting'] = len(self.worker_stats)
+        total['worker_restarts'] = self.worker_restarts
+        return total
+
+    def get_debug_snapshot(self) -> Dict[str, Any]:
+        """Combined worker counters, worker pids and supervisor memory for the debug endpoint."""
+        return {
+            'collector': self.get_stats(),
+            'workers': {worker_id: {'pid': process.pid, 'alive': process.is_alive()}
+                        for worker_id, process in list(self.workers.items())},
+            'process': process_memory()
+        }
+
+    def write_self_metrics(self):
+        points = build_stats_points(self.get_stats(), time.time_ns())
+        if points:
+            self.exporter.write_to_influx(points)
+
+    def stop_workers(self):
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.workers.values():
+            process.join(timeout=5)
+
+    def run(self):
+        log_both(f"Starting {self.worker_count} '{self.mode}' workers on port 55555")
+
+        # Container runtimes stop us with SIGTERM; turn it into a normal exit so workers are cleaned up
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        for worker_id in range(self.worker_count):
+            self.start_worker(worker_id)
+
+        last_report = time.time()
+
+        try:
+            while True:
+                try:
+                    worker_id, pid, stats = self.stats_queue.get(timeout=1.0)
+                    # A report queued just before a worker exited must not count next to its retired counters
+                    process = self.workers.get(worker_id)
+                    if process is not None and process.pid == pid:
+                        self.worker_stats[worker_id] = stats
+                except queue.Empty:
+                    pass
+
+                self.check_workers()
+
+                current_time = time.time()
+                if current_time - last_report >= self.report_interval:
+                    self.write_self_metrics()
+                    last_report = current_time
+
+        except (KeyboardInterrupt, SystemExit):
+            log_both("Shutdown requested")
+        finally:
+            self.stop_workers()
+            # Flushes the last combined self-metrics batch
+            self.exporter.close()
+            if self.debug is not None:
+                self.debug.close()
@@ -0,0 +1,363 @@
+import argparse
+import json
+import random
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from exporters.captureFile import captureWriter
+from exporters.helper_functions import log_both
+
+"""
+# -- Synthetic srsRAN Traffic Generator --
+
+Emits srsRAN-shaped JSON datagrams (the shapes the parsers in `exporters/` read) for any number
+of cells, UEs and DRBs, to find where the collector breaks before the testbed grows.
+
+    python trafficGenerator.py --cells 8 --ues-per-cell 32 --drbs-per-ue 2 --rate 20000 --churn 10
+    python trafficGenerator.py --cells 2 --rate 0 --duration 30          # as fast as possible
+    python trafficGenerator.py --cells 4 --duration 60 --capture /tmp/synthetic   # write a capture
+
+1. Message mix:
+   - Every round, each cell sends `cell_metrics` (ue_list plus any pending event_list), `du`,
+     `ru`, `cu-up` and `rlc_metrics` (one `drb` entry per UE bearer); one `app_resource_usage`
+     is sent per round. UE and DRB lists are split over several datagrams so none exceeds
+     `MAX_ITEMS_PER_MESSAGE` entries.
+   - UE churn (`--churn` events/s) is a mix of creates, removals and handovers. Each shows up as
+     `ue_create` / `ue_rem` cell events, and creates and handovers also send an `imeisv` message
+     mapping the UE's IMEISV to its new RNTI.
+
+2. Throughput:
+   - Message bodies are rendered once and cached per cell with the timestamp left out; sending
+     only prepends `{"timestamp": ...,`. A cell is re-rendered when its UE set changes or every
+     `--refresh` rounds (to vary the values), so sending costs little more than the `send()`.
+   - `--rate` is the total datagram rate (0 = unpaced). `--capture DIR` writes the datagrams to
+     a capture (see `captureFile`) instead of sending them, for `replay.py` and benchmarks.
+"""
+
+MAX_ITEMS_PER_MESSAGE = 32
+FIRST_RNTI = 0x4601
+LAST_RNTI = 0xFFEF
+IMEISV_BASE = 353490069800000
+LATENCY_FIELDS = ('average_latency_us', 'min_latency_us', 'max_latency_us', 'average_throughput_Mbps',
+                  'cpu_usage_percent')
+MODULATION_FIELDS = ('qpsk_mod_throughput_Mbps', 'qam16_mod_throughput_Mbps', 'qam64_mod_throughput_Mbps',
+                     'qam256_mod_throughput_Mbps', 'cpu_usage_percent')
+
+
+class syntheticUe:
+    __slots__ = ('ue_id', 'imeisv', 'rnti', 'drbs')
+
+    def __init__(self, ue_id: int, imeisv: int, rnti: int, drbs: int):
+        self.ue_id = ue_id
+        self.imeisv = imeisv
+        self.rnti = rnti
+        self.drbs = drbs
+
+
+class syntheticCell:
+    def __init__(self, pci: int):
+        self.pci = pci
+        self.ues: Dict[int, syntheticUe] = {}  # rnti -> UE
+        self.next_rnti = FIRST_RNTI
+        self.pending_events: List[Dict[str, Any]] = []
+        self.sfn = 0
+
+        # Rendered message bodies (everything after the timestamp), rebuilt by trafficGenerator.render_cell
+        self.bodies: List[bytes] = []
+        self.dirty = True
+
+    def allocate_rnti(self) -> int:
+        while self.next_rnti in self.ues:
+            self.next_rnti += 1
+        rnti = self.next_rnti
+        self.next_rnti = FIRST_RNTI if self.next_rnti >= LAST_RNTI else self.next_rnti + 1
+        return rnti
+
+    def add_event(self, event_type: str, rnti: int):
+        self.sfn = (self.sfn + 1) % 1024
+        self.pending_events.append({'cell_events': {'sfn': self.sfn, 'slot_index': self.sfn % 20, 'rnti': rnti,
+                                                    'event_type': event_type}})
+        self.dirty = True
+
+
+class trafficGenerator:
+    def __init__(self, cells: int, ues_per_cell: int, drbs_per_ue: int, churn: float = 0.0,
+                 refresh_rounds: int = 50, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.ues_per_cell = ues_per_cell
+        self.drbs_per_ue = drbs_per_ue
+        self.churn = churn
+        self.refresh_rounds = refresh_rounds
+
+        self.cells = [syntheticCell(pci) for pci in range(1, cells + 1)]
+        self.next_ue_id = 0
+        self.round = 0
+
+        # imeisv messages queued by churn, sent ahead of the next round
+        self.pending_imeisv: List[bytes] = []
+
+        # Counters
+        self.created = 0
+        self.removed = 0
+        self.handovers = 0
+
+        for cell in self.cells:
+            for _ in range(ues_per_cell):
+                self.create_ue(cell)
+
+    # -- UE churn --
+
+    def create_ue(self, cell: syntheticCell, ue: Optional[syntheticUe] = None):
+        if ue is None:
+            self.next_ue_id += 1
+            ue = syntheticUe(self.next_ue_id, IMEISV_BASE + self.next_ue_id, 0, self.drbs_per_ue)
+        ue.rnti = cell.allocate_rnti()
+        cell.ues[ue.rnti] = ue
+        cell.add_event('ue_create', ue.rnti)
+        self.pending_imeisv.append(self.render_imeisv(cell, ue))
+        self.created += 1
+
+    def remove_ue(self, cell: syntheticCell, rnti: int) -> syntheticUe:
+        ue = cell.ues.pop(rnti)
+        cell.add_event('ue_rem', rnti)
+        self.removed += 1
+        return ue
+
+    def churn_event(self):
+        """Apply one random UE lifecycle event, keeping each cell near `ues_per_cell` UEs."""
+        cell = self.random.choice(self.cells)
+        population = len(cell.ues)
+        kind = self.random.random()
+
+        if population and len(self.cells) > 1 and kind < 1 / 3:
+            target = self.random.choice([c for c in self.cells if c is not cell])
+            self.create_ue(target, self.remove_ue(cell, self.random.choice(list(cell.ues))))
+            self.handovers += 1
+        elif population > self.ues_per_cell or (population == self.ues_per_cell and population and kind < 2 / 3):
+            self.remove_ue(cell, self.random.choice(list(cell.ues)))
+        else:
+            self.create_ue(cell)
+
+    # -- Rendering --
+
+    def value(self, low: float, high: float) -> float:
+        return round(self.random.uniform(low, high), 2)
+
+    def component(self, names) -> Dict[str, float]:
+        return {name: self.value(0.5, 50) for name in names}
+
+    @staticmethod
+    def body(message: Dict[str, Any]) -> bytes:
+        """Serialise a message without its opening brace, ready to follow the timestamp."""
+        return json.dumps(message, separators=(',', ':'))[1:].encode()
+
+    def render_imeisv(self, cell: syntheticCell, ue: syntheticUe) -> bytes:
+        ssb = {'ssb_cell': {'rsrp': self.value(-110, -70), 'rsrq': self.value(-15, -5), 'sinr': self.value(0, 30)}}
+        return self.body({'imeisv': ue.imeisv, 'rnti': ue.rnti, 'pci': cell.pci,
+                          'serving_mo_list': [{'serving_cell': ssb}],
+                          'neighbor_cells': [{'pci': pci, **ssb} for pci in (cell.pci % len(self.cells) + 1,)]})
+
+    def render_ue(self, cell: syntheticCell, ue: syntheticUe) -> Dict[str, Any]:
+        nof_ok = self.random.randint(50, 500)
+        return {'pci': cell.pci, 'ue_container': {
+            'pci': cell.pci, 'rnti': ue.rnti, 'cqi': self.random.randint(1, 15), 'dl_ri': 2, 'ul_ri': 1, 'ri': 2,
+            'dl_mcs': self.random.randint(0, 27), 'dl_brate': self.value(1e3, 1e8), 'dl_nof_ok': nof_ok,
+            'dl_nof_nok': self.random.randint(0, 5), 'dl_bs': self.random.randint(0, 10000),
+            'pusch_snr_db': self.value(0, 30), 'pusch_rsrp_db': self.value(-100, -60),
+            'pucch_snr_db': self.value(0, 30), 'ta_ns': self.value(0, 500), 'pusch_ta_ns': self.value(0, 500),
+            'pucch_ta_ns': self.value(0, 500), 'srs_ta_ns': 'n/a', 'ul_mcs': self.random.randint(0, 27),
+            'ul_brate': self.value(1e3, 5e7), 'ul_nof_ok': nof_ok // 2, 'ul_nof_nok': self.random.randint(0, 3),
+            'last_phr': self.random.randint(0, 40), 'bsr': self.random.randint(0, 100000),
+            'nof_pucch_f0f1_invalid_harqs': 0, 'nof_pucch_f2f3f4_invalid_harqs': 0,
+            'nof_pucch_f2f3f4_invalid_csis': 0, 'nof_pusch_invalid_harqs': 0, 'nof_pusch_invalid_csis': 0,
+            'avg_ce_delay': self.value(0, 5), 'max_ce_delay': self.value(5, 10), 'avg_crc_delay': self.value(0, 5),
+            'max_crc_delay': self.value(5, 10), 'avg_pusch_harq_delay': self.value(0, 5),
+            'max_pusch_harq_delay': self.value(5, 10), 'avg_pucch_harq_delay': self.value(0, 5),
+            'max_pucch_harq_delay': self.value(5, 10)}}
+
+    def render_drb(self, ue: syntheticUe, drb_id: int) -> Dict[str, Any]:
+        sdus = self.random.randint(10, 1000)
+        tx = {'num_sdus': sdus, 'num_sdu_bytes': sdus * 1200, 'num_dropped_sdus': 0, 'num_discarded_sdus': 0,
+              'num_discard_failures': 0, 'num_pdus': sdus + 5, 'num_pdu_bytes': sdus * 1250,
+              'sum_sdu_latency_us': sdus * self.random.randint(100, 2000),
+              'sum_pdu_latency_ns': sdus * self.random.randint(1000, 50000),
+              'max_pdu_latency_ns': self.random.randint(50000, 5000000),
+              'pull_latency_histogram': [
+                  {'pull_latency_bin': {'pull_latency_bin_start_usec': start, 'pull_latency_bin_count': count}}
+                  for start, count in ((0, sdus // 2), (10, sdus // 4), (100, sdus // 8))]}
+        rx = {'num_sdus': sdus, 'num_sdu_bytes': sdus * 1000, 'num_pdus': sdus, 'num_pdu_bytes': sdus * 1050,
+              'num_lost_pdus': self.random.randint(0, 2), 'num_malformed_pdus': 0}
+        return {'drb': {'du_id': 0, 'ue_id': ue.ue_id, 'drb_id': drb_id, 'tx': tx, 'rx': rx}}
+
+    def render_du(self, cell: syntheticCell) -> Dict[str, Any]:
+        dl = {'average_latency_us': self.value(5, 50), 'max_latency_us': self.value(50, 200), 'max_latency_slot': 3,
+              'average_throughput_Mbps': self.value(10, 1000), 'cpu_usage_percent': self.value(1, 30),
+              'ldpc_encoder': self.component(('average_cb_size_bits',) + LATENCY_FIELDS),
+              'ldpc_rate_matcher': self.component(LATENCY_FIELDS),
+              'scrambling': self.component(('cpu_usage_percent',)),
+              'modulation_mapper': self.component(MODULATION_FIELDS),
+              'precoding_layer_mapping': {'average_latency_us': self.value(1, 10),
+                                          'throughput_per_nof_layers_MREsps': [self.value(10, 100) for _ in range(4)],
+                                          'cpu_usage_percent': self.value(1, 10)},
+              'fec': self.component(('average_throughput_Mbps', 'cpu_usage_percent'))}
+        ul = {'average_latency_us': self.value(5, 50), 'max_latency_us': self.value(50, 200), 'max_latency_slot': 7,
+              'average_throughput_Mbps': self.value(10, 500), 'cpu_usage_percent': self.value(1, 30),
+              'ldpc_decoder': self.component(('average_cb_size_bits',) + LATENCY_FIELDS),
+              'ldpc_rate_dematcher': self.component(LATENCY_FIELDS),
+              'descrambling': self.component(('cpu_usage_percent',)),
+              'demodulation_mapper': self.component(MODULATION_FIELDS),
+              'channel_estimation': self.component(LATENCY_FIELDS),
+              'transform_precoder': self.component(('average_latency_us', 'average_throughput_MREps',
+                                                    'cpu_usage_percent')),
+              'fec': self.component(('average_throughput_Mbps', 'cpu_usage_percent')),
+              'algo_efficiency': {'bler': self.value(0, 0.1), 'evm': self.value(0, 0.1), 'sinr_db': self.value(0, 30)}}
+        mac_cell = {'pci': cell.pci, **self.component(('average_latency_us', 'min_latency_us', 'max_latency_us',
+                                                       'cpu_usage_percent'))}
+        return {'du': {'du_high': {'mac': {'dl': [{'cell': mac_cell}]}},
+                       'du_low': {'upper_phy': [{'cell': {'pci': cell.pci, 'dl': dl, 'ul': ul}}]}}}
+
+    def render_ru(self, cell: syntheticCell) -> Dict[str, Any]:
+        stage = ('average_latency_us', 'max_latency_us', 'cpu_usage_percent')
+        ethernet = ('average_throughput_Mbps', 'average_latency_us', 'max_latency_us', 'cpu_usage_percent')
+        total = self.random.randint(1000, 100000)
+        late = self.random.randint(0, 10)
+        return {'ru': {'ofh': [{'cell': {'pci': cell.pci,
+            'ul': {'received_packets': {'total': total, 'early': 0, 'on_time': total - late, 'late': late},
+                   'ethernet_receiver': self.component(ethernet),
+                   'message_decoder': {'prach': self.component(stage), 'data': self.component(stage)}},
+            'dl': {'ethernet_transmitter': self.component(ethernet),
+                   'message_encoder': {'dl_cp': self.component(stage), 'ul_cp': self.component(stage),
+                                       'dl_up': self.component(stage)},
+                   'transmitter_stats': {'late_dl_grids': 0, 'late_ul_requests': late}}}}]}}
+
+    def render_cell(self, cell: syntheticCell):
+        """Rebuild the cached bodies of every message this cell sends per round."""
+        ues = list(cell.ues.values())
+        ue_entries = [self.render_ue(cell, ue) for ue in ues]
+        drb_entries = [self.render_drb(ue, drb_id) for ue in ues for drb_id in range(1, ue.drbs + 1)]
+
+        cell_metrics = {'average_latency': self.value(5, 50), 'error_indication_count': 0,
+                        'max_latency': self.value(50, 500), 'nof_failed_pdcch_allocs': self.random.randint(0, 3),
+                        'nof_failed_uci_allocs': self.random.randint(0, 3),
+                        'latency_histogram': [self.random.randint(0, 100) for _ in range(11)]}
+        bodies = []
+        for start in range(0, max(len(ue_entries), 1), MAX_ITEMS_PER_MESSAGE):
+            bodies.append(self.body({'cell_metrics': cell_metrics,
+                                     'ue_list': ue_entries[start:start + MAX_ITEMS_PER_MESSAGE]}))
+        bodies.append(self.body(self.render_du(cell)))
+        bodies.append(self.body(self.render_ru(cell)))
+        pdcp = self.component(LATENCY_FIELDS)
+        bodies.append(self.body({'cu-up': {'pdcp': {'dl': pdcp, 'ul': dict(pdcp)}}}))
+        for start in range(0, len(drb_entries), MAX_ITEMS_PER_MESSAGE):
+            bodies.append(self.body({'rlc_metrics': drb_entries[start:start + MAX_ITEMS_PER_MESSAGE]}))
+
+        cell.bodies = bodies
+        cell.dirty = False
+
+    # -- Rounds --
+
+    def next_round(self) -> List[bytes]:
+        """Return the message bodies of one reporting round (churn messages first)."""
+        self.round += 1
+        refresh = self.refresh_rounds > 0 and self.round % self.refresh_rounds == 0
+
+        bodies = self.pending_imeisv
+        self.pending_imeisv = []
+
+        for cell in self.cells:
+            if cell.dirty or refresh:
+                self.render_cell(cell)
+            if cell.pending_events:
+                # Events ride on an extra cell_metrics message so the cached bodies stay reusable
+                bodies.append(self.body({'cell_metrics': {}, 'ue_list': [], 'event_list': cell.pending_events}))
+                cell.pending_events = []
+            bodies.extend(cell.bodies)
+
+        bodies.append(self.body({'app_resource_usage': {'cpu_usage_percent': self.value(5, 80),
+                                                         'memory_usage_MB': self.value(200, 2000),
+                                                         'power_consumption_Watts': self.value(50, 300)}}))
+        return bodies
+
+    def run(self, send, rate: float, duration: float, report_interval: float = 5.0):
+        """Call `send(datagram)` for every generated message, paced to `rate` datagrams/s."""
+        started = time.perf_counter()
+        deadline = started + duration if duration > 0 else None
+        next_report = started + report_interval
+        churn_due = 0.0
+        last_churn = started
+        sent = sent_bytes = reported = 0
+
+        while deadline is None or time.perf_counter() < deadline:
+            now = time.perf_counter()
+            if self.churn > 0:
+                churn_due += self.churn * (now - last_churn)
+                last_churn = now
+                while churn_due >= 1:
+                    self.churn_event()
+                    churn_due -= 1
+
+            prefix = b'{"timestamp":%.3f,' % time.time()
+            for body in self.next_round():
+                datagram = prefix + body
+                send(datagram)
+                sent += 1
+                sent_bytes += len(datagram)
+
+                if rate > 0 and sent % 64 == 0:
+                    delay = started + sent / rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+            now = time.perf_counter()
+            if now >= next_report:
+                log_both(f"Sent {sent} datagrams ({(sent - reported) / report_interval:.0f}/s), "
+                         f"{sum(len(cell.ues) for cell in self.cells)} UEs, created {self.created}, "
+                         f"removed {self.removed}, handovers {self.handovers}")
+                reported = sent
+                next_report += report_interval
+
+        elapsed = time.perf_counter() - started
+        log_both(f"Sent {sent} datagrams ({sent_bytes} bytes) in {elapsed:.2f}s ({sent / elapsed:.0f} datagrams/s)")
+        return sent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic srsRAN metrics traffic")
+    parser.add_argument("--cells", type=int, default=1)
+    parser.add_argument("--ues-per-cell", type=int, default=8)
+    parser.add_argument("--drbs-per-ue", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=1000, help="datagrams per second in total (0 = unpaced)")
+    parser.add_argument("--churn", type=float, default=0, help="UE create/remove/handover events per second")
+    parser.add_argument("--duration", type=float, default=0, help="seconds to run (0 = until interrupted)")
+    parser.add_argument("--refresh", type=int, default=50, help="re-randomise metric values every N rounds")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=55555)
+    parser.add_argument("--capture", default=None, help="write a capture to this directory instead of sending")
+    args = parser.parse_args()
+
+    generator = trafficGenerator(args.cells, args.ues_per_cell, args.drbs_per_ue, args.churn, args.refresh,
+                                 args.seed)
+
+    if args.capture:
+        capture = captureWriter(args.capture, prefix="synthetic")
+        send = capture.write
+    else:
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.connect((args.host, args.port))
+
+        def send(datagram):
+            try:
+                sender.send(datagram)
+            except ConnectionRefusedError:
+                # Nothing listening yet; keep generating
+                pass
+
+    try:
+        generator.run(send, args.rate, args.duration)
+    except KeyboardInterrupt:
+        log_both("Stopped")
+    finally:
+        if args.capture:
+            capture.close()